@@ -0,0 +1,93 @@
+"""
+Spatial index over a page's notes, for hit tests and for drawing only the visible ones.
+
+Notes are bucketed by their anchor point into a grid of GRID_CELL x GRID_CELL PDF
+points. A query only looks at the notes in the cells covering the queried rectangle,
+so hovering, right-clicking or repainting part of a page with thousands of notes no
+longer goes through all of them. A note's text is drawn in a NOTE_BOX_WIDTH x
+NOTE_BOX_HEIGHT pixel box below and to the right of its anchor, so box queries widen
+the rectangle by that box (converted to points at the current zoom) up and to the left.
+"""
+import math
+
+GRID_CELL = 64.0
+NOTE_BOX_WIDTH = 200 # Pixels, whatever the zoom (see PDFReader._paint_page_overlays)
+NOTE_BOX_HEIGHT = 50
+NOTE_HIT_RADIUS = 30 # Pixels around the anchor for "Delete Nearest Annotation"
+
+
+class NoteGrid:
+    def __init__(self, notes, cell_size=GRID_CELL):
+        self.notes = notes
+        self.cell_size = cell_size
+        self.cells = {}
+        for index, note in enumerate(notes):
+            self.cells.setdefault(self._cell(note[0], note[1]), []).append(index)
+
+    def _cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def query(self, x0, y0, x1, y1):
+        """Indices, in list (drawing) order, of the notes anchored in [x0, x1] x [y0, y1]."""
+        first_column, first_row = self._cell(x0, y0)
+        last_column, last_row = self._cell(x1, y1)
+        if (last_column - first_column + 1) * (last_row - first_row + 1) > len(self.cells):
+            # Larger than the page's occupied cells (e.g. zoomed out): walk those instead
+            buckets = [indices for (column, row), indices in self.cells.items()
+                       if first_column <= column <= last_column and first_row <= row <= last_row]
+        else:
+            buckets = [self.cells[cell] for cell in
+                       ((column, row) for row in range(first_row, last_row + 1)
+                        for column in range(first_column, last_column + 1))
+                       if cell in self.cells]
+        found = []
+        for indices in buckets:
+            for index in indices:
+                x, y = self.notes[index][:2]
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    found.append(index)
+        found.sort()
+        return found
+
+    def boxes_in(self, x0, y0, x1, y1, zoom_level):
+        """Notes whose drawn text box intersects [x0, x1] x [y0, y1] (in points)."""
+        return self.query(x0 - NOTE_BOX_WIDTH / zoom_level, y0 - NOTE_BOX_HEIGHT / zoom_level, x1, y1)
+
+    def box_at(self, x, y, zoom_level):
+        """The topmost (last drawn) note whose text box contains the point, or None."""
+        indices = self.boxes_in(x, y, x, y, zoom_level)
+        return indices[-1] if indices else None
+
+    def nearest(self, x, y, radius):
+        """The note anchored closest to the point and less than radius away, or None."""
+        nearest_index = None
+        min_distance = radius
+        for index in self.query(x - radius, y - radius, x + radius, y + radius):
+            note_x, note_y = self.notes[index][:2]
+            distance = math.hypot(note_x - x, note_y - y)
+            if distance < min_distance:
+                min_distance = distance
+                nearest_index = index
+        return nearest_index
+
+
+class AnnotationIndex:
+    """
+    NoteGrid per page, built the first time a page is queried. A grid is rebuilt when
+    the page's list is replaced (page edits, undo) or invalidated after a note is
+    added, removed or merged into it.
+    """
+    def __init__(self):
+        self.grids = {}
+
+    def grid(self, page_num, notes):
+        grid = self.grids.get(page_num)
+        if grid is None or grid.notes is not notes:
+            grid = self.grids[page_num] = NoteGrid(notes)
+        return grid
+
+    def invalidate(self, page_num=None):
+        if page_num is None:
+            self.grids.clear()
+        else:
+            self.grids.pop(page_num, None)
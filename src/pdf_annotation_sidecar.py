@@ -0,0 +1,136 @@
+"""
+Crash-safe annotation sidecar: a snapshot plus an append-only journal.
+
+<file>.annotations.json holds a snapshot of all notes and <file>.annotations.journal
+one JSON line per note added or deleted since. Adding or deleting a note appends
+and fsyncs a single line, so an edit costs the same with ten notes or ten thousand.
+The snapshot is only rewritten when the journal grows long (or after bulk changes
+such as saving the PDF), always through a temp file that is fsynced and renamed over
+the old one, so it is either the old or the new version, never half written.
+
+Every journal line carries a sequence number and the snapshot records the last one
+it contains: lines left over from a crash between writing a snapshot and truncating
+the journal are skipped on load, and a torn last line is cut off.
+"""
+import json
+import os
+
+SIDECAR_VERSION = 2
+COMPACT_AFTER_RECORDS = 500
+
+
+class AnnotationSidecar:
+    def __init__(self, pdf_file_path):
+        self.snapshot_path = pdf_file_path + ".annotations.json"
+        self.journal_path = pdf_file_path + ".annotations.journal"
+        self.seq = 0 # Sequence number of the last record written or read
+        self.journal_records = 0
+
+    def has_files(self):
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path)
+
+    def load(self):
+        """Returns {page: [note]} with notes as tuples; missing files mean no notes."""
+        annotations = {}
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if "version" in data:
+                snapshot_seq = data["seq"]
+                pages = data["pages"]
+            else:
+                pages = data # Written before the journal existed: {page: [[x, y, text]]}
+            for page_num, entries in pages.items():
+                annotations[int(page_num)] = [_note(entry) for entry in entries]
+        self.seq = snapshot_seq
+        self.journal_records = 0
+        for record in self._read_journal():
+            if record["seq"] <= snapshot_seq:
+                continue # Already in the snapshot
+            self._replay(annotations, record)
+            self.seq = record["seq"]
+            self.journal_records += 1
+        return annotations
+
+    def _read_journal(self):
+        if not os.path.exists(self.journal_path):
+            return []
+        records = []
+        good_length = 0
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break # Torn write: everything from here on is dropped
+                good_length += len(line)
+        if good_length < os.path.getsize(self.journal_path):
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(good_length) # So the next append starts on a clean line
+        return records
+
+    @staticmethod
+    def _replay(annotations, record):
+        page_notes = annotations.setdefault(record["page"], [])
+        note = _note(record["note"])
+        if record["op"] == "add":
+            page_notes.insert(min(record["index"], len(page_notes)), note)
+        else:
+            # The note may have picked up the ID of its PDF annotation since it was written
+            match = note if note in page_notes else next((n for n in page_notes if n[:3] == note[:3]), None)
+            if match is not None:
+                page_notes.remove(match)
+        if not page_notes:
+            del annotations[record["page"]]
+
+    def append(self, op, page_num, note, index, annotations):
+        """
+        Records one added ("add") or deleted ("delete") note. annotations is the full
+        map after the edit; it is only used when the journal is due for compaction, and
+        None puts compaction off.
+        """
+        self.seq += 1
+        record = {"seq": self.seq, "op": op, "page": page_num, "index": index, "note": list(note)}
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.journal_records += 1
+        if annotations is not None and self.journal_records >= COMPACT_AFTER_RECORDS:
+            self.compact(annotations)
+
+    def compact(self, annotations):
+        """Atomically replaces the snapshot with annotations and empties the journal."""
+        temp_path = self.snapshot_path + ".tmp"
+        data = {"version": SIDECAR_VERSION, "seq": self.seq,
+                "pages": {str(page_num): [list(note) for note in notes] for page_num, notes in annotations.items()}}
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        _fsync_directory(os.path.dirname(os.path.abspath(self.snapshot_path)))
+        # A crash before this point leaves records the snapshot's seq already covers
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self.journal_records = 0
+
+
+def _note(entry):
+    # Older sidecars have [x, y, text]; their notes get an empty ID (see pdf_utils)
+    return tuple(entry) + ("",) * (4 - len(entry))
+
+
+def _fsync_directory(path):
+    """Makes a rename durable; not possible (nor needed) on Windows."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
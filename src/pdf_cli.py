@@ -0,0 +1,207 @@
+"""
+Headless batch commands: no Qt and no display needed, for scripts and nightly jobs.
+
+    python pdf_reader.py render FILE... [--pages 1-3,7] [--dpi 150] [--format png|jpg] [--out DIR]
+    python pdf_reader.py bake FILE... (--out DIR | --in-place)
+    python pdf_reader.py reorder FILE... --order "3,1,2,4-" (--out DIR | --in-place)
+
+They run the viewer's own code: images come from render_page_pixmap (the matrix used
+on screen), notes are read from the .annotations.json sidecar and written as the
+viewer writes them on save (pdf_notes), and a reorder is a page order as in the
+thumbnail edits, so a file's sidecar notes follow its pages (reorder_keys).
+
+Files are handed to a pool of --jobs spawn processes, one file per task. A file that
+fails is reported on stderr and the others carry on; the exit status is 1 if any
+file failed. Files can also be listed one per line with --files-from ("-" for stdin)
+when there are too many for a command line.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import fitz  # PyMuPDF
+
+from pdf_annotation_sidecar import AnnotationSidecar
+from pdf_notes import merge_annotations, write_notes_to_document
+from pdf_page_edits import parse_page_ranges, reorder_keys, select_pages
+from pdf_render import render_page_pixmap
+from pdf_save import OPTIMIZED_SAVE_OPTIONS
+
+COMMANDS = ("render", "bake", "reorder")
+IMAGE_FORMATS = ("png", "jpg")
+
+
+def _output_path(file_name, args):
+    """Where bake/reorder write: over the file with --in-place, else the same name in --out."""
+    if args.in_place:
+        return file_name
+    target = os.path.join(args.out, os.path.basename(file_name))
+    if os.path.abspath(target) == os.path.abspath(file_name):
+        raise ValueError("Output is the input file; use --in-place to overwrite it")
+    return target
+
+
+def _save(pdf_document, file_name, optimize, incremental=False):
+    """Saves incrementally where possible, otherwise through a temp file renamed over the target."""
+    if incremental and pdf_document.can_save_incrementally():
+        pdf_document.save(file_name, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+        return
+    temp_path = file_name + ".saving"
+    try:
+        pdf_document.save(temp_path, **(OPTIMIZED_SAVE_OPTIONS if optimize else {}))
+        os.replace(temp_path, file_name)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _load_notes(sidecar):
+    """The sidecar's notes, merged as the viewer loads them (see pdf_notes.load_sidecar_annotations)."""
+    return {page_num: merge_annotations([], entries) for page_num, entries in sidecar.load().items()}
+
+
+def render_file(file_name, args):
+    doc = fitz.open(file_name)
+    try:
+        pages = parse_page_ranges(args.pages, doc.page_count)
+        out_dir = args.out or os.path.dirname(file_name) or "."
+        os.makedirs(out_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(file_name))[0]
+        for page_num in pages:
+            pix = render_page_pixmap(doc.load_page(page_num), args.dpi / 72, args.rotation)
+            image_path = os.path.join(out_dir, f"{stem}_p{page_num + 1:04d}.{args.format}")
+            if args.format == "jpg":
+                pix.save(image_path, jpg_quality=args.quality)
+            else:
+                pix.save(image_path)
+    finally:
+        doc.close()
+    return f"{len(pages)} page(s) rendered"
+
+
+def bake_file(file_name, args):
+    target = _output_path(file_name, args)
+    doc = fitz.open(file_name)
+    try:
+        sidecar = AnnotationSidecar(file_name)
+        if not sidecar.has_files():
+            return "no notes"
+        annotations = _load_notes(sidecar)
+        changed_pages = write_notes_to_document(doc, annotations)
+        if args.in_place:
+            if changed_pages:
+                _save(doc, target, args.optimize, incremental=not args.optimize)
+        else:
+            os.makedirs(args.out, exist_ok=True)
+            _save(doc, target, args.optimize)
+    finally:
+        doc.close()
+    if args.in_place:
+        sidecar.compact(annotations) # Notes that had no ID keep the one written into the PDF
+    return f"{sum(map(len, annotations.values()))} note(s), {len(changed_pages)} page(s) changed"
+
+
+def reorder_file(file_name, args):
+    target = _output_path(file_name, args)
+    sidecar = AnnotationSidecar(file_name)
+    annotations = _load_notes(sidecar) if sidecar.has_files() else None
+    doc = fitz.open(file_name)
+    try:
+        order = parse_page_ranges(args.order, doc.page_count)
+        select_pages(doc, order) # Repeated pages become real copies
+        if not args.in_place:
+            os.makedirs(args.out, exist_ok=True)
+        _save(doc, target, args.optimize)
+    finally:
+        doc.close()
+    if annotations is not None:
+        # The notes move with their pages; in place the sidecar keeps its sequence number
+        (sidecar if args.in_place else AnnotationSidecar(target)).compact(reorder_keys(annotations, order))
+    return f"{len(order)} page(s)"
+
+
+JOBS = {"render": render_file, "bake": bake_file, "reorder": reorder_file}
+
+
+def run_file(file_name, args):
+    """Pool task: (file name, message, error) with error "" on success, so one bad file does not stop the batch."""
+    try:
+        return file_name, JOBS[args.command](file_name, args), ""
+    except Exception as e:
+        return file_name, "", str(e) or type(e).__name__
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pdf_reader.py", description="Batch PDF processing without a display.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    render = commands.add_parser("render", help="Render page ranges to PNG or JPEG images")
+    render.add_argument("--pages", default="all", help='Pages to render, e.g. "1-3,7,10-" (default: all)')
+    render.add_argument("--dpi", type=float, default=150)
+    render.add_argument("--rotation", type=int, choices=(0, 90, 180, 270), default=0)
+    render.add_argument("--format", choices=IMAGE_FORMATS, default="png")
+    render.add_argument("--quality", type=int, default=90, help="JPEG quality (default: 90)")
+    render.add_argument("--out", help="Directory for the images (default: next to each file)")
+
+    bake = commands.add_parser("bake", help="Write the notes of each file's .annotations.json into the PDF")
+    reorder = commands.add_parser("reorder", help="Reorder, drop or repeat pages")
+    reorder.add_argument("--order", required=True,
+                         help='New page order, e.g. "3,1,2,4-"; pages left out are deleted')
+    for command in (bake, reorder):
+        target = command.add_mutually_exclusive_group(required=True)
+        target.add_argument("--out", help="Directory for the new files")
+        target.add_argument("--in-place", action="store_true", help="Overwrite the files (and their sidecars)")
+        command.add_argument("--optimize", action="store_true", help="Compact and compress the saved files")
+
+    for command in (render, bake, reorder):
+        command.add_argument("files", nargs="*", metavar="FILE")
+        command.add_argument("--files-from", metavar="LIST", help='File with one PDF path per line ("-" for stdin)')
+        command.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                             help="Files processed in parallel (default: one per CPU)")
+    return parser
+
+
+def _read_file_list(list_name):
+    f = sys.stdin if list_name == "-" else open(list_name, "r", encoding="utf-8")
+    try:
+        return [line.strip() for line in f if line.strip()]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def main(argv):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    files = list(args.files)
+    if args.files_from:
+        files.extend(_read_file_list(args.files_from))
+    if not files:
+        parser.error("no files given")
+    jobs = max(1, min(args.jobs, len(files)))
+    if jobs == 1:
+        results = (run_file(file_name, args) for file_name in files)
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn"))
+        results = (future.result() for future in
+                   as_completed([executor.submit(run_file, file_name, args) for file_name in files]))
+    failed = 0
+    try:
+        for file_name, message, error in results:
+            if error:
+                failed += 1
+                print(f"{file_name}: error: {error}", file=sys.stderr)
+            else:
+                print(f"{file_name}: {message}")
+    finally:
+        if jobs > 1:
+            executor.shutdown(cancel_futures=True)
+    print(f"{len(files) - failed} of {len(files)} file(s) done", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
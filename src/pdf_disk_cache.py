@@ -0,0 +1,93 @@
+import hashlib
+import os
+import shutil
+
+THUMBNAIL_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def content_hash(file_path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's bytes, read in chunks (hashlib releases the GIL, so this can run in a thread)."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def user_cache_dir(*parts):
+    """Per-user cache directory for the reader (created on demand)."""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    path = os.path.join(base, "pdf_reader", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def prune_cache(directory, max_bytes, keep=()):
+    """
+    Deletes the least recently used entries (subdirectories, by mtime) of a cache
+    directory until the rest fit in max_bytes. Entries named in keep are never
+    deleted. Returns the bytes still in use.
+    """
+    entries = []
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return 0
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            last_used = os.stat(path).st_mtime
+            size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+        except OSError:
+            continue  # Not a directory, or removed meanwhile
+        entries.append((last_used, name, size))
+    total = sum(size for _, _, size in entries)
+    for _, name, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name in keep:
+            continue
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+        total -= size
+    return total
+
+
+def thumbnail_cache_hash(file_path, max_bytes=THUMBNAIL_CACHE_BYTES):
+    """
+    Content hash of a file for ThumbnailDiskCache. Also trims the thumbnail cache to
+    max_bytes, keeping this file's entry; both run off the GUI thread.
+    """
+    document_hash = content_hash(file_path)
+    try:
+        prune_cache(user_cache_dir("thumbnails"), max_bytes, keep=(document_hash,))
+    except OSError:
+        pass  # No cache directory: nothing to prune
+    return document_hash
+
+
+class ThumbnailDiskCache:
+    """
+    PNG thumbnails of one document, stored under its content hash so any copy
+    of the same file (renamed, moved, re-downloaded) reuses them. The directory's
+    mtime marks when it was last used (see prune_cache).
+    """
+    def __init__(self, document_hash):
+        self.document_hash = document_hash
+        self.directory = user_cache_dir("thumbnails", document_hash)
+        os.utime(self.directory)
+
+    def path(self, page_num):
+        return os.path.join(self.directory, f"{page_num}.png")
+
+    def has(self, page_num):
+        return os.path.exists(self.path(page_num))
+
+    def temp_path(self, page_num):
+        """Where to write a new thumbnail before commit() renames it into place."""
+        return self.path(page_num) + ".tmp.png"
+
+    def commit(self, page_num):
+        os.replace(self.temp_path(page_num), self.path(page_num))
@@ -0,0 +1,62 @@
+"""
+Undo/redo journal for page and annotation edits.
+
+An entry records how to redo and undo one edit, not a copy of the document:
+a page move is undone by the opposite move, a new note by removing it again.
+Only deleted pages are kept, in a small fitz.Document per entry, so memory is
+bounded by the entries in the journal (at most UNDO_LIMIT) rather than by the
+size of the document or the length of the editing session.
+
+Entries are tuples; the first item is the kind:
+    ("insert_page", page_num)                         a blank page was inserted
+    ("delete_page", page_num, saved_pages, notes)     notes: the page's annotations
+    ("move_page", from_page, to_page)
+    ("reorder", order, deleted, saved_pages, notes)   batch edit (see pdf_page_edits.order_mapping);
+                                                      notes: {old page: annotations} of deleted pages
+    ("add_note", page_num, index, note)
+    ("delete_note", page_num, index, note)
+"""
+from collections import deque
+
+import fitz  # PyMuPDF
+
+UNDO_LIMIT = 200
+
+
+def save_pages(pdf_document, pages):
+    """Copies pages (in the given order) into a new document so a deletion can be undone."""
+    saved = fitz.open()
+    for page_num in pages:
+        saved.insert_pdf(pdf_document, from_page=page_num, to_page=page_num)
+    return saved
+
+
+class EditJournal:
+    def __init__(self, limit=UNDO_LIMIT):
+        self.undo_stack = deque(maxlen=limit) # The oldest entry is dropped once the limit is reached
+        self.redo_stack = []
+
+    def record(self, entry):
+        """Adds a new edit; anything that could be redone is discarded."""
+        self.undo_stack.append(entry)
+        self.redo_stack.clear()
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def pop_undo(self):
+        entry = self.undo_stack.pop()
+        self.redo_stack.append(entry)
+        return entry
+
+    def pop_redo(self):
+        entry = self.redo_stack.pop()
+        self.undo_stack.append(entry)
+        return entry
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
@@ -0,0 +1,168 @@
+"""
+The edits made to the open document, logged so worker processes can replay them.
+
+The GUI thread edits its fitz.Document in place, while every render and task worker
+keeps its own copy opened from the file on disk. Instead of writing the whole edited
+document out for them, which costs time in proportion to its size, each edit is
+appended to a log file as one JSON line right after it was made, and a worker brings
+its copy up to date by replaying the lines it has not applied yet (see
+pdf_render.worker_document). Logging an edit costs about as much as the edit; the only
+pages ever written out are the ones undo puts back, once per deletion.
+
+Edits are lists; the first item is the kind, page numbers are those at the time:
+    ["insert_page", page_num]                          blank page of fitz's default size
+    ["new_page"]                                       blank page appended at the end
+    ["insert_saved", saved, from_page, to_page, start_at]
+                                                       pages kept for undo (see EditLog.record)
+    ["delete_page", page_num]
+    ["move_page", from_page, to_page]                  as passed to fitz's move_page
+    ["select_pages", order]                            see pdf_page_edits.select_pages
+    ["add_note", page_num, note]                       see pdf_notes.add_note_annot
+    ["delete_note", page_num, note]                    see pdf_notes.delete_note_annot
+    ["write_notes", annotations]                       see pdf_notes.write_notes_to_document
+    ["set_field", page_num, widget_index, value]       value of the page's widget_index-th widget
+"""
+import itertools
+import json
+import os
+import tempfile
+
+import fitz  # PyMuPDF
+
+from pdf_notes import add_note_annot, delete_note_annot, write_notes_to_document
+from pdf_page_edits import select_pages
+
+
+def saved_pages_path(log_path, saved):
+    return f"{log_path}.{saved}.pdf"
+
+
+class EditLog:
+    """
+    The edits made since the document was opened (or saved over the file). source()
+    describes that state to a worker. close() removes the log's files, or leaves them
+    until release() while a task still holds them (see hold()).
+    """
+    def __init__(self, file_path, base):
+        self.file_path = file_path
+        self.base = base        # Tells the workers' copies of different opens of one file apart
+        self.path = None        # The log file, created with the first edit
+        self.edit_count = 0
+        self.failed = False     # The log could not be written, so workers cannot follow the edits
+        self._saved = {}        # id(page set kept for undo) -> (number, fitz.Document)
+        self._holds = 0
+        self._closed = False
+        self._files = []        # Files to remove on close
+
+    def record(self, kind, *args):
+        """
+        Appends an edit just made to the document. A fitz.Document among args (pages
+        kept for undo, see pdf_edit_journal.save_pages) is written out the first time
+        it is logged and stands in the line as its number.
+        """
+        if self.failed:
+            return
+        try:
+            if self.path is None:
+                fd, self.path = tempfile.mkstemp(prefix="pdf_reader_edits_", suffix=".jsonl")
+                os.close(fd)
+                self._files.append(self.path)
+            args = [self._saved_number(arg) if isinstance(arg, fitz.Document) else arg for arg in args]
+            line = json.dumps([kind, *args], separators=(",", ":"))
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except (OSError, TypeError, ValueError):
+            self.failed = True
+            return
+        self.edit_count += 1
+
+    def _saved_number(self, saved_pages):
+        entry = self._saved.get(id(saved_pages))
+        if entry is None:
+            # The document is kept in the entry, so its id() is not reused by another
+            entry = self._saved[id(saved_pages)] = (len(self._saved), saved_pages)
+            path = saved_pages_path(self.path, entry[0])
+            self._files.append(path)
+            saved_pages.save(path)
+        return entry[0]
+
+    def source(self):
+        """(file path, base, log path, edit count), what a worker needs to rebuild the document. May raise OSError."""
+        if self.failed:
+            raise OSError("The document's edits could not be logged")
+        return self.file_path, self.base, self.path, self.edit_count
+
+    def hold(self):
+        """A task was handed source(); the files stay until it calls release()."""
+        self._holds += 1
+
+    def release(self):
+        self._holds -= 1
+        self._remove_files()
+
+    def close(self):
+        """The log is not needed for new work any more. Can be called again to retry leftover files."""
+        self._closed = True
+        self._remove_files()
+
+    def has_files(self):
+        return bool(self._files)
+
+    def _remove_files(self):
+        if not self._closed or self._holds:
+            return
+        remaining = []
+        for path in self._files:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                remaining.append(path)  # Still open in a worker (Windows); retried by the next close()
+        self._files = remaining
+
+
+# --- Worker-process side ---
+
+def replay_edits(pdf_document, log_path, first, end):
+    """Applies edits [first, end) of a log file to a worker's copy of the document."""
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in itertools.islice(f, first, end):
+            apply_edit(pdf_document, json.loads(line), log_path)
+
+
+def apply_edit(pdf_document, edit, log_path):
+    """Makes one logged edit the way the GUI thread made it (see pdf_utils and PDFReader)."""
+    kind, args = edit[0], edit[1:]
+    if kind == "insert_page":
+        pdf_document.insert_page(args[0])
+    elif kind == "new_page":
+        pdf_document.new_page(-1)
+    elif kind == "insert_saved":
+        saved, from_page, to_page, start_at = args
+        with fitz.open(saved_pages_path(log_path, saved)) as saved_pages:
+            pdf_document.insert_pdf(saved_pages, from_page=from_page, to_page=to_page, start_at=start_at)
+    elif kind == "delete_page":
+        pdf_document.delete_page(args[0])
+    elif kind == "move_page":
+        pdf_document.move_page(*args)
+    elif kind == "select_pages":
+        select_pages(pdf_document, args[0])
+    elif kind == "add_note":
+        page_num, note = args
+        add_note_annot(pdf_document, pdf_document.load_page(page_num), tuple(note))
+    elif kind == "delete_note":
+        page_num, note = args
+        delete_note_annot(pdf_document.load_page(page_num), tuple(note))
+    elif kind == "write_notes":
+        # JSON turned the page numbers into strings
+        write_notes_to_document(pdf_document, {int(page_num): [tuple(note) for note in notes]
+                                               for page_num, notes in args[0].items()})
+    elif kind == "set_field":
+        page_num, widget_index, value = args
+        page = pdf_document.load_page(page_num) # Must outlive widget.update()
+        widget = next(itertools.islice(page.widgets(), widget_index, None))
+        widget.field_value = value
+        widget.update()
+    else:
+        raise ValueError(f"Unknown edit: {kind}")
@@ -0,0 +1,83 @@
+"""
+Vector printing: the selected pages are copied with insert_pdf into a new PDF,
+which is handed to the print spooler (CUPS lp/lpr) as it is, or written out when
+printing to a PDF file. Text and vector graphics stay vectors, so the job is a few
+kilobytes per page instead of a full-resolution bitmap, and there is nothing to
+rasterize. Printers or systems without a PDF-capable spooler use the raster path
+(see pdf_print.py).
+"""
+import os
+import shutil
+import subprocess
+
+import fitz  # PyMuPDF
+
+from pdf_render import worker_document
+from pdf_save import OPTIMIZED_SAVE_OPTIONS
+
+PRINT_VECTOR = "Vector (send the pages as PDF)"
+PRINT_RASTER = "Raster (render at printer resolution)"
+
+
+def pdf_spooler():
+    """Path of a spooler command that accepts PDF files (lp or lpr), or None."""
+    return shutil.which("lp") or shutil.which("lpr")
+
+
+def print_modes(to_pdf_file, spooler_available):
+    """Modes offered for a printer; the first one is the default."""
+    if to_pdf_file or spooler_available:
+        return [PRINT_VECTOR, PRINT_RASTER]
+    return [PRINT_RASTER]
+
+
+def extract_pages(pdf_document, pages, rotation=0):
+    """New fitz.Document holding pages (0-based, in the given order), turned by rotation degrees."""
+    extracted = fitz.open()
+    run_start = 0
+    for index in range(1, len(pages) + 1):
+        # One insert_pdf per run of consecutive pages keeps shared resources shared
+        if index == len(pages) or pages[index] != pages[index - 1] + 1:
+            extracted.insert_pdf(pdf_document, from_page=pages[run_start], to_page=pages[index - 1])
+            run_start = index
+    if rotation % 360:
+        for page in extracted:
+            page.set_rotation((page.rotation + rotation) % 360)
+    return extracted
+
+
+def spool_command(spooler, file_name, printer_name, copies):
+    if os.path.basename(spooler) == "lpr":
+        return [spooler, "-P", printer_name, "-#", str(copies), file_name]
+    return [spooler, "-d", printer_name, "-n", str(copies), file_name]
+
+
+def print_pages_job(source, pages, rotation, file_name, printer_name=None, copies=1):
+    """
+    Worker-process job: writes the pages as a new PDF to file_name. With a printer_name
+    the file is then spooled to that printer and removed. Returns the PDF's size.
+    """
+    doc = worker_document(source)
+    temp_path = file_name + ".saving"
+    try:
+        extracted = extract_pages(doc, pages, rotation)
+        extracted.save(temp_path, **OPTIMIZED_SAVE_OPTIONS)
+        extracted.close()
+        os.replace(temp_path, file_name)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    size = os.path.getsize(file_name)
+    if printer_name:
+        spooler = pdf_spooler()
+        try:
+            if spooler is None:
+                raise RuntimeError("No print spooler (lp or lpr) found")
+            result = subprocess.run(spool_command(spooler, file_name, printer_name, copies),
+                                    capture_output=True, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.strip() or f"{os.path.basename(spooler)} exited with {result.returncode}")
+        finally:
+            os.remove(file_name) # lp and lpr copy the file into the spool
+    return size
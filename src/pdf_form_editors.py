@@ -0,0 +1,106 @@
+import fitz  # PyMuPDF
+from PyQt6.QtWidgets import QLineEdit, QCheckBox, QWidget
+
+
+class FormFieldEditors:
+    """
+    Editors (QLineEdit / QCheckBox) over the form fields of the pages on screen.
+
+    A page's editors are set up the first time it is shown and then kept: later
+    renders (scrolling, overlay updates) leave them and their focus and cursor alone,
+    and zoom or rotation changes only move them. When a page leaves the screen its
+    editors go back to a pool, so the next page reuses them instead of building new
+    widgets. Pooled editors wait on a hidden holder widget, since page widgets can be
+    deleted (page edits, reopening) while the pool still holds them.
+    """
+    def __init__(self, reader):
+        self.reader = reader
+        self.holder = QWidget(reader)
+        self.holder.hide()
+        self.page_editors = {} # page_num -> [editor]; each editor's pdf_field is the pdf_forms.FormField it edits
+        self.placed_for = {}   # page_num -> (page widget, zoom, rotation, widget size, raster size)
+        self.pool = {fitz.PDF_WIDGET_TYPE_TEXT: [], fitz.PDF_WIDGET_TYPE_CHECKBOX: []}
+
+    def show_page(self, page_num, widget):
+        """Gives a rendered page editors for its fields (once) and places them."""
+        if page_num not in self.page_editors:
+            fields = self.reader.form_index.page_fields(page_num)
+            if not fields:
+                return
+            self.page_editors[page_num] = [self._take_editor(page_num, field, widget) for field in fields
+                                           if field.field_type in self.pool]
+        self.place_page(page_num, widget)
+
+    def place_page(self, page_num, widget):
+        """Moves a page's editors onto its current raster; nothing happens if the geometry is unchanged."""
+        editors = self.page_editors.get(page_num)
+        if not editors:
+            return
+        pixmap_size = widget.raster_size()
+        geometry = (widget, self.reader.zoom_level, self.reader.rotation, widget.size(), pixmap_size)
+        if self.placed_for.get(page_num) == geometry:
+            return
+        self.placed_for[page_num] = geometry
+        x_offset = (widget.width() - pixmap_size.width()) // 2
+        y_offset = (widget.height() - pixmap_size.height()) // 2
+        # Transformation matrix (must match the one used for pixmap rendering)
+        matrix = fitz.Matrix(self.reader.zoom_level, self.reader.zoom_level).prerotate(self.reader.rotation)
+        for editor in editors:
+            rect = editor.pdf_field.rect * matrix
+            if editor.parent() is not widget:
+                editor.setParent(widget) # Same page number, new widget (e.g. after a reorder)
+            if isinstance(editor, QCheckBox):
+                size = min(int(rect.width), int(rect.height))
+                editor.setGeometry(int(rect.x0 + x_offset), int(rect.y0 + y_offset), size, size)
+            else:
+                editor.setGeometry(int(rect.x0 + x_offset), int(rect.y0 + y_offset), int(rect.width), int(rect.height))
+            editor.show()
+
+    def release_page(self, page_num):
+        """Returns an off-screen page's editors to the pool."""
+        self.placed_for.pop(page_num, None)
+        for editor in self.page_editors.pop(page_num, []):
+            editor.hide() # A focused line edit reports editingFinished to its field first
+            editor.pdf_field = None
+            editor.setParent(self.holder)
+            self.pool[_editor_type(editor)].append(editor)
+
+    def release_all(self):
+        """After page edits or opening a file: every field object is stale."""
+        for page_num in list(self.page_editors):
+            self.release_page(page_num)
+
+    def _take_editor(self, page_num, field, widget):
+        pool = self.pool[field.field_type]
+        editor = pool.pop() if pool else self._new_editor(field.field_type)
+        editor.setParent(widget)
+        editor.blockSignals(True) # Loading the value is not an edit
+        if isinstance(editor, QCheckBox):
+            editor.setChecked(field.field_value == "Yes")  # Assuming "Yes"/"Off" for PDF checkboxes
+        else:
+            editor.setText(field.field_value or "")
+            editor.setCursorPosition(0)
+        editor.blockSignals(False)
+        editor.pdf_field = field
+        editor.page_num = page_num
+        return editor
+
+    def _new_editor(self, field_type):
+        if field_type == fitz.PDF_WIDGET_TYPE_CHECKBOX:
+            editor = QCheckBox(self.holder)
+            editor.stateChanged.connect(lambda state, e=editor: self._edited(e, "Yes" if e.isChecked() else "Off"))
+        else:
+            editor = QLineEdit(self.holder)
+            editor.setStyleSheet("border: 1px solid blue; background: transparent;")
+            editor.editingFinished.connect(lambda e=editor: self._edited(e, e.text()))
+        editor.pdf_field = None
+        return editor
+
+    def _edited(self, editor, value):
+        field = editor.pdf_field
+        if field is not None and value != (field.field_value or ""):
+            self.reader._update_pdf_field(editor.page_num, field, value)
+
+
+def _editor_type(editor):
+    return fitz.PDF_WIDGET_TYPE_CHECKBOX if isinstance(editor, QCheckBox) else fitz.PDF_WIDGET_TYPE_TEXT
@@ -0,0 +1,171 @@
+"""
+Form fields, indexed by page and by name without keeping fitz.Widget objects.
+
+A FormIndex holds a small FormField record (xref, name, type, value, rect) per
+widget of the pages scanned so far; the live widget is only loaded, by xref, when a
+value is written. Bulk operations go page by page: every field filled on a page is
+written and its appearance regenerated while that page is loaded once. A mail merge
+indexes the template once and reuses that index for every record, since each copy
+of the template has the same xrefs, so no page is rescanned per record.
+"""
+import csv
+import json
+import os
+
+import fitz  # PyMuPDF
+
+from pdf_page_edits import remap_keys
+from pdf_render import worker_document
+
+CHECKBOX_ON_VALUES = ("1", "on", "true", "x", "yes")
+
+
+class FormField:
+    __slots__ = ("xref", "field_name", "field_type", "field_value", "rect")
+
+    def __init__(self, widget):
+        self.xref = widget.xref
+        self.field_name = widget.field_name
+        self.field_type = widget.field_type
+        self.field_value = widget.field_value
+        self.rect = widget.rect
+
+
+class FormIndex:
+    def __init__(self):
+        self.by_page = {} # page_num -> [FormField] for the pages scanned so far
+        self._by_name = None # name -> [(page_num, FormField)], built on demand
+
+    def clear(self):
+        self.by_page = {}
+        self._by_name = None
+
+    def scan_page(self, page):
+        self.by_page[page.number] = [FormField(widget) for widget in page.widgets()]
+        self._by_name = None
+
+    def scan_all(self, pdf_document):
+        """Scans the pages not scanned yet, e.g. before a bulk fill."""
+        for page_num in range(pdf_document.page_count):
+            if page_num not in self.by_page:
+                self.scan_page(pdf_document.load_page(page_num))
+
+    def page_fields(self, page_num):
+        return self.by_page.get(page_num, [])
+
+    def pages_with_fields(self):
+        return {page_num for page_num, fields in self.by_page.items() if fields}
+
+    def by_name(self):
+        if self._by_name is None:
+            self._by_name = {}
+            for page_num, fields in self.by_page.items():
+                for field in fields:
+                    self._by_name.setdefault(field.field_name, []).append((page_num, field))
+        return self._by_name
+
+    def remap_pages(self, new_page_of):
+        """
+        After page edits (see pdf_page_edits): pages known to have no fields keep that
+        under their new number, pages with fields are forgotten and rescanned when needed.
+        """
+        self.by_page = remap_keys({p: [] for p, fields in self.by_page.items() if not fields}, new_page_of)
+        self._by_name = None
+
+
+def _value_for(widget, value):
+    """
+    A record's value as the widget takes it: checkboxes accept yes/no style values,
+    a radio button is on if the value names its on state.
+    """
+    if widget.field_type == fitz.PDF_WIDGET_TYPE_CHECKBOX:
+        on = value if isinstance(value, bool) else \
+            str(value).strip().lower() in CHECKBOX_ON_VALUES or str(value) == widget.on_state()
+        return widget.on_state() if on else "Off"
+    if widget.field_type == fitz.PDF_WIDGET_TYPE_RADIOBUTTON:
+        return widget.on_state() if str(value) == widget.on_state() else "Off"
+    return "" if value is None else str(value)
+
+
+def fill_fields(pdf_document, fields_by_name, values):
+    """
+    Writes values ({field name: value}) into the fields of fields_by_name ({name:
+    [(page_num, FormField)]}, see FormIndex.by_name) and their records. Returns
+    (pages changed, names without a field).
+    """
+    by_page = {}
+    unknown = []
+    for name, value in values.items():
+        targets = fields_by_name.get(name)
+        if not targets:
+            unknown.append(name)
+            continue
+        for page_num, field in targets:
+            by_page.setdefault(page_num, []).append((field, value))
+    for page_num, page_targets in by_page.items():
+        page = pdf_document.load_page(page_num) # Must outlive the widgets' update()
+        for field, value in page_targets:
+            widget = page.load_widget(field.xref)
+            widget.field_value = _value_for(widget, value)
+            widget.update()
+            field.field_value = widget.field_value
+    return sorted(by_page), unknown
+
+
+def field_values(pdf_document):
+    """{field name: value} of every form field in the document, in one pass over the pages."""
+    values = {}
+    for page in pdf_document:
+        for widget in page.widgets():
+            values[widget.field_name] = widget.field_value
+    return values
+
+
+def read_records(file_name):
+    """Records ({field name: value}) from a JSON object or list of objects, or a CSV file with a header row."""
+    if file_name.lower().endswith(".csv"):
+        with open(file_name, newline="", encoding="utf-8-sig") as f:
+            return list(csv.DictReader(f))
+    with open(file_name, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    records = data if isinstance(data, list) else [data]
+    if not all(isinstance(record, dict) for record in records):
+        raise ValueError("Expected a JSON object or a list of objects")
+    return records
+
+
+def write_values(values, file_name):
+    """Writes {field name: value} as JSON, or as a one-record CSV if file_name ends in .csv."""
+    if file_name.lower().endswith(".csv"):
+        with open(file_name, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(values))
+            writer.writeheader()
+            writer.writerow(values)
+    else:
+        with open(file_name, "w", encoding="utf-8") as f:
+            json.dump(values, f, indent=2)
+
+
+def mail_merge_job(source, records, output_pattern):
+    """
+    Worker-process job: writes one filled copy of the document (see
+    RenderScheduler.document_source) per record. output_pattern is formatted with n
+    (1-based record number) and the record's fields, e.g. "out/letter_{n:05d}.pdf".
+    Returns the number of files written.
+    """
+    template = worker_document(source).tobytes()
+    template_doc = fitz.open("pdf", template)
+    index = FormIndex()
+    index.scan_all(template_doc)
+    fields_by_name = index.by_name()
+    template_doc.close()
+    for n, record in enumerate(records, 1):
+        doc = fitz.open("pdf", template)
+        fill_fields(doc, fields_by_name, record)
+        file_name = output_pattern.format_map({**record, "n": n})
+        directory = os.path.dirname(file_name)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        doc.save(file_name, garbage=1, deflate=True)
+        doc.close()
+    return len(records)
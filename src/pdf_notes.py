@@ -0,0 +1,132 @@
+"""
+Notes (the reader's text annotations) without Qt: matching, the sidecar and writing
+them into PDF pages. Shared by the viewer (through pdf_utils) and the batch CLI.
+"""
+import math
+import uuid
+
+import fitz  # PyMuPDF
+
+# A note is (x, y, text, note_id). The ID is stored in the sidecar and as the PDF text
+# annotation's unique name (/NM), so notes are matched by a dict lookup instead of
+# comparing every note with every annotation. IDs only need to be unique within a page;
+# notes from older sidecars have an empty ID until the next save assigns one.
+
+def new_note_id():
+    return "pdfreader-" + uuid.uuid4().hex
+
+def set_annot_note_id(pdf_document, annot, note_id):
+    pdf_document.xref_set_key(annot.xref, "NM", fitz.get_pdf_str(note_id))
+
+class NoteMatcher:
+    """
+    Hash index over a page's notes or annotations. Lookups go by ID; items without an ID
+    (written before IDs existed, or by other tools) fall back to the same text within 1pt,
+    found by probing the neighbouring 1pt grid cells instead of scanning the page.
+    """
+    def __init__(self):
+        self.by_id = {}
+        self.by_cell = {} # (text, floor(x), floor(y)) -> [(x, y, note_id, value)]
+
+    def add(self, x, y, text, note_id, value):
+        if note_id:
+            self.by_id[note_id] = value
+        self.by_cell.setdefault((text, math.floor(x), math.floor(y)), []).append((x, y, note_id, value))
+
+    def find(self, x, y, text, note_id=None):
+        if note_id and note_id in self.by_id:
+            return self.by_id[note_id]
+        cell_x, cell_y = math.floor(x), math.floor(y)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for other_x, other_y, other_id, value in self.by_cell.get((text, cell_x + dx, cell_y + dy), ()):
+                    # Two different IDs are two notes, even at the same spot
+                    if note_id and other_id and note_id != other_id:
+                        continue
+                    if abs(other_x - x) < 1 and abs(other_y - y) < 1:
+                        return value
+        return None
+
+def page_text_annots(page):
+    """NoteMatcher over a page's PDF text annotations (values are the fitz.Annot objects)."""
+    matcher = NoteMatcher()
+    for annot in page.annots(types=[fitz.PDF_ANNOT_TEXT]):
+        pos = annot.rect.top_left
+        matcher.add(pos.x, pos.y, annot.info.get("content", ""), annot.info.get("id", ""), annot)
+    return matcher
+
+def scan_page_annotations(page):
+    """Returns the (x, y, text, note_id) entries for the text annotations stored in one PDF page."""
+    entries = []
+    for annot in page.annots(types=[fitz.PDF_ANNOT_TEXT]):
+        pos = annot.rect.top_left
+        entries.append((pos.x, pos.y, annot.info.get("content", ""), annot.info.get("id", "")))
+    return entries
+
+def merge_annotations(page_annotations, new_entries):
+    """Appends entries to a page's list unless the same note (by ID, or text within 1pt) is there already."""
+    matcher = NoteMatcher()
+    for index, (x, y, text, note_id) in enumerate(page_annotations):
+        matcher.add(x, y, text, note_id, index)
+    for x, y, text, note_id in new_entries:
+        index = matcher.find(x, y, text, note_id)
+        if index is None:
+            matcher.add(x, y, text, note_id, len(page_annotations))
+            page_annotations.append((x, y, text, note_id))
+        elif note_id and not page_annotations[index][3]:
+            page_annotations[index] = page_annotations[index][:3] + (note_id,) # Adopt the PDF's ID
+    return page_annotations
+
+def load_sidecar_annotations(sidecar, status_bar=None):
+    """Reads the AnnotationSidecar (snapshot plus journal) only; no PDF pages are touched."""
+    annotations = {}
+    try:
+        for page_num, entries in sidecar.load().items():
+            annotations[page_num] = merge_annotations([], entries)
+    except Exception as e:
+        if status_bar:
+            status_bar.showMessage(f"Error loading JSON annotations: {str(e)}")
+    return annotations
+
+def write_notes_to_document(pdf_document, annotations, progress=None):
+    """
+    Adds the notes that are missing from their PDF pages, joined by ID per page, and
+    gives notes without an ID one. Annotations already in the PDF with the note's ID
+    are left untouched. Returns the pages whose PDF annotations changed.
+    progress(i) is called before each page.
+    """
+    changed_pages = []
+    for i, (page_num, page_notes) in enumerate(annotations.items()):
+        if progress: progress(i)
+        page = pdf_document.load_page(page_num)
+        existing = page_text_annots(page)
+        changed = False
+        for index, (x, y, text, note_id) in enumerate(page_notes):
+            annot = existing.find(x, y, text, note_id)
+            if not note_id:
+                note_id = (annot.info.get("id") if annot is not None else "") or new_note_id()
+                page_notes[index] = (x, y, text, note_id)
+            if annot is None:
+                add_note_annot(pdf_document, page, page_notes[index])
+                changed = True
+            elif annot.info.get("id") != note_id:
+                set_annot_note_id(pdf_document, annot, note_id) # Annotation written before note IDs
+                changed = True
+        if changed:
+            changed_pages.append(page_num)
+    return changed_pages
+
+def add_note_annot(pdf_document, page, note):
+    """Writes a note into the page as a red PDF text annotation carrying the note's ID."""
+    x, y, text, note_id = note
+    annot = page.add_text_annot(fitz.Point(x, y), text)
+    annot.set_colors(stroke=(1, 0, 0)); annot.update()
+    set_annot_note_id(pdf_document, annot, note_id)
+    return annot
+
+def delete_note_annot(page, note):
+    """Deletes the PDF text annotation of a note, if the page has one."""
+    x, y, text, note_id = note
+    annot = page_text_annots(page).find(x, y, text, note_id)
+    if annot is not None:
+        page.delete_annot(annot)
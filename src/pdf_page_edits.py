@@ -0,0 +1,121 @@
+"""
+Page-index mappings for insert, delete and move edits, and page lists as typed.
+
+Each function returns new_page_of(old_page) -> new page number, or None for a
+deleted page. Batch edits are described by the new page order instead (see
+order_mapping). Everything keyed by page number (annotations, cached rasters, scan
+state, search hits) is remapped through the same function instead of being rebuilt.
+"""
+
+
+def insert_mapping(page_num):
+    """A page was inserted at page_num: later pages shift down by one."""
+    return lambda n: n + 1 if n >= page_num else n
+
+
+def delete_mapping(page_num):
+    """page_num was deleted: later pages shift up by one."""
+    return lambda n: None if n == page_num else (n - 1 if n > page_num else n)
+
+
+def move_mapping(from_page, to_page):
+    """The page at from_page now sits at to_page (its final index)."""
+    def new_page_of(n):
+        if n == from_page:
+            return to_page
+        if from_page < n <= to_page:
+            return n - 1
+        if to_page <= n < from_page:
+            return n + 1
+        return n
+    return new_page_of
+
+
+def order_mapping(order):
+    """
+    Mapping for a batch edit given as the new page order: order[new_page] is the old
+    page shown there, or None for a new blank page. Old pages missing from order are
+    deleted; a duplicated page maps to its first copy.
+    """
+    new_page_of = {}
+    for new_page, old_page in enumerate(order):
+        if old_page is not None:
+            new_page_of.setdefault(old_page, new_page)
+    return new_page_of.get
+
+
+def select_pages(pdf_document, order):
+    """
+    Rewrites the document to order (old page numbers) with one select(). A page listed
+    more than once gets a full copy per repeat, with its own page object, contents and
+    annotations: select() alone would make the repeats references to the same page
+    object, so a note added to one copy would show on all of them.
+    """
+    selection = []
+    seen = set()
+    for page_num in order:
+        if page_num in seen:
+            pdf_document.fullcopy_page(page_num) # Appended at the end
+            selection.append(pdf_document.page_count - 1)
+        else:
+            seen.add(page_num)
+            selection.append(page_num)
+    pdf_document.select(selection)
+
+
+def remap_keys(mapping, new_page_of):
+    """Returns a copy of a {page: value} dict with keys remapped; deleted pages are dropped."""
+    remapped = {}
+    for page_num, value in mapping.items():
+        new_page = new_page_of(page_num)
+        if new_page is not None:
+            remapped[new_page] = value
+    return remapped
+
+
+def remap_set(pages, new_page_of):
+    return {new_page_of(p) for p in pages} - {None}
+
+
+def remap_list(values, new_page_of, page_count):
+    """Moves a per-page list to the new numbering; new pages (and copies) get None."""
+    remapped = [None] * page_count
+    for page_num, value in enumerate(values):
+        new_page = new_page_of(page_num)
+        if new_page is not None:
+            remapped[new_page] = value
+    return remapped
+
+
+def reorder_keys(mapping, order):
+    """Like remap_keys() for a batch edit; every copy of a duplicated page gets its own list."""
+    return {new_page: list(mapping[old_page]) for new_page, old_page in enumerate(order)
+            if old_page in mapping}
+
+
+def parse_page_ranges(text, total_pages):
+    """
+    Turns a page list as typed ("1-3,7,10-12", 1-based) into 0-based page numbers,
+    in the given order. "all" or nothing means every page; "5-" runs to the last
+    page and "-3" starts at the first. Raises ValueError for anything out of range.
+    """
+    text = text.strip().lower()
+    if text in ("", "all"):
+        return list(range(total_pages))
+    pages = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = (value.strip() for value in part.split("-", 1))
+            start = int(start) if start else 1
+            end = int(end) if end else total_pages
+        else:
+            start = end = int(part)
+        if not 1 <= start <= end <= total_pages:
+            raise ValueError(f"Invalid page range: {part}")
+        pages.extend(range(start - 1, end))
+    if not pages:
+        raise ValueError("No pages given")
+    return pages
@@ -0,0 +1,134 @@
+import math
+from bisect import bisect_right
+from itertools import accumulate
+
+# Rasters larger than this are rendered as TILE_SIZE x TILE_SIZE tiles, and only the
+# tiles inside the viewport are rasterized (e.g. 400% zoom, fit-width on a 4K screen)
+TILED_MIN_PIXELS = 4000000
+TILE_SIZE = 512
+
+
+def pixel_size(page_width, page_height, zoom_level, rotation):
+    """Size in pixels of a page raster, rounded the way MuPDF rounds pixmap bounds."""
+    if rotation % 180:
+        page_width, page_height = page_height, page_width
+    return (max(1, math.ceil(page_width * zoom_level - 0.001)),
+            max(1, math.ceil(page_height * zoom_level - 0.001)))
+
+
+def needs_tiling(width, height):
+    return width * height > TILED_MIN_PIXELS
+
+
+def visible_tiles(width, height, x0, y0, x1, y1, tile_size=TILE_SIZE):
+    """(column, row) of every tile of a width x height raster intersecting [x0, x1) x [y0, y1)."""
+    x0, y0 = max(0, x0), max(0, y0)
+    x1, y1 = min(width, x1), min(height, y1)
+    if x0 >= x1 or y0 >= y1:
+        return []
+    return [(column, row)
+            for row in range(y0 // tile_size, (y1 - 1) // tile_size + 1)
+            for column in range(x0 // tile_size, (x1 - 1) // tile_size + 1)]
+
+
+def tile_rect(column, row, width, height, tile_size=TILE_SIZE):
+    """(x0, y0, x1, y1) of a tile in raster pixels; edge tiles are cut to the raster."""
+    x0, y0 = column * tile_size, row * tile_size
+    return x0, y0, min(width, x0 + tile_size), min(height, y0 + tile_size)
+
+
+class PageLayout:
+    """
+    Geometry of the continuous view without touching any widget or PDF page.
+
+    Holds every page's size in PDF points (from page.rect) and, for the current
+    zoom and rotation, the pixel size and top offset of each page in the stacked
+    column. Finding the pages inside a viewport is a binary search over those
+    offsets, so it costs the same for 20 pages as for 2,000.
+    """
+    def __init__(self, page_sizes=None, spacing=10):
+        self.page_sizes = list(page_sizes or [])  # [(width, height)] in PDF points
+        self.spacing = spacing
+        self.zoom_level = None
+        self.rotation = None
+        self.pixel_sizes = []
+        self.offsets = []       # Top y of each page, relative to the first page
+        self.total_height = 0
+        self.max_width = 0      # Width of the column (the widest page)
+
+    @classmethod
+    def estimated(cls, pdf_document, spacing=10):
+        """
+        Layout that only loads the first page and assumes every page has its size.
+        Real sizes are filled in with set_page_size() as pages get scanned.
+        """
+        if not pdf_document.page_count:
+            return cls([], spacing)
+        rect = pdf_document.load_page(0).rect
+        return cls([(rect.width, rect.height)] * pdf_document.page_count, spacing)
+
+    def set_page_size(self, page_num, width, height):
+        """Records a page's real size. Returns True if it differed from the stored one."""
+        if self.page_sizes[page_num] == (width, height):
+            return False
+        self.page_sizes[page_num] = (width, height)
+        self.zoom_level = None  # Offsets are recomputed on the next update()
+        return True
+
+    def __len__(self):
+        return len(self.page_sizes)
+
+    # Page edits; offsets are recomputed on the next update()
+
+    def insert_page(self, page_num, width, height):
+        self.page_sizes.insert(page_num, (width, height))
+        self.zoom_level = None
+
+    def delete_page(self, page_num):
+        del self.page_sizes[page_num]
+        self.zoom_level = None
+
+    def move_page(self, from_page, to_page):
+        self.page_sizes.insert(to_page, self.page_sizes.pop(from_page))
+        self.zoom_level = None
+
+    def reorder_pages(self, order, blank_size):
+        """Batch edit: order[new_page] is the old page shown there, or None for a blank_size page."""
+        self.page_sizes = [blank_size if old_page is None else self.page_sizes[old_page] for old_page in order]
+        self.zoom_level = None
+
+    def update(self, zoom_level, rotation):
+        """Recomputes pixel sizes and offsets. Returns True if anything changed."""
+        if (zoom_level, rotation) == (self.zoom_level, self.rotation) and \
+           len(self.pixel_sizes) == len(self.page_sizes):
+            return False
+        self.zoom_level = zoom_level
+        self.rotation = rotation
+        # Documents have few distinct page sizes; each is converted once
+        sizes = {size: pixel_size(*size, zoom_level, rotation) for size in set(self.page_sizes)}
+        self.pixel_sizes = [sizes[size] for size in self.page_sizes]
+        self.offsets = list(accumulate((height + self.spacing for _, height in self.pixel_sizes), initial=0))
+        self.total_height = max(0, self.offsets.pop() - self.spacing)
+        self.max_width = max((width for width, _ in sizes.values()), default=0)
+        return True
+
+    def page_rect(self, page_num):
+        """(top, bottom) of a page in layout coordinates."""
+        top = self.offsets[page_num]
+        return top, top + self.pixel_sizes[page_num][1]
+
+    def page_at(self, y):
+        """Index of the page whose slot (page plus the gap below it) contains y."""
+        if not self.offsets:
+            return -1
+        return max(0, min(len(self.offsets) - 1, bisect_right(self.offsets, y) - 1))
+
+    def visible_range(self, top, bottom):
+        """Inclusive (first, last) indices of pages intersecting [top, bottom]."""
+        if not self.offsets:
+            return 0, -1
+        first = self.page_at(top)
+        if self.page_rect(first)[1] < top and first < len(self.offsets) - 1:
+            first += 1  # top falls in the gap below `first`
+        last = self.page_at(bottom)
+        return first, max(first, last)
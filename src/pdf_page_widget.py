@@ -1,21 +1,86 @@
 from PyQt6.QtWidgets import QLabel
+from PyQt6.QtGui import QPixmap, QPainter
+from PyQt6.QtCore import QRect, QSize
 
 class PDFPageWidget(QLabel):
     """
-    A custom QLabel that automatically repositions its child form fields
-    whenever it is resized.
+    A custom QLabel that paints a page's cached raster and then the selection,
+    annotations and search highlights over it in paintEvent, so changing an
+    overlay only repaints the widget instead of re-rendering the page.
+    Very large rasters are not held as one pixmap: in tiled mode the visible
+    tiles are painted from the render cache instead. It also repositions its
+    child form fields whenever it is resized.
     """
     def __init__(self, app_instance, page_num, parent=None):
         super().__init__(parent)
         self.app = app_instance
         self.page_num = page_num
+        self.page_pixmap = None # Raster shown in normal (untiled) mode
+        self._image_key = None # cacheKey() of the QImage page_pixmap was made from
+        self.display_size = None # Size the raster is drawn at (differs from page_pixmap while previewing)
+        self.tiled_size = None # Raster size while in tiled mode
+
+    def set_page_image(self, image, width=None, height=None):
+        """
+        Shows a page raster. If width/height are given and differ from the image (a raster
+        of another zoom level standing in as a preview), it is drawn scaled to that size.
+        """
+        self.tiled_size = None
+        if image.cacheKey() != self._image_key or self.page_pixmap is None:
+            self._image_key = image.cacheKey()
+            self.page_pixmap = QPixmap.fromImage(image)
+        self.display_size = QSize(width or image.width(), height or image.height())
+        if self.text():
+            self.setText("") # Clear an earlier error message
+        self.update()
+
+    def set_tiled(self, width, height):
+        """Switches to tiled mode for a width x height raster; tiles are painted in paintEvent."""
+        self.page_pixmap = None # Drop the full-page pixmap
+        self._image_key = None
+        self.display_size = None
+        self.tiled_size = QSize(width, height)
+
+    def raster_size(self):
+        """Size of the page raster shown (an empty QSize if nothing is shown)."""
+        if self.tiled_size is not None:
+            return self.tiled_size
+        return self.display_size if self.page_pixmap is not None else QSize()
+
+    def raster_rect(self):
+        """Where the raster is drawn: centred in the widget, like QLabel's AlignCenter."""
+        size = self.raster_size()
+        return QRect((self.width() - size.width()) // 2, (self.height() - size.height()) // 2,
+                     size.width(), size.height())
+
+    def clear(self):
+        self.page_pixmap = None
+        self._image_key = None
+        self.display_size = None
+        self.tiled_size = None
+        super().clear()
+
+    def paintEvent(self, event):
+        super().paintEvent(event) # Error text, if any
+        if self.raster_size().isEmpty():
+            return
+        painter = QPainter(self)
+        try:
+            if self.tiled_size is not None:
+                self.app._paint_page_tiles(self, painter, event.rect())
+            else:
+                # Scaled by Qt when previewing another zoom level's raster
+                painter.drawPixmap(self.raster_rect(), self.page_pixmap)
+            self.app._paint_page_overlays(self, painter)
+        finally:
+            painter.end()
 
     def resizeEvent(self, event):
         """Overrides the default resize event."""
         # First, let the parent QLabel handle its own resize logic.
         super().resizeEvent(event)
-        
+
         # Now, if form fields exist for this page, tell the main app to reposition them.
         # This check prevents errors when no PDF is loaded.
-        if self.page_num in self.app.field_widgets:
-            self.app._reposition_form_fields(self.page_num, self)
\ No newline at end of file
+        if self.page_num in self.app.form_editors.page_editors:
+            self.app._reposition_form_fields(self.page_num, self)
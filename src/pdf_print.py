@@ -0,0 +1,148 @@
+"""
+Printing at the printer's resolution, without blocking the window.
+
+Each page is rasterized by the render pool (see pdf_render_scheduler.py) at exactly
+the size it takes on paper, in bands of at most PRINT_BAND_PIXELS so a page at
+1200 dpi never needs one huge image. Bands may finish in any order; they are painted
+in order, and no more than PRINT_BANDS_AHEAD are requested or waiting at a time, so
+memory stays bounded whatever the resolution or the number of pages.
+"""
+import itertools
+
+from PyQt6.QtCore import QObject, QPointF, pyqtSignal
+from PyQt6.QtGui import QPainter
+
+from pdf_page_layout import pixel_size
+from pdf_render_scheduler import PRINT_JOB, PRINT_PRIORITY
+
+PRINT_BAND_PIXELS = 4000000 # About 12 MB per RGB band
+PRINT_BANDS_AHEAD = 6
+
+_job_ids = itertools.count()
+
+
+def fit_zoom(page_width, page_height, rotation, target_width, target_height):
+    """Zoom at which the (rotated) page fills target_width x target_height, keeping its aspect ratio."""
+    if rotation % 180:
+        page_width, page_height = page_height, page_width
+    return min(target_width / page_width, target_height / page_height)
+
+
+def print_bands(width, height, max_pixels=PRINT_BAND_PIXELS):
+    """Full-width (x0, y0, x1, y1) strips of a width x height raster, top to bottom."""
+    rows = max(1, max_pixels // width)
+    return [(0, y, width, min(height, y + rows)) for y in range(0, height, rows)]
+
+
+class PrintJob(QObject):
+    """
+    Sends pages to a QPrinter one band at a time. Call start(); the job reports
+    progress(pages printed) and finished(error message, "" on success).
+    """
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(str)
+
+    def __init__(self, reader, printer, pages):
+        super().__init__(reader)
+        self.scheduler = reader.render_scheduler
+        self.pdf_document = reader.pdf_document
+        self.rotation = reader.rotation
+        self.printer = printer
+        self.pages = pages
+        self.job_id = next(_job_ids)
+        self.painter = QPainter()
+        self.cancelled = False
+        self._done = False
+        self._plan = self._band_plan()
+        self._planned = 0    # Bands requested so far
+        self._next_band = 0  # Next band to paint
+        self._bands = {}     # Band number -> (page index, x, y, last band of its page)
+        self._images = {}    # Band number -> QImage waiting for the bands before it
+        self._printed_page = -1
+        self._requesting = False
+
+    def start(self):
+        if not self.painter.begin(self.printer):
+            self._finish("Failed to initialize printer")
+            return
+        self.scheduler.image_ready.connect(self._on_image_ready)
+        self.scheduler.render_failed.connect(self._on_render_failed)
+        self._request_more()
+
+    def cancel(self):
+        if self._done:
+            return
+        self.cancelled = True
+        self.printer.abort()
+        self._finish("Printing cancelled")
+
+    def _band_plan(self):
+        # Page sizes are read as the job gets to each page, not all up front
+        paint_rect = self.printer.pageLayout().paintRectPixels(self.printer.resolution())
+        for page_index, page_num in enumerate(self.pages):
+            rect = self.pdf_document.load_page(page_num).rect
+            zoom_level = fit_zoom(rect.width, rect.height, self.rotation, paint_rect.width(), paint_rect.height())
+            width, height = pixel_size(rect.width, rect.height, zoom_level, self.rotation)
+            x_offset = (paint_rect.width() - width) // 2
+            y_offset = (paint_rect.height() - height) // 2
+            bands = print_bands(width, height)
+            for band_index, clip in enumerate(bands):
+                yield page_num, zoom_level, clip, (page_index, x_offset, y_offset + clip[1], band_index == len(bands) - 1)
+
+    def _request_more(self):
+        if self._requesting:
+            return # Called back from request() by an inline render; the loop below carries on
+        self._requesting = True
+        try:
+            while not self._done and self._planned - self._next_band < PRINT_BANDS_AHEAD:
+                band = next(self._plan, None)
+                if band is None:
+                    break
+                page_num, zoom_level, clip, placement = band
+                band_number = self._planned
+                self._planned += 1
+                self._bands[band_number] = placement
+                self.scheduler.request((PRINT_JOB, self.job_id, band_number), page_num, zoom_level, self.rotation,
+                                       PRINT_PRIORITY, PRINT_JOB, clip)
+        finally:
+            self._requesting = False
+        if not self._done and self._next_band == self._planned:
+            self._finish("") # Nothing left to request or paint
+
+    def _on_image_ready(self, key, image):
+        if key[0] != PRINT_JOB or key[1] != self.job_id or self._done:
+            return
+        self._images[key[2]] = image
+        while self._next_band in self._images and not self._done:
+            self._paint_band(self._next_band, self._images.pop(self._next_band))
+            self._next_band += 1
+        if not self._done:
+            self._request_more()
+
+    def _paint_band(self, band, image):
+        page_index, x, y, last = self._bands.pop(band)
+        if page_index != self._printed_page:
+            if self._printed_page >= 0 and not self.printer.newPage():
+                self._finish("Failed to advance to next page")
+                return
+            self._printed_page = page_index
+        self.painter.drawImage(QPointF(x, y), image)
+        if last:
+            self.progress.emit(page_index + 1)
+
+    def _on_render_failed(self, key, error):
+        if key[0] == PRINT_JOB and key[1] == self.job_id and not self._done:
+            self._finish(f"Page {self.pages[self._bands[key[2]][0]] + 1}: {error}")
+
+    def _finish(self, error):
+        self._done = True
+        self.scheduler.retain(set(), PRINT_JOB) # Queued bands are not needed any more
+        try:
+            self.scheduler.image_ready.disconnect(self._on_image_ready)
+            self.scheduler.render_failed.disconnect(self._on_render_failed)
+        except TypeError:
+            pass # Never connected (the printer could not be opened)
+        if self.painter.isActive():
+            self.painter.end()
+        self._images.clear()
+        self.finished.emit(error)
@@ -1,14 +1,20 @@
 import sys
-from PyQt6.QtWidgets import QApplication
-from pdf_reader_app import PDFReader
 
 if __name__ == '__main__':
+    from pdf_cli import COMMANDS, main
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        # Batch mode (see pdf_cli.py): runs without Qt, so no display is needed
+        sys.exit(main(sys.argv[1:]))
+
+    from PyQt6.QtWidgets import QApplication
+    from pdf_reader_app import PDFReader
+
     # Set up the application environment
     app = QApplication(sys.argv)
-    QApplication.setQuitOnLastWindowClosed(True) 
-    
+    QApplication.setQuitOnLastWindowClosed(True)
+
     # Launch the main application class
     reader = PDFReader()
     reader.show()
-    
-    sys.exit(app.exec())
\ No newline at end of file
+
+    sys.exit(app.exec())
@@ -1,17 +1,50 @@
+import os
 import sys
+import tempfile
+import time
 import fitz  # PyMuPDF
-from PyQt6.QtWidgets import (QInputDialog, QMessageBox, QLabel, QMenu, QWidgetAction, 
-                            QFileDialog, QApplication, QListWidgetItem, QLineEdit, 
-                            QCheckBox) # <-- QCheckBox added here!
-from PyQt6.QtGui import QPixmap, QImage, QPainter, QPen, QColor, QAction, QIcon
-from PyQt6.QtCore import Qt, QRectF, QPoint 
+from PyQt6.QtWidgets import (QInputDialog, QMessageBox, QMenu, QWidgetAction, 
+                            QFileDialog, QApplication, QListWidgetItem, QProgressDialog, QSizePolicy)
+from PyQt6.QtGui import QImage, QPen, QColor, QAction, QIcon
+from PyQt6.QtCore import Qt, QRectF, QPoint, QEvent, QTimer
+from PyQt6.QtPrintSupport import QPrinter, QPrintDialog
 
 # Import UI elements and utilities
 from pdf_reader_ui import PDFReaderUI # Import the base UI class
-from pdf_utils import (load_annotations, save_annotations, search_text, 
-                      next_search_result, prev_search_result, add_page, 
+from pdf_page_widget import PDFPageWidget
+from pdf_edit_journal import EditJournal
+from pdf_form_editors import FormFieldEditors
+from pdf_forms import FormIndex, fill_fields, field_values, read_records, write_values, mail_merge_job
+from pdf_annotation_sidecar import AnnotationSidecar
+from pdf_annotation_index import AnnotationIndex, NOTE_BOX_WIDTH, NOTE_BOX_HEIGHT, NOTE_HIT_RADIUS
+from pdf_page_edits import (insert_mapping, delete_mapping, move_mapping, order_mapping,
+                            remap_keys, remap_set, remap_list, reorder_keys, parse_page_ranges)
+from pdf_page_layout import PageLayout, pixel_size, needs_tiling, visible_tiles, tile_rect
+from pdf_render import pixel_to_page_matrix
+from pdf_render_cache import PageRenderCache, cache_key, tile_key, is_page_key
+from pdf_render_scheduler import RenderScheduler, PREFETCH_PRIORITY, TILE_JOB
+from pdf_thumbnails import ThumbnailLoader
+from pdf_search import SearchResults, load_or_build_index_job
+from pdf_export import PRINT_VECTOR, pdf_spooler, print_modes, print_pages_job
+from pdf_print import PrintJob
+from pdf_save import SAVE_INCREMENTAL, SAVE_OPTIMIZED, save_modes, save_document_job, size_text
+from pdf_notes import (load_sidecar_annotations, scan_page_annotations, merge_annotations,
+                       new_note_id, write_notes_to_document)
+from pdf_utils import (save_annotations, search_text, 
+                      cancel_search, handle_search_chunk, next_search_result, prev_search_result, add_page, 
                       remove_page, move_page_up, move_page_down, 
-                      handle_thumbnail_reorder)
+                      handle_thumbnail_reorder, delete_pages, duplicate_pages, move_pages,
+                      insert_blank_pages, add_note, remove_note, undo_edit, redo_edit)
+
+# Quiet period after the last zoom change before pages are re-rasterized
+ZOOM_SETTLE_MS = 150
+# Minimum interval between view updates while the window is being resized
+RESIZE_THROTTLE_MS = 30
+# Single-page prefetch: pages rendered ahead in the reading direction (growing while the
+# reader keeps turning the same way) and behind it
+PREFETCH_AHEAD = 2
+PREFETCH_MAX_AHEAD = 4
+PREFETCH_BEHIND = 1
 
 
 class PDFReader(PDFReaderUI):
@@ -26,8 +59,25 @@ class PDFReader(PDFReaderUI):
         self.zoom_level = 1.0
         self.rotation = 0
         self.annotations = {}
-        self.search_results = []
-        self.current_search_index = -1
+        self.annotation_sidecar = None # pdf_annotation_sidecar.AnnotationSidecar of the open file
+        self.disk_page_numbers = None # After unsaved page edits: each page's number in the file on disk (None if not in it)
+        self.annotation_index = AnnotationIndex() # Per-page grids over the notes, for hit tests and painting
+        self.search_results = SearchResults() # Hits keyed by page, plus the current result
+        self.search_index = None # pdf_search.SearchIndex once the background build/load finishes
+        self.pages_edited = False # Page order changed since opening (a late index would not match)
+        self.pending_thumbnail_moves = [] # (from_page, to_page) of a thumbnail drop not applied yet
+        self.edit_journal = EditJournal() # Undo/redo of page and annotation edits
+        self.save_future = None # Full save running in the task worker (see pdf_save.py)
+        self.save_progress = None
+        self.print_job = None # pdf_print.PrintJob while pages are being sent to the printer
+        self.vector_print = None # (printer, pages) while a vector print runs in the task worker
+        self.original_file_replaced = False # A full save overwrote the open file: no incremental saves until reopened
+        # Streaming search state (see search_text in pdf_utils.py)
+        self.search_id = 0
+        self.search_term = ""
+        self.search_futures = []
+        self.search_next_page = 0
+        self.search_chunks_pending = 0
         self.pdf_file_path = ""
         self.annotation_mode = False
         
@@ -35,17 +85,69 @@ class PDFReader(PDFReaderUI):
         self.dark_mode = False           # Default to Light Mode
 
         # --- NEW FIELD STATE ---
-        self.form_fields = {} # Stores fields per page: {page_num: [fitz.Widget]}
-        self.field_widgets = {} # Stores temporary QLineEdit widgets for filling
+        self.form_index = FormIndex() # Form fields of the scanned pages, by page and by name
+        self.form_editors = FormFieldEditors(self) # Field editors of the pages on screen, pooled
         # -----------------------
         
+        # Lazy page scan: fields, PDF notes and exact page sizes are discovered when a
+        # page is first shown, and by a background pass that runs between events
+        self.scanned_pages = set()
+        self._scan_cursor = 0
+        self._relayout_pending = False
+        self.page_scan_timer = QTimer(self)
+        self.page_scan_timer.setInterval(0)
+        self.page_scan_timer.timeout.connect(self._scan_pages_step)
+        
+        # Progressive zoom: scaled previews first, one real render once zooming pauses
+        self.zoom_settle_timer = QTimer(self)
+        self.zoom_settle_timer.setSingleShot(True)
+        self.zoom_settle_timer.setInterval(ZOOM_SETTLE_MS)
+        self.zoom_settle_timer.timeout.connect(self.update_view)
+        
+        # Window resizes are throttled; fit modes follow the viewport size
+        self.zoom_fit_mode = None # 'width' or 'page' while a fit zoom is active
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(RESIZE_THROTTLE_MS)
+        self.resize_timer.timeout.connect(self._on_resize_settled)
+        
+        # Adjacent-page prefetch in single-page mode
+        self.reading_direction = 1
+        self.prefetch_ahead = PREFETCH_AHEAD
+        self.last_single_page = 0
+        
+        # Time-to-first-page of the last opened file (milliseconds)
+        self.open_started_at = None
+        self.time_to_first_page_ms = None
+        self.open_work_pending = False # Whole-file work waits for the first page (see _start_deferred_open_work)
+        
         # Text Selection State
         self.is_selecting_text = False
         self.selection_start_point = None
         self.selection_end_point = None   
         self.current_selection_page = -1  
         self.context_menu_page_widget = None 
-        self.page_widgets = [] # List to hold QLabel widgets for each page
+        self.page_widgets = {} # page_num -> PDFPageWidget, only for the pages on screen
+        self.spare_page_widgets = [] # Released page widgets, reused for the next pages shown
+        self.page_layout = PageLayout() # Page sizes and offsets for the virtualized continuous view
+        self.continuous_pages_shown = False # True while the container holds the whole page column
+        self.render_cache = PageRenderCache() # LRU of bare page rasters, see pdf_render_cache.py
+        self.displayed_pages = set() # Pages currently shown; background renders refresh only these
+        
+        # Rasterization runs in worker processes; results arrive through image_ready
+        self.render_scheduler = RenderScheduler(parent=self)
+        self.render_scheduler.image_ready.connect(self._on_page_image_ready)
+        self.render_scheduler.render_failed.connect(self._on_page_render_failed)
+        self.render_scheduler.task_finished.connect(self._on_background_task_finished)
+        self.render_scheduler.warm_up()
+        self.thumbnail_loader = ThumbnailLoader(self) # Lazy, disk-cached sidebar thumbnails
+        
+        # Page widgets are placed by hand (see _place_page_widget) and follow the container's size
+        self.pdf_container.installEventFilter(self)
+
+        # Continuous mode renders and evicts pages as the viewport scrolls
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self._on_scroll)
+        self.scroll_area.horizontalScrollBar().valueChanged.connect(self._drop_stale_render_jobs)
         
         # Ensure model logic is connected to UI events
         self.thumbnail_list.model().rowsMoved.connect(
@@ -63,20 +165,29 @@ class PDFReader(PDFReaderUI):
         )
         if file_name:
             try:
+                self.open_started_at = time.perf_counter()
+                self.time_to_first_page_ms = None
                 self.pdf_document = fitz.open(file_name)
                 self.pdf_file_path = file_name
                 self.total_pages = self.pdf_document.page_count
+                cancel_search(self)
                 self.current_page = 0
                 self.rotation = 0
-                self.search_results = []
-                self.current_search_index = -1
+                self.search_results = SearchResults()
+                self.search_index = None
+                self.pages_edited = False
                 self.annotation_mode = False
-                self.annotations = load_annotations(self.pdf_document, file_name)
-                self.form_fields = {}
-                for page_num in range(self.total_pages):
-                    page = self.pdf_document.load_page(page_num)
-                    self.form_fields[page_num] = list(page.widgets())
-
+                self.render_cache.clear()
+                self.displayed_pages = set()
+                self.render_scheduler.set_document(self.pdf_document, file_name)
+                # Only the sidecar is read here; PDF notes and fields are scanned per page
+                self.annotation_sidecar = AnnotationSidecar(file_name)
+                self.disk_page_numbers = None
+                self.annotations = load_sidecar_annotations(self.annotation_sidecar, self.status_bar)
+                self.annotation_index.invalidate()
+                self.edit_journal.clear()
+                self.original_file_replaced = False
+                self.reset_page_scan()
 
                 # Reset selection state
                 self.selection_start_point = None
@@ -85,15 +196,16 @@ class PDFReader(PDFReaderUI):
 
                 self.load_pages() 
                 self.update_view() 
-                self.load_thumbnails()
+                self.thumbnail_loader.reset(file_name)
                 self.load_toc()
+                self.open_work_pending = True
                 
                 # Enable buttons
                 for widget in [self.rotate_button, self.page_input, self.annotate_button, 
                                self.search_button, self.search_input, self.print_button, 
                                self.add_page_button, self.remove_page_button, self.save_button, 
                                self.view_mode_button, self.dark_mode_button, self.zoom_fit_width_button, 
-                               self.zoom_fit_page_button, self.properties_button]:
+                               self.zoom_fit_page_button, self.properties_button, self.forms_button]:
                     widget.setEnabled(True)
 
                 self.update_ui_on_page_change()
@@ -102,38 +214,160 @@ class PDFReader(PDFReaderUI):
             except Exception as e:
                 self.status_bar.showMessage(f"Error loading PDF: {str(e)}")
 
-    def _update_pdf_field(self, field, value):
+    def _update_pdf_field(self, page_num, field, value):
+        # Field records (pdf_forms.FormField) hold no fitz objects: the widget is loaded by xref
+        try:
+            page = self.pdf_document.load_page(page_num) # Must outlive live_field.update()
+            live_field = page.load_widget(field.xref)
+            live_field.field_value = value
+            live_field.update()
+            # Workers find the widget by its place on the page; xrefs can differ in their copies
+            widget_index = next(i for i, widget in enumerate(page.widgets()) if widget.xref == field.xref)
+            self.render_scheduler.record_edit("set_field", page_num, widget_index, live_field.field_value)
+        except Exception as e:
+            self.status_bar.showMessage(f"Error updating form field: {str(e)}")
+            return
         field.field_value = value
-        field.update()
+        # The field's appearance stream is part of the page raster
+        self.invalidate_render_cache(page_num)
         self.status_bar.showMessage("Form field updated")
         # Optional: self.save_pdf() or re-render the page if needed
 
     def load_pages(self):
-        # 1. Clear existing widgets
-        for widget in self.page_widgets:
-            self.pdf_layout.removeWidget(widget)
-            widget.deleteLater()
-        self.page_widgets = []
+        """
+        Sets up the page geometry of a newly opened document. No page widget is created
+        here: widgets exist only for the pages on screen (see _page_widget), and the
+        container's size comes from a single spacer, so opening costs the same for
+        5 pages as for 5,000.
+        """
+        self.form_editors.release_all()
+        self._release_all_pages()
+        self.continuous_pages_shown = False
         
         if not self.pdf_document:
+            self.page_layout = PageLayout()
+            self._set_page_spacer(0, 0)
             return
 
-        # 2. Create a new QLabel for every page
-        for page_num in range(self.total_pages):
-            page_widget = QLabel()
-            page_widget.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            page_widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu) 
-            page_widget.customContextMenuRequested.connect(self._show_context_menu)
-            page_widget.setProperty("page_num", page_num)
-            
-            # Connect custom mouse handlers (using lambdas to pass the widget reference)
-            page_widget.mousePressEvent = lambda event, w=page_widget: self._handle_page_mouse_press(event, w)
-            page_widget.mouseMoveEvent = lambda event, w=page_widget: self._handle_page_mouse_move(event, w) 
-            page_widget.mouseReleaseEvent = lambda event, w=page_widget: self._handle_page_mouse_release(event, w) 
-            page_widget.setMouseTracking(True)
-            
-            self.pdf_layout.addWidget(page_widget)
-            self.page_widgets.append(page_widget)
+        # Page sizes in points; slots are sized from these before anything is rendered.
+        # Every page starts with page 1's size and is corrected as the page scan reaches it.
+        self.page_layout = PageLayout.estimated(self.pdf_document, self.pdf_layout.spacing())
+
+    def _create_page_widget(self, page_num):
+        page_widget = PDFPageWidget(self, page_num, self.pdf_container)
+        page_widget.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        page_widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu) 
+        page_widget.customContextMenuRequested.connect(self._show_context_menu)
+        page_widget.setProperty("page_num", page_num)
+        
+        # Connect custom mouse handlers (using lambdas to pass the widget reference)
+        page_widget.mousePressEvent = lambda event, w=page_widget: self._handle_page_mouse_press(event, w)
+        page_widget.mouseMoveEvent = lambda event, w=page_widget: self._handle_page_mouse_move(event, w) 
+        page_widget.mouseReleaseEvent = lambda event, w=page_widget: self._handle_page_mouse_release(event, w) 
+        page_widget.setMouseTracking(True)
+        page_widget.setProperty("annotationMode", self.annotation_mode)
+        return page_widget
+
+    def _page_widget(self, page_num):
+        """The widget showing a page; a spare one is reused (or one created) if the page has none."""
+        widget = self.page_widgets.get(page_num)
+        if widget is None:
+            widget = self.spare_page_widgets.pop() if self.spare_page_widgets else self._create_page_widget(page_num)
+            widget.page_num = page_num
+            widget.setProperty("page_num", page_num)
+            self.page_widgets[page_num] = widget
+            self._place_page_widget(page_num, widget)
+            widget.show()
+        return widget
+
+    def _place_page_widget(self, page_num, widget):
+        """Puts a page widget in its slot: the column offset in continuous mode, centred otherwise."""
+        width, height = self.page_layout.pixel_sizes[page_num]
+        container = self.pdf_container
+        if self.continuous_pages_shown:
+            top = max(0, (container.height() - self.page_layout.total_height) // 2) + self.page_layout.offsets[page_num]
+        else:
+            top = max(0, (container.height() - height) // 2)
+        widget.setGeometry(max(0, (container.width() - width) // 2), top, width, height)
+
+    def _place_page_widgets(self):
+        if self.page_layout.pixel_sizes:
+            for page_num, widget in self.page_widgets.items():
+                self._place_page_widget(page_num, widget)
+
+    def _set_page_spacer(self, width, height):
+        """The container (and so the scroll range) is sized by one spacer, not by the page widgets."""
+        if (self.page_spacer.sizeHint().width(), self.page_spacer.sizeHint().height()) != (width, height):
+            self.page_spacer.changeSize(width, height, QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+            self.pdf_layout.invalidate()
+
+    def eventFilter(self, obj, event):
+        if obj is self.pdf_container and event.type() == QEvent.Type.Resize:
+            self._place_page_widgets()
+        return super().eventFilter(obj, event)
+
+    # --- INCREMENTAL PAGE EDITS ---
+    # Called by the page operations in pdf_utils after the fitz.Document was edited.
+    # Only the affected indices are touched; nothing is rebuilt. The few page widgets on
+    # screen are released and picked up again (from the remapped render cache) by the
+    # caller's update_view().
+
+    def page_inserted(self, page_num):
+        rect = self.pdf_document.load_page(page_num).rect
+        self._release_all_pages()
+        self._remap_page_state(insert_mapping(page_num))
+        self.page_layout.insert_page(page_num, rect.width, rect.height)
+        self.thumbnail_loader.page_inserted(page_num)
+
+    def page_removed(self, page_num):
+        self._release_all_pages()
+        self._remap_page_state(delete_mapping(page_num))
+        self.page_layout.delete_page(page_num)
+        self.thumbnail_loader.page_removed(page_num)
+
+    def page_moved(self, from_page, to_page, thumbnail_moved=False):
+        """from_page now sits at to_page; thumbnail_moved if the list already moved the row (drag and drop)."""
+        self._release_all_pages()
+        self._remap_page_state(move_mapping(from_page, to_page))
+        self.page_layout.move_page(from_page, to_page)
+        self.thumbnail_loader.page_moved(from_page, to_page, list_already_moved=thumbnail_moved)
+
+    def pages_reordered(self, order, thumbnails_reordered=False):
+        """
+        Batch edit (delete, duplicate, move or insert several pages at once): order[new_page]
+        is the old page shown there, or None for a new blank page. Everything keyed by page
+        number is remapped once.
+        """
+        self._release_all_pages()
+        self._remap_page_state(order_mapping(order), order)
+        blank_pages = [new_page for new_page, old_page in enumerate(order) if old_page is None]
+        blank_rect = self.pdf_document.load_page(blank_pages[0]).rect if blank_pages else None
+        self.page_layout.reorder_pages(order, (blank_rect.width, blank_rect.height) if blank_rect else None)
+        self.thumbnail_loader.pages_reordered(order, list_already_reordered=thumbnails_reordered)
+
+    def _remap_page_state(self, new_page_of, order=None):
+        """Moves everything keyed by page number to the new numbering (order is given for batch edits)."""
+        disk_pages = range(self.total_pages) if self.disk_page_numbers is None else self.disk_page_numbers
+        self.disk_page_numbers = remap_list(disk_pages, new_page_of, self.pdf_document.page_count)
+        self.total_pages = self.pdf_document.page_count
+        if order is None:
+            self.annotations = remap_keys(self.annotations, new_page_of)
+        else:
+            self.annotations = reorder_keys(self.annotations, order) # Duplicated pages keep their notes
+        self.render_cache.remap_pages(new_page_of)
+        self.render_scheduler.document_changed() # Workers replay the logged edit before the next render
+        self.displayed_pages = remap_set(self.displayed_pages, new_page_of)
+        # Page edits unbind every fitz.Page, so field objects are stale: pages that have
+        # fields are rescanned when next shown, pages known to have none stay scanned
+        self.form_editors.release_all()
+        self.scanned_pages = remap_set(self.scanned_pages - self.form_index.pages_with_fields(), new_page_of)
+        self.form_index.remap_pages(new_page_of)
+        self._scan_cursor = 0
+        self.page_scan_timer.start()
+        # A selection refers to widget coordinates of a page that may have moved
+        self.selection_start_point = None
+        self.selection_end_point = None
+        self.current_selection_page = -1
             
     # --- RENDERING AND COORDINATE LOGIC ---
     
@@ -142,11 +376,10 @@ class PDFReader(PDFReaderUI):
         page_num = page_widget.property("page_num")
         if page_num is None or self.pdf_document is None: return None
 
-        pixmap = page_widget.pixmap()
-        if not pixmap: return None
+        pixmap_size = page_widget.raster_size()
+        if pixmap_size.isEmpty(): return None
         
         label_size = page_widget.size()
-        pixmap_size = pixmap.size()
         x_offset_alignment = (label_size.width() - pixmap_size.width()) // 2
         y_offset_alignment = (label_size.height() - pixmap_size.height()) // 2
 
@@ -162,266 +395,440 @@ class PDFReader(PDFReaderUI):
         
         pdf_rect = fitz.Rect(rect_x0, rect_y0, rect_x1, rect_y1)
         
-        matrix = fitz.Matrix(self.zoom_level, self.zoom_level).prerotate(self.rotation)
-        try:
-            inverse_matrix = matrix.invert()
-        except ValueError:
-            self.status_bar.showMessage("Error: Cannot invert transformation matrix for selection.")
-            return None
-            
-        return pdf_rect * inverse_matrix
+        # Matrix.invert() inverts in place and returns a status code, not the inverse
+        page = self.pdf_document.load_page(page_num)
+        return pdf_rect * pixel_to_page_matrix(page, self.zoom_level, self.rotation)
+
+    def _get_page_image(self, page_num):
+        """
+        Returns the bare page raster for the current zoom/rotation. On a cache miss a
+        background render is queued and a stand-in is returned instead: an outdated
+        raster, one of another zoom level (drawn scaled) or a grey placeholder.
+        """
+        key = cache_key(page_num, self.zoom_level, self.rotation)
+        image = self.render_cache.get(key)
+        if image is None:
+            # While zoom keys are still arriving, only previews are shown (see _apply_zoom)
+            if not self.zoom_settle_timer.isActive():
+                self.render_scheduler.request(key, page_num, self.zoom_level, self.rotation)
+            image = self.render_cache.get_stale(key) or \
+                self.render_cache.find_preview(page_num, self.zoom_level, self.rotation) or \
+                self._placeholder_image(page_num)
+        return image
+
+    def _placeholder_image(self, page_num):
+        """A grey image with the size the real raster will have."""
+        page_width, page_height = self.page_layout.page_sizes[page_num]
+        width, height = pixel_size(page_width, page_height, self.zoom_level, self.rotation)
+        image = QImage(width, height, QImage.Format.Format_RGB888)
+        image.fill(QColor(220, 220, 220))
+        return image
+
+    def _on_page_image_ready(self, key, image):
+        if not is_page_key(key): return # Thumbnails and print bands have their own consumers
+        self.render_cache.put(key, image)
+        page_num = key[0]
+        # Ignore results for a zoom/rotation the user has already left
+        if key[:3] != cache_key(page_num, self.zoom_level, self.rotation):
+            return
+        widget = self.page_widgets.get(page_num)
+        if page_num in self.displayed_pages and widget is not None:
+            if len(key) > 3:
+                # A tile: repaint just its area
+                raster = widget.raster_size()
+                x0, y0, x1, y1 = tile_rect(key[3], key[4], raster.width(), raster.height())
+                widget.update(x0, y0, x1 - x0, y1 - y0)
+            else:
+                self.render_page_content(page_num, widget)
+            self._start_deferred_open_work()
+            if self.time_to_first_page_ms is None and page_num == self.current_page and self.open_started_at:
+                self.time_to_first_page_ms = (time.perf_counter() - self.open_started_at) * 1000
+                self.status_bar.showMessage(
+                    f"Opened: {self.pdf_file_path} | first page in {self.time_to_first_page_ms:.0f} ms"
+                )
+
+    def _on_page_render_failed(self, key, message):
+        if not is_page_key(key): return
+        page_num = key[0]
+        if page_num in self.displayed_pages and page_num in self.page_widgets:
+            self.page_widgets[page_num].setText(f"Error rendering page {page_num + 1}: {message}")
+            self._start_deferred_open_work()
+
+    def _start_deferred_open_work(self):
+        """
+        Starts the work that costs time in proportion to the file once a page is on
+        screen: on a busy machine it would otherwise compete with the first page for the CPU.
+        """
+        if self.open_work_pending:
+            self.open_work_pending = False
+            self.thumbnail_loader.start_background_work()
+            # Full-text index: read from the sidecar or built in a worker process
+            self.render_scheduler.submit_task(("search_index", self.pdf_file_path), load_or_build_index_job, self.pdf_file_path)
+
+    def _on_background_task_finished(self, tag, result, error):
+        if tag[0] == "search_index":
+            # Drop indexes of a file that is no longer open, or that predate page edits
+            if tag[1] != self.pdf_file_path or result is None or self.pages_edited:
+                return
+            self.search_index = result
+        elif tag[0] == "search":
+            handle_search_chunk(self, tag, result, error)
+        elif tag[0] == "save":
+            self._on_save_finished(tag, result, error)
+        elif tag[0] == "print":
+            self._on_vector_print_finished(tag, result, error)
+        elif tag[0] == "mail_merge":
+            if error:
+                self.status_bar.showMessage(f"Mail merge error: {error}")
+            else:
+                self.status_bar.showMessage(f"Mail merge: wrote {result} files to {tag[1]}")
+
+    def invalidate_render_cache(self, page_num=None):
+        """Call after editing the document: drops cached rasters (all pages if page_num is None)."""
+        if page_num is None:
+            self.render_cache.clear()
+        else:
+            self.render_cache.invalidate_page(page_num)
+        self.render_scheduler.document_changed()
+        self.thumbnail_loader.document_changed(page_num)
 
     def render_page_content(self, page_num, widget):
-        """Renders a single page's content, annotations, and search highlights."""
+        """Shows a single page's raster; overlays are painted by the widget (see _paint_page_overlays)."""
         if not self.pdf_document: return
         try:
-            page = self.pdf_document.load_page(page_num)
-            matrix = fitz.Matrix(self.zoom_level, self.zoom_level).prerotate(self.rotation)
-            pix = page.get_pixmap(matrix=matrix, alpha=False)
-        
-            img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format.Format_RGB888)
-            pixmap = QPixmap.fromImage(img)
+            if self._ensure_page_scanned(page_num):
+                self._schedule_relayout()
+            width, height = pixel_size(*self.page_layout.page_sizes[page_num], self.zoom_level, self.rotation)
+            if needs_tiling(width, height):
+                # Tiles are requested by _paint_page_tiles as they get exposed
+                widget.set_tiled(width, height)
+            else:
+                widget.set_page_image(self._get_page_image(page_num), width, height)
+            widget.update() # Overlays may have changed even if the raster did not
         
-            painter = QPainter(pixmap)
-            try:
-                # Text Selection Highlight (Redrawing logic uses self.selection_points)
-                if self.selection_start_point and self.selection_end_point and page_num == self.current_selection_page:
-                    start_x = self.selection_start_point.x()
-                    start_y = self.selection_start_point.y()
-                    end_x = self.selection_end_point.x()
-                    end_y = self.selection_end_point.y()
-                
-                    label_size = widget.size()
-                    pixmap_size = pixmap.size()
-                    x_offset_alignment = (label_size.width() - pixmap_size.width()) // 2
-                    y_offset_alignment = (label_size.height() - pixmap_size.height()) // 2
-                
-                    selection_rect = QRectF(
-                        min(start_x, end_x) - x_offset_alignment,
-                        min(start_y, end_y) - y_offset_alignment,
-                        abs(start_x - end_x),
-                        abs(start_y - end_y)
-                    )
-                
-                    painter.setPen(QPen(QColor(0, 0, 255, 100), 1, Qt.PenStyle.SolidLine))
-                    painter.setBrush(QColor(0, 0, 255, 50)) 
-                    painter.drawRect(selection_rect)
-
-                # Annotations (Red Text)
-                if page_num in self.annotations:
-                    pen = QPen(QColor(255, 0, 0), 2)
-                    painter.setPen(pen)
-                    font = painter.font()
-                    font.setPointSize(12)
-                    painter.setFont(font)
-                    for x, y, text in self.annotations[page_num]:
-                        scaled_x = x * self.zoom_level
-                        scaled_y = y * self.zoom_level
-                        painter.drawText(QRectF(scaled_x, scaled_y, 200, 50), Qt.TextFlag.TextWordWrap, text)
-            
-                # Search Highlights (Yellow Rectangle)
-                if self.search_results:
-                    page_highlights = []
-                    for i, result in enumerate(self.search_results):
-                        if result["page"] == page_num:
-                            is_current = (i == self.current_search_index)
-                            page_highlights.append({"rects": result["rects"], "is_current": is_current})
-
-                    if page_highlights:
-                        painter.setPen(Qt.PenStyle.NoPen)
-                        # Non-current
-                        painter.setBrush(QColor(255, 255, 0, 50)) 
-                        for hl in [h for h in page_highlights if not h["is_current"]]:
-                            for rect in hl["rects"]:
-                                scaled_rect = QRectF(
-                                    rect.x0 * self.zoom_level, rect.y0 * self.zoom_level,
-                                    (rect.x1 - rect.x0) * self.zoom_level, (rect.y1 - rect.y0) * self.zoom_level
-                                )
-                                painter.drawRect(scaled_rect)
-
-                        # Current
-                        painter.setBrush(QColor(255, 255, 0, 150))
-                        for hl in [h for h in page_highlights if h["is_current"]]:
-                            for rect in hl["rects"]:
-                                scaled_rect = QRectF(
-                                    rect.x0 * self.zoom_level, rect.y0 * self.zoom_level,
-                                    (rect.x1 - rect.x0) * self.zoom_level, (rect.y1 - rect.y0) * self.zoom_level
-                                )
-                                painter.drawRect(scaled_rect)
-            finally:
-                painter.end()
-        
-            widget.setPixmap(pixmap)
-        
-            # NOW render form fields (after setPixmap, so offsets are accurate)
-            self._render_form_fields(page_num, widget)
+            # Field editors are created once per page and only moved when the geometry changes
+            self.form_editors.show_page(page_num, widget)
         
         except Exception as e:
             widget.setText(f"Error rendering page {page_num + 1}: {str(e)}")
 
-    def render_single_page(self):
-        if not self.page_widgets: return
-        for i, widget in enumerate(self.page_widgets):
-            if i == self.current_page:
-                self.render_page_content(self.current_page, widget)
-                widget.setVisible(True)
+    def _paint_page_tiles(self, widget, painter, rect):
+        """
+        Paints the tiles of a tiled page that intersect rect (the exposed area) from the
+        render cache and queues the missing ones; called from PDFPageWidget.paintEvent.
+        """
+        page_num = widget.page_num
+        raster = widget.raster_size()
+        settling = self.zoom_settle_timer.isActive()
+        preview = None
+        for column, row in visible_tiles(raster.width(), raster.height(), rect.left(), rect.top(),
+                                         rect.right() + 1, rect.bottom() + 1):
+            x0, y0, x1, y1 = tile_rect(column, row, raster.width(), raster.height())
+            key = tile_key(page_num, self.zoom_level, self.rotation, column, row)
+            image = self.render_cache.get(key)
+            if image is None:
+                if not settling:
+                    self.render_scheduler.request(key, page_num, self.zoom_level, self.rotation,
+                                                  kind=TILE_JOB, clip=(x0, y0, x1, y1))
+                image = self.render_cache.get_stale(key)
+            if image is not None:
+                painter.drawImage(x0, y0, image)
+                continue
+            # Missing tile: the matching part of a scaled whole-page raster, else grey
+            if preview is None:
+                preview = self.render_cache.find_preview(page_num, self.zoom_level, self.rotation) or QImage()
+            if preview.isNull():
+                painter.fillRect(x0, y0, x1 - x0, y1 - y0, QColor(220, 220, 220))
             else:
-                widget.setVisible(False)
+                scale_x = preview.width() / raster.width()
+                scale_y = preview.height() / raster.height()
+                painter.drawImage(QRectF(x0, y0, x1 - x0, y1 - y0), preview,
+                                  QRectF(x0 * scale_x, y0 * scale_y, (x1 - x0) * scale_x, (y1 - y0) * scale_y))
+
+    def _visible_tile_keys(self):
+        """Keys of the tiles currently inside the viewport, over all displayed tiled pages."""
+        keys = set()
+        for page_num, widget in self.page_widgets.items():
+            if widget.tiled_size is None: continue
+            rect = widget.visibleRegion().boundingRect()
+            for column, row in visible_tiles(widget.tiled_size.width(), widget.tiled_size.height(),
+                                             rect.left(), rect.top(), rect.right() + 1, rect.bottom() + 1):
+                keys.add(tile_key(page_num, self.zoom_level, self.rotation, column, row))
+        return keys
+
+    def _paint_page_overlays(self, widget, painter):
+        """
+        Paints text selection, annotations and search highlights over a page's raster.
+        Called from PDFPageWidget.paintEvent, so it must not touch PyMuPDF.
+        """
+        page_num = widget.page_num
+        label_size = widget.size()
+        pixmap_size = widget.raster_size()
+        x_offset_alignment = (label_size.width() - pixmap_size.width()) // 2
+        y_offset_alignment = (label_size.height() - pixmap_size.height()) // 2
+
+        # Text Selection Highlight (selection points are in widget coordinates)
+        if self.selection_start_point and self.selection_end_point and page_num == self.current_selection_page:
+            start_x = self.selection_start_point.x()
+            start_y = self.selection_start_point.y()
+            end_x = self.selection_end_point.x()
+            end_y = self.selection_end_point.y()
+            selection_rect = QRectF(min(start_x, end_x), min(start_y, end_y), abs(start_x - end_x), abs(start_y - end_y))
+            painter.setPen(QPen(QColor(0, 0, 255, 100), 1, Qt.PenStyle.SolidLine))
+            painter.setBrush(QColor(0, 0, 255, 50)) 
+            painter.drawRect(selection_rect)
+
+        # Annotations and highlights are in page raster coordinates
+        painter.translate(x_offset_alignment, y_offset_alignment)
+
+        # Annotations (Red Text), only those whose box is in the visible part of the page
+        visible = widget.visibleRegion().boundingRect()
+        if page_num in self.annotations and not visible.isEmpty():
+            pen = QPen(QColor(255, 0, 0), 2)
+            painter.setPen(pen)
+            font = painter.font()
+            font.setPointSize(12)
+            painter.setFont(font)
+            page_notes = self.annotations[page_num]
+            grid = self.annotation_index.grid(page_num, page_notes)
+            for index in grid.boxes_in((visible.left() - x_offset_alignment) / self.zoom_level,
+                                       (visible.top() - y_offset_alignment) / self.zoom_level,
+                                       (visible.right() + 1 - x_offset_alignment) / self.zoom_level,
+                                       (visible.bottom() + 1 - y_offset_alignment) / self.zoom_level,
+                                       self.zoom_level):
+                x, y, text, _ = page_notes[index]
+                scaled_x = x * self.zoom_level
+                scaled_y = y * self.zoom_level
+                painter.drawText(QRectF(scaled_x, scaled_y, NOTE_BOX_WIDTH, NOTE_BOX_HEIGHT), Qt.TextFlag.TextWordWrap, text)
+    
+        # Search Highlights (Yellow Rectangle)
+        page_hits = self.search_results.rects_for(page_num)
+        if page_hits:
+            painter.setPen(Qt.PenStyle.NoPen)
+            is_current = (page_num == self.search_results.current_page())
+            painter.setBrush(QColor(255, 255, 0, 150 if is_current else 50))
+            for rect in page_hits:
+                scaled_rect = QRectF(
+                    rect.x0 * self.zoom_level, rect.y0 * self.zoom_level,
+                    (rect.x1 - rect.x0) * self.zoom_level, (rect.y1 - rect.y0) * self.zoom_level
+                )
+                painter.drawRect(scaled_rect)
+
+    def _update_selection_page(self, page_num):
+        """Repaints the overlay of one page (no re-render) after the selection changed."""
+        if page_num in self.page_widgets:
+            self.page_widgets[page_num].update()
+
+    def _apply_page_layout(self):
+        """
+        Sizes the container for the current zoom, rotation and view mode (the whole column,
+        or the current page), so pages not rendered yet keep their slot and the scroll
+        range never jumps, and moves the widgets on screen into their slots. Returns True
+        if the page geometry changed.
+        """
+        changed = self.page_layout.update(self.zoom_level, self.rotation)
+        if self.continuous_pages_shown:
+            self._set_page_spacer(self.page_layout.max_width, self.page_layout.total_height)
+        elif 0 <= self.current_page < len(self.page_layout):
+            self._set_page_spacer(*self.page_layout.pixel_sizes[self.current_page])
+        if changed:
+            self._place_page_widgets()
+        return changed
+
+    def _release_page(self, page_num):
+        """Drops an off-screen page's pixmap and field editors and returns its widget to the spares."""
+        widget = self.page_widgets.pop(page_num, None)
+        if widget is None: return
+        self.form_editors.release_page(page_num)
+        widget.clear()
+        widget.hide()
+        self.spare_page_widgets.append(widget)
+
+    def _release_all_pages(self):
+        for page_num in list(self.page_widgets):
+            self._release_page(page_num)
+        self.displayed_pages = set()
+
+    def render_single_page(self):
+        if not self.total_pages: return
+        if self.continuous_pages_shown:
+            self.continuous_pages_shown = False
+            self.page_layout.zoom_level = None # Re-place the widgets for single-page mode
+        self._apply_page_layout()
+        for page_num in self.displayed_pages - {self.current_page}:
+            self._release_page(page_num)
+        self.displayed_pages = {self.current_page}
+        self._update_reading_direction()
+        self._drop_stale_render_jobs()
+        widget = self._page_widget(self.current_page)
+        self._place_page_widget(self.current_page, widget)
+        self.render_page_content(self.current_page, widget)
+        self._prefetch_adjacent_pages()
         self.scroll_area.verticalScrollBar().setValue(0)
         self.update_status_bar()
 
     def render_continuous_pages(self):
-        if not self.page_widgets: return
+        if not self.total_pages: return
     
-        # 1. Ensure all page widgets are visible and update the rotation once
-        for widget in self.page_widgets:
-            widget.setVisible(True)
+        # 1. Entering continuous mode: the container grows to the whole (empty) page column
+        if not self.continuous_pages_shown:
+            self.continuous_pages_shown = True
+            self.page_layout.zoom_level = None
+        layout_changed = self._apply_page_layout()
     
-        # 2. Identify visible area in the scroll viewport
-        viewport_rect = self.scroll_area.viewport().rect()
-        scroll_offset = self.scroll_area.verticalScrollBar().value()
+        # 2. Page offsets moved: keep the current page at the top of the viewport
+        if layout_changed:
+            # Apply the new widget sizes now so the scroll range is valid before scrolling
+            QApplication.sendPostedEvents(None, QEvent.Type.LayoutRequest.value)
+            self.scroll_to_page(self.current_page)
     
-        # 3. Only render pages that intersect the visible area
-        for i, widget in enumerate(self.page_widgets):
-            # Map the widget's geometry to the scroll area's coordinate system
-            widget_rect = widget.geometry()
-        
-            # Adjust for scroll position
-            widget_top_y = self.scroll_area.widget().mapFromParent(widget_rect.topLeft()).y() - scroll_offset
-            widget_bottom_y = self.scroll_area.widget().mapFromParent(widget_rect.bottomLeft()).y() - scroll_offset
-        
-            # Check for intersection with viewport (allowing a little buffer)
-            is_visible = (widget_top_y < viewport_rect.bottom() + 100) and \
-                         (widget_bottom_y > viewport_rect.top() - 100)
-                     
-            if is_visible:
-                # Render visible pages fully
-                self.render_page_content(i, widget)
-            else:
-                # OPTIMIZATION: Clear non-visible pages to reduce memory usage
-                widget.clear()
-            
-        self.scroll_to_page(self.current_page)
+        # 3. Render what intersects the viewport (re-render, since overlays may have changed)
+        self._render_visible_pages(force=True)
         self.update_status_bar()
 
-    def _render_form_fields(self, page_num, widget):
-        # Clear any existing field widgets for this page
-        if page_num in self.field_widgets:
-            for field_widget in self.field_widgets[page_num]:
-                field_widget.deleteLater()
-            del self.field_widgets[page_num]
-    
-        if page_num not in self.form_fields or not self.form_fields[page_num]:
-            return
-    
-        # Get current rendered sizes for alignment offsets
-        label_size = widget.size()
-        pixmap_size = widget.pixmap().size() if widget.pixmap() else QSize(0, 0)
-        x_offset = (label_size.width() - pixmap_size.width()) // 2
-        y_offset = (label_size.height() - pixmap_size.height()) // 2
-    
-        # Transformation matrix (must match the one used for pixmap rendering)
-        matrix = fitz.Matrix(self.zoom_level, self.zoom_level).prerotate(self.rotation)
-    
-        self.field_widgets[page_num] = []
-    
-        for field in self.form_fields[page_num]:
-            # Transform the field's PDF rect to rendered coordinates
-            transformed_rect = field.rect * matrix
-        
-            if field.field_type == fitz.PDF_WIDGET_TYPE_TEXT:
-                line_edit = QLineEdit(widget)  # Parent to the page QLabel
-                line_edit.setText(field.field_value or "")  # Load existing value if any
-                line_edit.setGeometry(
-                    int(transformed_rect.x0 + x_offset),
-                    int(transformed_rect.y0 + y_offset),
-                    int(transformed_rect.width),
-                    int(transformed_rect.height)
-                )
-                # Optional: Style to blend in (adjust as needed)
-                line_edit.setStyleSheet("border: 1px solid blue; background: transparent;")
-                # Connect editing finished to update PDF field value
-                line_edit.editingFinished.connect(lambda f=field, le=line_edit: self._update_pdf_field(f, le.text()))
-                self.field_widgets[page_num].append(line_edit)
-                line_edit.show()
-        
-            elif field.field_type == fitz.PDF_WIDGET_TYPE_CHECKBOX:
-                check_box = QCheckBox(widget)  # Parent to the page QLabel
-                check_box.setChecked(field.field_value == "Yes")  # Assuming "Yes"/"Off" for PDF checkboxes
-                # Checkboxes often have fixed size; scale if needed
-                cb_size = min(int(transformed_rect.width), int(transformed_rect.height))
-                check_box.setGeometry(
-                    int(transformed_rect.x0 + x_offset),
-                    int(transformed_rect.y0 + y_offset),
-                    cb_size,
-                    cb_size
-                )
-                # Connect state change to update PDF field value
-                check_box.stateChanged.connect(lambda state, f=field: self._update_pdf_field(f, "Yes" if state == Qt.CheckState.Checked else "Off"))
-                self.field_widgets[page_num].append(check_box)
-                check_box.show()
-        
-            # Add handling for other field types (e.g., radio, combo) as needed
-    
-        widget.update()  # Force repaint if necessary
+    def _update_reading_direction(self):
+        """Grows the prefetch window while pages are turned the same way; resets it on reversal."""
+        step = self.current_page - self.last_single_page
+        self.last_single_page = self.current_page
+        if not step: return
+        direction = 1 if step > 0 else -1
+        if direction == self.reading_direction:
+            self.prefetch_ahead = min(PREFETCH_MAX_AHEAD, self.prefetch_ahead + 1)
+        else:
+            self.reading_direction = direction
+            self.prefetch_ahead = PREFETCH_AHEAD
 
-    def _save_form_field(self, fitz_widget, qlineedit_widget):
+    def _prefetch_pages(self):
+        """Pages to render in the background around the current one (single-page mode only)."""
+        if self.view_mode != self.SINGLE_PAGE or not self.total_pages or self.zoom_settle_timer.isActive():
+            return []
+        pages = []
+        for distance in range(1, max(self.prefetch_ahead, PREFETCH_BEHIND) + 1):
+            if distance <= self.prefetch_ahead:
+                pages.append(self.current_page + distance * self.reading_direction)
+            if distance <= PREFETCH_BEHIND:
+                pages.append(self.current_page - distance * self.reading_direction)
+        page_sizes = self.page_layout.page_sizes
+        # Tiled pages are never rendered whole, so there is nothing to prefetch for them
+        return [p for p in pages if 0 <= p < len(page_sizes) and
+                not needs_tiling(*pixel_size(*page_sizes[p], self.zoom_level, self.rotation))]
+
+    def _prefetch_adjacent_pages(self):
         """
-        Saves the user input from QLineEdit back to the fitz PDF field.
-        This handles Text fields (field_type=1).
+        Queues low-priority renders of the neighbouring pages at the current zoom and rotation
+        so page turns hit the cache. Changing zoom or rotation changes the keys, and the
+        next _drop_stale_render_jobs() drops the outdated prefetches.
         """
-        if not self.pdf_document: return
+        for page_num in self._prefetch_pages():
+            key = cache_key(page_num, self.zoom_level, self.rotation)
+            if key not in self.render_cache:
+                self.render_scheduler.request(key, page_num, self.zoom_level, self.rotation, PREFETCH_PRIORITY)
 
-        # 1. Get the new value from the QLineEdit
-        new_value = qlineedit_widget.text()
-    
-        # 2. Update the PyMuPDF field object
-        try:
-            # Use the field_value property to set the new content
-            fitz_widget.field_value = new_value 
+    def _render_visible_pages(self, force=False):
+        """
+        Renders the pages intersecting the viewport and evicts the ones that scrolled out.
+        The visible range comes from a binary search over page offsets, so the cost does
+        not depend on the page count. Without force only newly visible pages are painted.
+        """
+        if not self.total_pages: return
+        scroll_offset = self.scroll_area.verticalScrollBar().value()
+        viewport_height = self.scroll_area.viewport().height()
+        # Allow a little buffer above and below the viewport
+        first, last = self.page_layout.visible_range(scroll_offset - 100, scroll_offset + viewport_height + 100)
+        visible = set(range(first, last + 1))
         
-            # This is CRITICAL: it applies the value and updates the visual appearance in the PDF structure
-            fitz_widget.update() 
+        for page_num in self.displayed_pages - visible:
+            self._release_page(page_num)
+        newly_visible = visible if force else visible - self.displayed_pages
+        self.displayed_pages = visible
+        self._drop_stale_render_jobs()
+        for page_num in sorted(newly_visible):
+            self.render_page_content(page_num, self._page_widget(page_num))
+
+    def _on_scroll(self, value):
+        if self.view_mode != self.CONTINUOUS or not self.total_pages:
+            self._drop_stale_render_jobs()
+            return
+        self._render_visible_pages()
         
-            self.status_bar.showMessage(f"Text Field '{fitz_widget.field_name}' updated.")
-        except Exception as e:
-            self.status_bar.showMessage(f"Error saving text field: {e}")
+        # The page at the top of the viewport becomes the current page
+        page_num = self.page_layout.page_at(value)
+        if page_num != self.current_page and 0 <= page_num < self.total_pages:
+            self.current_page = page_num
+            self.move_up_button.setEnabled(self.current_page > 0)
+            self.move_down_button.setEnabled(self.current_page < self.total_pages - 1)
+            self.thumbnail_list.setCurrentRow(self.current_page)
+            self.update_status_bar()
 
-        # Note: We don't call save_pdf() here, the user must explicitly save the document.
+    # --- LAZY PAGE SCAN ---
 
-    def _save_checkbox_field(self, fitz_widget, state):
-        """Saves the user input from QCheckBox back to the fitz PDF field, with error handling."""
-        if not self.pdf_document: return
-    
-        # Initialize defaults
-        new_value = "" 
-    
-        try:
-            # Checkbox 'on' value is the second value in field_values(), 'off' is the first.
-            # This is the PyMuPDF-recommended way, but it throws the AttributeError for some fields.
-            field_values = fitz_widget.field_values()
-            off_value = field_values[0] if len(field_values) > 0 else ""
-            on_value = field_values[1] if len(field_values) > 1 else "Yes" 
-
-            if state == Qt.CheckState.Checked.value:
-                new_value = on_value
-            else:
-                new_value = off_value
+    def reset_page_scan(self):
+        """Forgets per-page discoveries (after opening or reordering); they are redone lazily."""
+        self.scanned_pages = set()
+        self.form_index.clear()
+        self._scan_cursor = 0
+        if self.pdf_document:
+            self.page_scan_timer.start()
 
-        except AttributeError:
-            # Fallback for fields (like some buttons) that lack field_values()
-            if state == Qt.CheckState.Checked.value:
-                new_value = "Yes" # Common 'on' value default
-            else:
-                new_value = "" # Common 'off' value default
-    
-        try:
-            # Apply the determined new value
-            fitz_widget.field_value = new_value
-            fitz_widget.update() 
-            self.status_bar.showMessage(f"Checkbox '{fitz_widget.field_name}' updated to {new_value}.")
-        except Exception as e:
-            self.status_bar.showMessage(f"Error saving checkbox field value: {e}")
+    def _ensure_page_scanned(self, page_num):
+        """
+        Discovers a page's form fields, PDF text notes and real size the first time it
+        is needed. Returns True if the page size differed from the layout's estimate.
+        """
+        if page_num in self.scanned_pages: return False
+        self.scanned_pages.add(page_num)
+        page = self.pdf_document.load_page(page_num)
+        self.form_index.scan_page(page)
+        page_entries = scan_page_annotations(page)
+        if page_entries:
+            merge_annotations(self.annotations.setdefault(page_num, []), page_entries)
+            self.annotation_index.invalidate(page_num)
+        rect = page.rect
+        return self.page_layout.set_page_size(page_num, rect.width, rect.height)
+
+    def _scan_pages_step(self):
+        """Background pass: scans pages in order for ~10 ms per event-loop turn."""
+        if not self.pdf_document:
+            self.page_scan_timer.stop(); return
+        deadline = time.perf_counter() + 0.01
+        sizes_changed = False
+        while self._scan_cursor < self.total_pages and time.perf_counter() < deadline:
+            sizes_changed |= self._ensure_page_scanned(self._scan_cursor)
+            self._scan_cursor += 1
+        if sizes_changed:
+            self._schedule_relayout()
+        if self._scan_cursor >= self.total_pages:
+            self.page_scan_timer.stop()
+
+    def _schedule_relayout(self):
+        if not self._relayout_pending:
+            self._relayout_pending = True
+            QTimer.singleShot(0, self._relayout_pages)
+
+    def _relayout_pages(self):
+        """Applies corrected page sizes without moving the page under the viewport."""
+        self._relayout_pending = False
+        if not self.total_pages: return
+        if self.view_mode == self.CONTINUOUS and self.continuous_pages_shown:
+            scroll_bar = self.scroll_area.verticalScrollBar()
+            offset_in_page = scroll_bar.value() - self.page_layout.offsets[self.current_page]
+            self._apply_page_layout()
+            QApplication.sendPostedEvents(None, QEvent.Type.LayoutRequest.value)
+            scroll_bar.setValue(self.page_layout.offsets[self.current_page] + offset_in_page)
+        else:
+            self._apply_page_layout()
+
+    def _drop_stale_render_jobs(self, *args):
+        """Forgets queued renders for pages that are no longer on screen (or about to be)."""
+        self.render_scheduler.retain(
+            {cache_key(p, self.zoom_level, self.rotation) for p in self.displayed_pages | set(self._prefetch_pages())}
+        )
+        # Tiles that scrolled out of the viewport before their turn are dropped too
+        self.render_scheduler.retain(self._visible_tile_keys(), TILE_JOB)
+
+    def _reposition_form_fields(self, page_num, widget):
+        """Called by PDFPageWidget when it is resized: field editors follow the new geometry."""
+        self.form_editors.place_page(page_num, widget)
 
     def update_view(self):
         if not self.pdf_document: return
@@ -437,7 +844,7 @@ class PDFReader(PDFReaderUI):
             self.status_bar.showMessage("Ready")
             return
             
-        search_status = f"Result {self.current_search_index + 1} of {len(self.search_results)}" if self.search_results and self.current_search_index >= 0 else f"Search results: {len(self.search_results)}"
+        search_status = f"Result {self.search_results.current + 1} of {len(self.search_results)}" if self.search_results and self.search_results.current >= 0 else f"Search results: {len(self.search_results)}"
         view_status = "Continuous" if self.view_mode == self.CONTINUOUS else "Single"
         self.status_bar.showMessage(
             f"Page: {self.current_page + 1} / {self.total_pages} | "
@@ -456,6 +863,7 @@ class PDFReader(PDFReaderUI):
         self.current_selection_page = -1
 
         self.update_view()
+        self.scroll_to_page(self.current_page)
         self.prev_button.setEnabled(self.current_page > 0 and self.view_mode == self.SINGLE_PAGE)
         self.next_button.setEnabled(self.current_page < self.total_pages - 1 and self.view_mode == self.SINGLE_PAGE)
         self.move_up_button.setEnabled(self.current_page > 0)
@@ -464,10 +872,11 @@ class PDFReader(PDFReaderUI):
         self.page_input.setText(str(self.current_page + 1))
         
     def scroll_to_page(self, page_num):
-        if self.view_mode == self.CONTINUOUS and 0 <= page_num < len(self.page_widgets):
-            target_widget = self.page_widgets[page_num]
-            target_pos = self.scroll_area.widget().mapFromParent(target_widget.pos())
-            self.scroll_area.verticalScrollBar().setValue(target_pos.y())
+        if self.view_mode == self.CONTINUOUS and 0 <= page_num < self.total_pages:
+            # Offsets come from the precomputed layout, not from (possibly stale) widget geometry
+            # (the page column starts at y=0: the layout has no margins)
+            self.page_layout.update(self.zoom_level, self.rotation)
+            self.scroll_area.verticalScrollBar().setValue(self.page_layout.offsets[page_num])
 
     def prev_page(self):
         if self.view_mode == self.SINGLE_PAGE and self.current_page > 0:
@@ -507,8 +916,18 @@ class PDFReader(PDFReaderUI):
     def change_zoom(self, zoom_text):
         if zoom_text in ["Fit Width", "Fit Page"]: return 
             
+        self.zoom_fit_mode = None # A fixed zoom chosen by the user ends fit mode
         zoom_percentage = int(zoom_text.strip("%"))
         self.zoom_level = zoom_percentage / 100.0
+        self._apply_zoom()
+
+    def _apply_zoom(self):
+        """
+        Shows a new zoom level within one frame using cached rasters scaled by Qt. The
+        sharp re-render is only requested once zoom changes pause for ZOOM_SETTLE_MS,
+        so rapid Ctrl+/Ctrl- steps rasterize the final zoom level only.
+        """
+        self.zoom_settle_timer.start() # Restarting the timer coalesces rapid changes
         self.update_view()
         
     def set_zoom_fit_width(self): self.set_zoom_fit('width')
@@ -517,10 +936,11 @@ class PDFReader(PDFReaderUI):
     def set_zoom_fit(self, mode):
         if not self.pdf_document: return
 
-        page = self.pdf_document.load_page(self.current_page)
-        rect = page.rect
-        page_width = rect.width
-        page_height = rect.height
+        # Page size from the layout (the page is loaded at most once, by the page scan)
+        self._ensure_page_scanned(self.current_page)
+        page_width, page_height = self.page_layout.page_sizes[self.current_page]
+        if self.rotation % 180:
+            page_width, page_height = page_height, page_width
         
         viewport_size = self.scroll_area.viewport().size()
         viewport_width = viewport_size.width()
@@ -541,17 +961,18 @@ class PDFReader(PDFReaderUI):
         else:
             return
 
+        self.zoom_fit_mode = mode # Kept up to date by resizeEvent
         self.zoom_level = max(0.1, min(10.0, new_zoom))
 
         zoom_text = f"{int(self.zoom_level * 100)}%"
         zoom_items = [self.zoom_combo.itemText(i) for i in range(self.zoom_combo.count())]
+        # Signals blocked: change_zoom would round the zoom and leave fit mode
+        self.zoom_combo.blockSignals(True)
         if zoom_text not in zoom_items:
-            self.zoom_combo.blockSignals(True)
             self.zoom_combo.addItem(zoom_text)
-            self.zoom_combo.blockSignals(False)
-            
         self.zoom_combo.setCurrentText(zoom_text)
-        self.update_view()
+        self.zoom_combo.blockSignals(False)
+        self._apply_zoom()
         
     def rotate_page(self):
         self.rotation = (self.rotation + 90) % 360
@@ -573,7 +994,9 @@ class PDFReader(PDFReaderUI):
         else:
             self.annotation_mode = not self.annotation_mode
             
-        for widget in self.page_widgets:
+        for widget in list(self.page_widgets.values()) + self.spare_page_widgets:
+            if widget.property("annotationMode") == self.annotation_mode:
+                continue # Repolishing is slow; page changes force the mode off on every turn
             widget.setProperty("annotationMode", self.annotation_mode)
             widget.style().unpolish(widget)
             widget.style().polish(widget)
@@ -588,11 +1011,10 @@ class PDFReader(PDFReaderUI):
             
         # 1. Annotation Mode Logic
         if event.button() == Qt.MouseButton.LeftButton and self.annotation_mode:
-            pixmap = page_widget.pixmap()
-            if not pixmap: return
+            pixmap_size = page_widget.raster_size()
+            if pixmap_size.isEmpty(): return
             click_point = event.position()
             label_size = page_widget.size()
-            pixmap_size = pixmap.size()
             x_offset_alignment = (label_size.width() - pixmap_size.width()) // 2
             y_offset_alignment = (label_size.height() - pixmap_size.height()) // 2
             click_x = click_point.x() - x_offset_alignment
@@ -600,39 +1022,41 @@ class PDFReader(PDFReaderUI):
             if not (0 <= click_x < pixmap_size.width() and 0 <= click_y < pixmap_size.height()): return
 
             page = self.pdf_document.load_page(page_num)
-            matrix = fitz.Matrix(self.zoom_level, self.zoom_level).prerotate(self.rotation)
-            try: inverse_matrix = matrix.invert()
-            except ValueError:
-                self.status_bar.showMessage("Error: Cannot invert transformation matrix."); return
-
-            pdf_point = fitz.Point(click_x, click_y) * inverse_matrix
+            pdf_point = fitz.Point(click_x, click_y) * pixel_to_page_matrix(page, self.zoom_level, self.rotation)
             text, ok = QInputDialog.getText(self, "Add Annotation", "Enter annotation text:")
             if ok and text:
-                if page_num not in self.annotations: self.annotations[page_num] = []
-                self.annotations[page_num].append((pdf_point.x, pdf_point.y, text))
-                annot = page.add_text_annot(pdf_point, text); annot.set_colors(stroke=(1, 0, 0)); annot.update()
-                save_annotations(self)
-                self.render_page_content(page_num, page_widget) 
+                note = (pdf_point.x, pdf_point.y, text, new_note_id())
+                index = add_note(self, page_num, note)
+                self.edit_journal.record(("add_note", page_num, index, note))
                 self.toggle_annotation_mode(force_off=True) 
         
         # 2. Start text selection
         elif event.button() == Qt.MouseButton.LeftButton and not self.annotation_mode:
+            previous_selection_page = self.current_selection_page
             self.is_selecting_text = True
             self.selection_start_point = event.position().toPoint()
             self.selection_end_point = event.position().toPoint()
             self.current_selection_page = page_num
-            self.update_view() 
+            self._update_selection_page(previous_selection_page)
+            self._update_selection_page(page_num)
 
     def _handle_page_mouse_move(self, event, page_widget):
         page_num = page_widget.property("page_num")
         if self.is_selecting_text and page_num == self.current_selection_page and event.buttons() & Qt.MouseButton.LeftButton:
             self.selection_end_point = event.position().toPoint()
-            self.update_view() 
+            page_widget.update() # Overlay only; the page raster is reused
+        elif not event.buttons():
+            # Hovering a note shows its full text (the drawn box cuts long notes off)
+            index = self._note_index_at(page_widget, event.position(), nearest=False)
+            text = self.annotations[page_num][index][2] if index is not None else ""
+            if page_widget.toolTip() != text:
+                page_widget.setToolTip(text)
 
     def _handle_page_mouse_release(self, event, page_widget):
         if self.is_selecting_text and event.button() == Qt.MouseButton.LeftButton:
             self.is_selecting_text = False
             self.selection_end_point = event.position().toPoint()
+            selection_page = self.current_selection_page
             
             # Clear if selection is just a tiny click
             if self.selection_start_point and self.selection_end_point and \
@@ -642,7 +1066,7 @@ class PDFReader(PDFReaderUI):
                 self.selection_end_point = None
                 self.current_selection_page = -1
                 
-            self.update_view()
+            self._update_selection_page(selection_page)
             
     def _show_context_menu(self, pos):
         page_widget = self.sender()
@@ -663,7 +1087,7 @@ class PDFReader(PDFReaderUI):
             
         context_menu.addSeparator()
         
-        if page_num in self.annotations and self.annotations[page_num]:
+        if self._note_index_at(page_widget, pos) is not None:
             context_menu.addAction(delete_action)
         else:
             delete_action.setEnabled(False); context_menu.addAction(delete_action)
@@ -674,7 +1098,9 @@ class PDFReader(PDFReaderUI):
         if not self.selection_start_point or not self.selection_end_point or self.current_selection_page == -1:
             self.status_bar.showMessage("No text selected."); return
 
-        page_widget = self.page_widgets[self.current_selection_page]
+        page_widget = self.page_widgets.get(self.current_selection_page)
+        if page_widget is None:
+            self.status_bar.showMessage("No text selected."); return
         pdf_rect = self._widget_coords_to_pdf_rect(page_widget, self.selection_start_point, self.selection_end_point)
         
         if pdf_rect:
@@ -691,53 +1117,112 @@ class PDFReader(PDFReaderUI):
             except Exception as e:
                 self.status_bar.showMessage(f"Error extracting text: {e}")
         
+        selection_page = self.current_selection_page
         self.selection_start_point = None; self.selection_end_point = None; self.current_selection_page = -1
-        self.update_view()
+        self._update_selection_page(selection_page)
         
-    def delete_nearest_annotation(self, pos, page_widget):
+    def _note_index_at(self, page_widget, pos, nearest=True):
+        """
+        Index of the note nearest to a widget position (within NOTE_HIT_RADIUS pixels of
+        its anchor), or with nearest=False of the note whose drawn text box is under it.
+        """
         page_num = page_widget.property("page_num")
-        if page_num not in self.annotations: return
-
-        click_point = pos
-        pixmap = page_widget.pixmap(); 
-        if not pixmap: return
+        if page_num not in self.annotations: return None
+        pixmap_size = page_widget.raster_size()
+        if pixmap_size.isEmpty(): return None
 
-        label_size = page_widget.size(); pixmap_size = pixmap.size()
+        label_size = page_widget.size()
         x_offset_alignment = (label_size.width() - pixmap_size.width()) // 2
         y_offset_alignment = (label_size.height() - pixmap_size.height()) // 2
-        click_x_check = click_point.x(); click_y_check = click_point.y()
-        
-        min_distance = float('inf'); nearest_index = -1
+        # Notes are drawn at their position times the zoom level (see _paint_page_overlays)
+        x = (pos.x() - x_offset_alignment) / self.zoom_level
+        y = (pos.y() - y_offset_alignment) / self.zoom_level
+        grid = self.annotation_index.grid(page_num, self.annotations[page_num])
+        if nearest:
+            return grid.nearest(x, y, NOTE_HIT_RADIUS / self.zoom_level)
+        return grid.box_at(x, y, self.zoom_level)
 
-        for i, (x, y, text) in enumerate(self.annotations[page_num]):
-            scaled_x = x * self.zoom_level + x_offset_alignment
-            scaled_y = y * self.zoom_level + y_offset_alignment
-            distance = ((scaled_x - click_x_check)**2 + (scaled_y - click_y_check)**2)**0.5
-            
-            if distance < min_distance and distance < 30: 
-                min_distance = distance
-                nearest_index = i
+    def delete_nearest_annotation(self, pos, page_widget):
+        page_num = page_widget.property("page_num")
+        nearest_index = self._note_index_at(page_widget, pos)
 
-        if nearest_index != -1:
-            x, y, text = self.annotations[page_num][nearest_index]
+        if nearest_index is not None:
+            x, y, text, _ = self.annotations[page_num][nearest_index]
             reply = QMessageBox.question(self, "Delete Annotation", f"Delete annotation: '{text}'?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
             if reply == QMessageBox.StandardButton.Yes:
-                self.annotations[page_num].pop(nearest_index)
-                if not self.annotations[page_num]: del self.annotations[page_num]
-                
-                page = self.pdf_document.load_page(page_num)
-                for annot in page.annots():
-                    if annot.type[0] == 8: 
-                        pos = annot.rect.top_left
-                        if abs(pos.x - x) < 1 and abs(pos.y - y) < 1 and annot.info.get("content") == text:
-                            page.delete_annot(annot); break
-                            
-                save_annotations(self)
-                self.render_page_content(page_num, page_widget) 
+                note = remove_note(self, page_num, nearest_index)
+                self.edit_journal.record(("delete_note", page_num, nearest_index, note))
                 self.status_bar.showMessage("Annotation deleted")
         else:
             self.status_bar.showMessage("No nearby annotation found to delete.")
 
+    # --- FORMS (see pdf_forms.py) ---
+
+    def fill_form_from_file(self):
+        """Fills the form from the first record of a JSON or CSV file, page by page."""
+        if not self.pdf_document:
+            self.status_bar.showMessage("No PDF loaded"); return
+        file_name, _ = QFileDialog.getOpenFileName(self, "Fill Form From", "", "Form Data (*.json *.csv)")
+        if not file_name:
+            return
+        try:
+            records = read_records(file_name)
+            if not records:
+                raise ValueError("No records in file")
+            self.form_index.scan_all(self.pdf_document)
+            pages, unknown = fill_fields(self.pdf_document, self.form_index.by_name(), records[0])
+        except Exception as e:
+            self.status_bar.showMessage(f"Error filling form: {str(e)}"); return
+        self.form_editors.release_all() # They show the old values
+        for page_num in pages:
+            for widget_index, field in enumerate(self.form_index.page_fields(page_num)):
+                if field.field_name in records[0]:
+                    self.render_scheduler.record_edit("set_field", page_num, widget_index, field.field_value)
+            self.invalidate_render_cache(page_num)
+        for page_num in self.displayed_pages:
+            self.render_page_content(page_num, self._page_widget(page_num))
+        message = f"Filled {len(records[0]) - len(unknown)} fields on {len(pages)} pages"
+        if unknown:
+            message += f", {len(unknown)} names not in the form"
+        if len(records) > 1:
+            message += " (first record only; use Mail Merge for all of them)"
+        self.status_bar.showMessage(message)
+
+    def export_form_values(self):
+        if not self.pdf_document:
+            self.status_bar.showMessage("No PDF loaded"); return
+        file_name, _ = QFileDialog.getSaveFileName(self, "Export Form Data", "", "JSON (*.json);;CSV (*.csv)")
+        if not file_name:
+            return
+        try:
+            values = field_values(self.pdf_document)
+            write_values(values, file_name)
+        except Exception as e:
+            self.status_bar.showMessage(f"Error exporting form data: {str(e)}"); return
+        self.status_bar.showMessage(f"Exported {len(values)} field values to {file_name}")
+
+    def mail_merge(self):
+        """Writes one filled copy of the document per record, in the task worker."""
+        if not self.pdf_document:
+            self.status_bar.showMessage("No PDF loaded"); return
+        file_name, _ = QFileDialog.getOpenFileName(self, "Mail Merge Records", "", "Form Data (*.json *.csv)")
+        if not file_name:
+            return
+        folder = QFileDialog.getExistingDirectory(self, "Mail Merge Output Folder")
+        if not folder:
+            return
+        try:
+            records = read_records(file_name)
+        except Exception as e:
+            self.status_bar.showMessage(f"Error reading records: {str(e)}"); return
+        stem = os.path.splitext(os.path.basename(self.pdf_file_path))[0].replace("{", "{{").replace("}", "}}")
+        output_pattern = os.path.join(folder, f"{stem}_{{n:0{len(str(len(records)))}d}}.pdf")
+        try:
+            self.render_scheduler.submit_document_task(("mail_merge", folder), mail_merge_job, records, output_pattern)
+        except OSError as e:
+            self.status_bar.showMessage(f"Mail merge error: {str(e)}"); return
+        self.status_bar.showMessage(f"Mail merge: filling {len(records)} copies...")
+
     # --- DOCUMENT FUNCTIONS ---
     
     def show_metadata(self):
@@ -761,101 +1246,172 @@ class PDFReader(PDFReaderUI):
         if not self.pdf_document:
             self.status_bar.showMessage("No PDF loaded")
             return
+        if self.print_job is not None or self.vector_print is not None:
+            self.status_bar.showMessage("A print job is already running")
+            return
         page_range, ok = QInputDialog.getText(
             self, "Print Pages", 
-            f"Enter page range (e.g., '1-5' or 'all') (1-{self.total_pages}):",
+            f"Enter pages (e.g., '1-3,7,10-12' or 'all') (1-{self.total_pages}):",
             text=f"1-{self.total_pages}"
         )
         if not ok:
             return
-        
-        if page_range.lower() == "all":
-            start_page = 0
-            end_page = self.total_pages - 1
-        else:
-            try:
-                if "-" in page_range:
-                    start, end = map(int, page_range.split("-"))
-                    start_page = max(0, start - 1)
-                    end_page = min(self.total_pages - 1, end - 1)
-                else:
-                    start_page = end_page = int(page_range) - 1
-                    if not (0 <= start_page < self.total_pages):
-                        raise ValueError("Invalid page number")
-            except ValueError:
-                self.status_bar.showMessage("Invalid page range")
-                return
+        try:
+            pages = parse_page_ranges(page_range, self.total_pages)
+        except ValueError:
+            self.status_bar.showMessage("Invalid page range")
+            return
         
         printer = QPrinter(QPrinter.PrinterMode.HighResolution)
         dialog = QPrintDialog(printer, self)
         if dialog.exec() == QPrintDialog.DialogCode.Accepted:
-            try:
-                painter = QPainter()
-                if not painter.begin(printer):
-                    self.status_bar.showMessage("Failed to initialize printer")
+            to_pdf_file = printer.outputFormat() == QPrinter.OutputFormat.PdfFormat
+            modes = print_modes(to_pdf_file, pdf_spooler() is not None)
+            mode = modes[0]
+            if len(modes) > 1:
+                mode, ok = QInputDialog.getItem(self, "Print", "Print as:", modes, 0, False)
+                if not ok:
                     return
-                
-                for page_num in range(start_page, end_page + 1):
-                    if page_num > start_page:
-                        if not printer.newPage():
-                            painter.end()
-                            self.status_bar.showMessage("Failed to advance to next page")
-                            return
-                            
-                    page = self.pdf_document.load_page(page_num)
-                    matrix = fitz.Matrix(1, 1).prerotate(self.rotation)
-                    pix = page.get_pixmap(matrix=matrix)
-                    img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format.Format_RGB888)
-                    pixmap = QPixmap.fromImage(img)
-                    
-                    printer_rect = printer.pageRect(QPrinter.Unit.Pixel)
-                    scaled_pixmap = pixmap.scaled(
-                        printer_rect.width(), printer_rect.height(),
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation
-                    )
-                    
-                    x_offset = (printer_rect.width() - scaled_pixmap.width()) // 2
-                    y_offset = (printer_rect.height() - scaled_pixmap.height()) // 2
-                    painter.drawPixmap(x_offset, y_offset, scaled_pixmap)
-                
-                painter.end()
-                self.status_bar.showMessage(f"Printed pages {start_page + 1}-{end_page + 1}")
-            except Exception as e:
-                painter.end()
-                self.status_bar.showMessage(f"Print error: {str(e)}")
+            if mode == PRINT_VECTOR:
+                self.start_vector_print(printer, pages)
+            else:
+                self.start_print_job(printer, pages)
+
+    def start_vector_print(self, printer, pages):
+        """
+        Sends the pages as PDF (see pdf_export.py): written to the printer's output file,
+        or spooled to the printer. Falls back to raster printing if spooling fails.
+        """
+        try:
+            if printer.outputFormat() == QPrinter.OutputFormat.PdfFormat:
+                file_name, printer_name = printer.outputFileName(), None
+            else:
+                fd, file_name = tempfile.mkstemp(prefix="pdf_reader_print_", suffix=".pdf")
+                os.close(fd)
+                printer_name = printer.printerName()
+        except OSError as e:
+            self.status_bar.showMessage(f"Print error: {str(e)}")
+            return
+        self.vector_print = (printer, pages)
+        self.status_bar.showMessage("Printing...")
+        try:
+            self.render_scheduler.submit_document_task(
+                ("print", file_name, printer_name), print_pages_job,
+                pages, self.rotation, file_name, printer_name, printer.copyCount()
+            )
+        except OSError as e:
+            self._on_vector_print_finished(("print", file_name, printer_name), None, str(e))
+
+    def _on_vector_print_finished(self, tag, size, error):
+        _, file_name, printer_name = tag
+        printer, pages = self.vector_print
+        self.vector_print = None
+        if printer_name and os.path.exists(file_name):
+            os.remove(file_name) # Left behind if the job failed before spooling it
+        if error and printer_name:
+            # E.g. a printer whose queue takes no PDF: render the pages instead
+            self.start_print_job(printer, pages)
+            self.status_bar.showMessage(f"Vector printing failed ({error}), printing as images")
+            return
+        if error:
+            self.status_bar.showMessage(f"Print error: {error}")
+            return
+        page_text = f"{len(pages)} page{'s' if len(pages) != 1 else ''}"
+        destination = printer_name or file_name
+        self.status_bar.showMessage(f"Sent {page_text} to {destination}{size_text(size)}")
+
+    def start_print_job(self, printer, pages):
+        """Prints pages (0-based) at the printer's resolution; rendering runs in the render pool."""
+        progress = QProgressDialog("Printing...", "Cancel", 0, len(pages), self)
+        progress.setWindowModality(Qt.WindowModality.WindowModal) # No page edits while printing
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
+        job = PrintJob(self, printer, pages)
+        progress.canceled.connect(job.cancel)
+        job.progress.connect(progress.setValue)
+        job.finished.connect(lambda error, p=progress: self._on_print_finished(p, len(pages), error))
+        self.print_job = job
+        job.start()
+
+    def _on_print_finished(self, progress, page_count, error):
+        job = self.print_job
+        self.print_job = None
+        progress.canceled.disconnect() # Closing the dialog would report a cancel
+        progress.close()
+        job.deleteLater()
+        if job.cancelled:
+            self.status_bar.showMessage("Printing cancelled")
+        elif error:
+            self.status_bar.showMessage(f"Print error: {error}")
+        else:
+            self.status_bar.showMessage(f"Printed {page_count} page{'s' if page_count != 1 else ''}")
                 
     def save_pdf(self):
         if not self.pdf_document:
             self.status_bar.showMessage("No PDF loaded")
             return
+        if self.save_future is not None:
+            self.status_bar.showMessage("A save is already in progress")
+            return
         file_name, _ = QFileDialog.getSaveFileName(
-            self, "Save PDF File", "", "PDF Files (*.pdf)"
+            self, "Save PDF File", self.pdf_file_path, "PDF Files (*.pdf)"
         )
-        if file_name:
-            try:
-                # Re-add all saved annotations to the document before saving
-                for page_num in self.annotations:
-                    page = self.pdf_document.load_page(page_num)
-                    for x, y, text in self.annotations[page_num]:
-                        existing = False
-                        # Check if annotation already exists to prevent duplicates
-                        for annot in page.annots():
-                            if annot.type[0] == 8:
-                                pos = annot.rect.top_left
-                                if abs(pos.x - x) < 1 and abs(pos.y - y) < 1 and annot.info.get("content") == text:
-                                    existing = True
-                                    break
-                        if not existing:
-                            annot = page.add_text_annot(fitz.Point(x, y), text)
-                            annot.set_colors(stroke=(1, 0, 0))
-                            annot.update()
-                            
-                self.pdf_document.save(file_name)
-                save_annotations(self)
-                self.status_bar.showMessage(f"PDF saved as: {file_name}")
-            except Exception as e:
-                self.status_bar.showMessage(f"Error saving PDF: {str(e)}")
+        if not file_name:
+            return
+        same_file = os.path.abspath(file_name) == os.path.abspath(self.pdf_file_path)
+        modes = save_modes(same_file, not self.original_file_replaced and self.pdf_document.can_save_incrementally())
+        mode, ok = QInputDialog.getItem(self, "Save PDF File", "Save mode:", modes, 0, False)
+        if not ok:
+            return
+
+        progress = QProgressDialog("Adding annotations...", None, 0, max(1, len(self.annotations)), self)
+        progress.setWindowTitle("Saving PDF")
+        progress.setWindowModality(Qt.WindowModality.WindowModal) # No edits while the document is written
+        progress.setMinimumDuration(300)
+        self.save_progress = progress
+        try:
+            # Add the notes missing from the PDF; unchanged annotations are not rewritten
+            changed_pages = write_notes_to_document(self.pdf_document, self.annotations, progress.setValue)
+            if changed_pages:
+                self.render_scheduler.record_edit("write_notes", self.annotations)
+            for page_num in changed_pages:
+                self.invalidate_render_cache(page_num)
+
+            if mode == SAVE_INCREMENTAL:
+                # Only the changed objects are appended, so this stays on the GUI thread
+                self.pdf_document.save(self.pdf_document.name, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+                self._finish_save(file_name, "")
+                return
+            progress.setLabelText("Writing PDF...")
+            progress.setRange(0, 0) # Busy indicator: the worker reports no progress
+            # The worker writes its own copy of the document, so nothing is serialized here
+            self.save_future = self.render_scheduler.submit_document_task(
+                ("save", file_name, mode), save_document_job, file_name, mode == SAVE_OPTIMIZED
+            )
+        except Exception as e:
+            self._finish_save(file_name, str(e))
+
+    def _on_save_finished(self, tag, result, error):
+        _, file_name, mode = tag
+        self.save_future = None
+        if not error and mode != SAVE_INCREMENTAL and \
+           os.path.abspath(file_name) == os.path.abspath(self.pdf_file_path):
+            # The open document no longer matches the bytes on disk, so appending to them would corrupt the file
+            self.original_file_replaced = True
+        self._finish_save(file_name, error, result)
+
+    def _finish_save(self, file_name, error, size=None):
+        if self.save_progress is not None:
+            self.save_progress.close()
+            self.save_progress = None
+        if error:
+            self.status_bar.showMessage(f"Error saving PDF: {error}")
+            return
+        if os.path.abspath(file_name) == os.path.abspath(self.pdf_file_path):
+            self.disk_page_numbers = None # The file on disk has the edited page order now
+            self.render_scheduler.document_saved(file_name) # And the logged edits
+        save_annotations(self)
+        self.status_bar.showMessage(f"PDF saved as: {file_name}{size_text(size)}")
         
     # --- UTILITY HOOKS (Calls functions from pdf_utils.py) ---
     
@@ -867,18 +1423,41 @@ class PDFReader(PDFReaderUI):
     def remove_page_action(self): remove_page(self)
     def move_page_up_action(self): move_page_up(self)
     def move_page_down_action(self): move_page_down(self)
+    def undo_action(self): undo_edit(self)
+    def redo_action(self): redo_edit(self)
+
+    def selected_thumbnail_pages(self):
+        return sorted(index.row() for index in self.thumbnail_list.selectedIndexes())
+
+    def _show_thumbnail_context_menu(self, pos):
+        pages = self.selected_thumbnail_pages()
+        if not self.pdf_document or not pages: return
+        context_menu = QMenu(self)
+        duplicate_action = context_menu.addAction(f"Duplicate {len(pages)} Page(s)")
+        duplicate_action.triggered.connect(lambda: duplicate_pages(self, pages))
+        delete_action = context_menu.addAction(f"Delete {len(pages)} Page(s)")
+        delete_action.triggered.connect(lambda: delete_pages(self, pages))
+        delete_action.setEnabled(len(pages) < self.total_pages)
+        move_action = context_menu.addAction("Move Selected Pages To...")
+        move_action.triggered.connect(lambda: self._move_selected_pages(pages))
+        context_menu.addSeparator()
+        insert_action = context_menu.addAction("Insert Blank Pages...")
+        insert_action.triggered.connect(lambda: self._insert_blank_pages(pages[-1]))
+        context_menu.exec(self.thumbnail_list.viewport().mapToGlobal(pos))
+
+    def _move_selected_pages(self, pages):
+        position, ok = QInputDialog.getInt(self, "Move Pages", f"Move before page (1-{self.total_pages + 1}):",
+                                           pages[0] + 1, 1, self.total_pages + 1)
+        if ok: move_pages(self, pages, position - 1)
+
+    def _insert_blank_pages(self, after_page):
+        count, ok = QInputDialog.getInt(self, "Insert Blank Pages", f"Blank pages to insert after page {after_page + 1}:",
+                                        1, 1, 1000)
+        if ok: insert_blank_pages(self, after_page, count)
         
     def load_thumbnails(self):
-        self.thumbnail_list.clear()
-        if self.pdf_document:
-            for page_num in range(self.total_pages):
-                page = self.pdf_document.load_page(page_num)
-                pix = page.get_pixmap(matrix=fitz.Matrix(0.2, 0.2))
-                img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format.Format_RGB888)
-                pixmap = QPixmap.fromImage(img)
-                item = QListWidgetItem(f"Page {page_num + 1}")
-                item.setIcon(QIcon(pixmap))
-                self.thumbnail_list.addItem(item)
+        # Placeholders only; ThumbnailLoader renders the rows that scroll into view
+        self.thumbnail_loader.reset()
                 
     def thumbnail_clicked(self, item):
         self.current_page = self.thumbnail_list.row(item)
@@ -905,14 +1484,18 @@ class PDFReader(PDFReaderUI):
     
         if not self.pdf_document:
             return
+        self.thumbnail_loader.load_visible()
 
-        # Check if a fit-to-page/width zoom mode is active (by checking zoom_combo text)
-        current_zoom_text = self.zoom_combo.currentText()
-    
-        if current_zoom_text == "Fit Width":
-            self.set_zoom_fit_width()
-        elif current_zoom_text == "Fit Page":
-            self.set_zoom_fit_page()
+        # Resize events arrive in bursts (window edge drags, dock toggles): handle at most
+        # one per RESIZE_THROTTLE_MS; the pending timer always covers the final geometry
+        if not self.resize_timer.isActive():
+            self.resize_timer.start()
+
+    def _on_resize_settled(self):
+        if not self.pdf_document: return
+        if self.zoom_fit_mode:
+            # New fit zoom: scaled previews now, one re-render once resizing stops
+            self.set_zoom_fit(self.zoom_fit_mode)
         else:
             # If zoom is set to a fixed percentage (e.g., 100%), only re-render visible pages
             self.update_view() # This will now use the optimized view functions
@@ -933,6 +1516,18 @@ class PDFReader(PDFReaderUI):
             
         self.update_view()
         
+    def closeEvent(self, event):
+        if self.print_job is not None:
+            self.print_job.cancel()
+        if self.save_future is not None:
+            try:
+                self.save_future.result() # Let a running save finish writing the file
+            except Exception:
+                pass
+        self.thumbnail_loader.shutdown()
+        self.render_scheduler.shutdown()
+        super().closeEvent(event)
+
     def toggle_dark_mode(self):
         self.dark_mode = not self.dark_mode
         
@@ -1,7 +1,7 @@
 import sys
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QPushButton, 
                             QLabel, QToolBar, QLineEdit, QStatusBar, QComboBox, 
-                            QDockWidget, QListWidget) # <-- QAction REMOVED from here
+                            QDockWidget, QListWidget, QMenu, QSpacerItem, QSizePolicy) # <-- QAction REMOVED from here
 from PyQt6.QtGui import QIcon, QShortcut, QKeySequence, QAction # <-- QAction ADDED here
 from PyQt6.QtCore import Qt, QSize
 from pdf_scroll_area import PDFScrollArea
@@ -40,6 +40,7 @@ class PDFReaderUI(QMainWindow):
         self.move_down_button = QPushButton()
         self.save_button = QPushButton()
         self.properties_button = QPushButton("Properties")
+        self.forms_button = QPushButton("Forms")
         self.page_input = QLineEdit()
         self.page_label = QLabel(" / 0")
         self.search_input = QLineEdit()
@@ -95,6 +96,7 @@ class PDFReaderUI(QMainWindow):
         self.dark_mode_button.setToolTip("Toggle Scroll Area Background Color")
         self.zoom_fit_width_button.setToolTip("Zoom to fit page width")
         self.zoom_fit_page_button.setToolTip("Zoom to fit entire page in view")
+        self.forms_button.setToolTip("Fill the form from a file, export its values or run a mail merge")
         
         # Toolbar Layout (The structure)
         self.toolbar.addWidget(self.open_button)
@@ -111,6 +113,7 @@ class PDFReaderUI(QMainWindow):
         self.toolbar.addWidget(self.fullscreen_button)
         self.toolbar.addWidget(self.print_button)
         self.toolbar.addWidget(self.properties_button) 
+        self.toolbar.addWidget(self.forms_button)
         self.toolbar.addSeparator()
         self.toolbar.addWidget(self.search_button)
         self.toolbar.addWidget(self.search_input)
@@ -132,9 +135,11 @@ class PDFReaderUI(QMainWindow):
         self.sidebar_widget = QWidget()
         self.sidebar_layout = QVBoxLayout(self.sidebar_widget)
         self.thumbnail_list.setIconSize(QSize(100, 140))
+        self.thumbnail_list.setUniformItemSizes(True) # Lets long lists lay out without measuring every row
         self.thumbnail_list.setDragDropMode(QListWidget.DragDropMode.InternalMove)
         self.thumbnail_list.setDefaultDropAction(Qt.DropAction.MoveAction)
-        self.thumbnail_list.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
+        self.thumbnail_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection) # Ctrl/Shift-click for batch page operations
+        self.thumbnail_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.sidebar_layout.addWidget(QLabel("Table of Contents"))
         self.sidebar_layout.addWidget(self.toc_list)
         self.sidebar_layout.addWidget(QLabel("Thumbnails"))
@@ -148,6 +153,10 @@ class PDFReaderUI(QMainWindow):
         self.pdf_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.pdf_layout.setContentsMargins(0, 0, 0, 0)
         self.pdf_layout.setSpacing(10)
+        # Page widgets are not in the layout: they are placed over the container by the
+        # reader, and this spacer gives the container the size of the page column
+        self.page_spacer = QSpacerItem(0, 0, QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        self.pdf_layout.addItem(self.page_spacer)
         
         # PDFScrollArea requires a reference to the main app object (self), which will be the derived class
         self.scroll_area = PDFScrollArea(self) 
@@ -177,6 +186,7 @@ class PDFReaderUI(QMainWindow):
         self.move_down_button.clicked.connect(self.move_page_down_action) # Renamed lambda to method in app
         self.save_button.clicked.connect(self.save_pdf)
         self.thumbnail_list.itemClicked.connect(self.thumbnail_clicked)
+        self.thumbnail_list.customContextMenuRequested.connect(self._show_thumbnail_context_menu)
         # Note: rowsMoved is a complex signal handled by logic class
         self.toc_list.itemClicked.connect(self.toc_clicked) 
         self.view_mode_button.clicked.connect(self.toggle_view_mode)
@@ -184,6 +194,11 @@ class PDFReaderUI(QMainWindow):
         self.zoom_fit_width_button.clicked.connect(self.set_zoom_fit_width) # Renamed lambda to method in app
         self.zoom_fit_page_button.clicked.connect(self.set_zoom_fit_page) # Renamed lambda to method in app
         self.properties_button.clicked.connect(self.show_metadata)
+        forms_menu = QMenu(self.forms_button)
+        forms_menu.addAction("Fill From JSON/CSV...", self.fill_form_from_file)
+        forms_menu.addAction("Export Field Values...", self.export_form_values)
+        forms_menu.addAction("Mail Merge...", self.mail_merge)
+        self.forms_button.setMenu(forms_menu)
 
     def _setup_shortcuts(self):
         QShortcut(QKeySequence("Ctrl++"), self, self.zoom_in)
@@ -191,6 +206,9 @@ class PDFReaderUI(QMainWindow):
         QShortcut(QKeySequence("Ctrl+-"), self, self.zoom_out)
         QShortcut(QKeySequence("Ctrl+F"), self, self.focus_search)
         QShortcut(QKeySequence("Ctrl+C"), self, self.copy_selected_text)
+        QShortcut(QKeySequence("Ctrl+Z"), self, self.undo_action)
+        QShortcut(QKeySequence("Ctrl+Y"), self, self.redo_action)
+        QShortcut(QKeySequence("Ctrl+Shift+Z"), self, self.redo_action)
         
     def _apply_styles(self):
         self.setStyleSheet("""
@@ -213,6 +231,6 @@ class PDFReaderUI(QMainWindow):
                        self.add_page_button, self.remove_page_button, self.move_up_button, 
                        self.move_down_button, self.save_button, self.view_mode_button, 
                        self.dark_mode_button, self.zoom_fit_width_button, 
-                       self.zoom_fit_page_button, self.properties_button]:
+                       self.zoom_fit_page_button, self.properties_button, self.forms_button]:
             widget.setEnabled(False)
         self.status_bar.showMessage("Ready")
\ No newline at end of file
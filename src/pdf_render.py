@@ -0,0 +1,69 @@
+import fitz  # PyMuPDF
+
+from pdf_edit_log import replay_edits
+
+
+def page_matrix(zoom_level, rotation):
+    """Returns the transformation matrix used for every page raster in the app."""
+    return fitz.Matrix(zoom_level, zoom_level).prerotate(rotation)
+
+
+def pixel_to_page_matrix(page, zoom_level, rotation):
+    """Maps raster pixel coordinates back to page coordinates (the inverse of the render transform)."""
+    matrix = page_matrix(zoom_level, rotation)
+    origin = (page.rect * matrix).tl  # Rasters start at the transformed page's top-left corner
+    return fitz.Matrix(1, 0, 0, 1, origin.x, origin.y) * ~matrix
+
+
+def render_page_pixmap(page, zoom_level, rotation, clip=None):
+    """
+    Rasterizes a fitz.Page at the given zoom and rotation (RGB, no alpha). clip is an
+    optional (x0, y0, x1, y1) in raster pixels, used to render a single tile.
+    """
+    if clip is not None:
+        # get_pixmap expects the clip in page coordinates
+        clip = fitz.Rect(clip) * pixel_to_page_matrix(page, zoom_level, rotation)
+    return page.get_pixmap(matrix=page_matrix(zoom_level, rotation), clip=clip, alpha=False)
+
+
+# --- Worker-process side (runs inside the render pool, see pdf_render_scheduler.py) ---
+
+# Each worker process keeps its own copy of the document; fitz.Document objects cannot
+# be shared between processes, and the GUI thread's document is never touched here.
+_worker_copy = [None, None, 0]  # (file path, base), fitz.Document, edits replayed
+
+
+def worker_document(source):
+    """
+    Returns this process's copy of the document as source describes it (see
+    pdf_edit_log.EditLog.source): the file with the first edit_count logged edits
+    replayed. A copy of the same open that is behind only replays the edits it lacks.
+    """
+    file_path, base, log_path, edit_count = source
+    key, doc, replayed = _worker_copy
+    if doc is None or key != (file_path, base) or replayed > edit_count:
+        if doc is not None:
+            doc.close()
+        doc, replayed = fitz.open(file_path), 0
+        _worker_copy[:] = [(file_path, base), doc, 0]
+    if replayed < edit_count:
+        try:
+            replay_edits(doc, log_path, replayed, edit_count)
+        except Exception:
+            _worker_copy[:] = [None, None, 0]  # Half replayed: start over from the file next time
+            doc.close()
+            raise
+        _worker_copy[2] = edit_count
+    return doc
+
+
+def warm_up_worker():
+    """No-op job used to start pool processes before the first real render."""
+    return True
+
+
+def render_page_job(source, page_num, zoom_level, rotation, clip=None):
+    """Renders one page (or one tile of it) in a worker and returns (width, height, stride, samples)."""
+    doc = worker_document(source)
+    pix = render_page_pixmap(doc.load_page(page_num), zoom_level, rotation, clip)
+    return pix.width, pix.height, pix.stride, pix.samples
@@ -0,0 +1,136 @@
+from collections import OrderedDict
+
+# Default raster budget: enough for a few dozen letter-size pages at 150-200% zoom.
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+# Invalidated rasters kept around as stand-ins until their re-render arrives
+MAX_STALE_ENTRIES = 8
+
+
+def cache_key(page_num, zoom_level, rotation):
+    """Builds the (page, zoom, rotation) key. Zoom is rounded so float noise doesn't miss."""
+    return (page_num, round(zoom_level, 4), rotation % 360)
+
+
+def tile_key(page_num, zoom_level, rotation, column, row):
+    """Key of one tile of a page raster; starts with the page's cache_key so page invalidation covers tiles."""
+    return cache_key(page_num, zoom_level, rotation) + (column, row)
+
+
+def is_page_key(key):
+    """True for page and tile keys; other render jobs (thumbnails, print bands) start with their job kind."""
+    return isinstance(key[0], int)
+
+
+class PageRenderCache:
+    """
+    Bounded LRU cache of rasterized page images keyed by (page, zoom, rotation),
+    and of tiles of large rasters keyed by (page, zoom, rotation, column, row).
+
+    Only the bare page raster is stored; overlays (selection, annotations, search
+    highlights) are painted on a copy by the caller so they never invalidate an entry.
+    """
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()  # key -> (image, nbytes)
+        self._stale = OrderedDict()    # key -> image, outdated but better than a blank placeholder
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Returns the cached image for key (marking it most recently used) or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def get_stale(self, key):
+        """Returns an invalidated raster for key, if one is still around."""
+        return self._stale.get(key)
+
+    def find_preview(self, page_num, zoom_level, rotation):
+        """
+        A whole-page raster of page_num at another zoom level (same rotation) to show
+        scaled until the real one is rendered: the smallest one at least as large as
+        needed, else the largest. Returns None if the page has no raster at all.
+        """
+        rotation %= 360
+        best_zoom, best_image = None, None
+        for entries in (self._entries, self._stale):
+            for key, entry in entries.items():
+                if len(key) != 3 or key[0] != page_num or key[2] != rotation:
+                    continue
+                zoom = key[1]
+                if best_zoom is None or \
+                   (best_zoom < zoom_level and zoom > best_zoom) or \
+                   (zoom_level <= zoom < best_zoom):
+                    best_zoom = zoom
+                    best_image = entry[0] if entries is self._entries else entry
+        return best_image
+
+    def put(self, key, image):
+        """Stores image under key and evicts least recently used entries over budget."""
+        self._stale.pop(key, None)
+        nbytes = image.sizeInBytes()
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+        if nbytes > self.max_bytes:
+            return  # Larger than the whole budget; caching it would flush everything else
+        self._entries[key] = (image, nbytes)
+        self.current_bytes += nbytes
+        self._evict()
+
+    def set_max_bytes(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def invalidate_page(self, page_num):
+        """Drops every raster of one page (e.g. after its annotations or fields changed)."""
+        for key in [k for k in self._entries if is_page_key(k) and k[0] == page_num]:
+            image, nbytes = self._entries.pop(key)
+            self.current_bytes -= nbytes
+            self._stale[key] = image
+        while len(self._stale) > MAX_STALE_ENTRIES:
+            self._stale.popitem(last=False)
+
+    def remap_pages(self, new_page_of):
+        """
+        Renames entries after pages were inserted, deleted or moved (see pdf_page_edits.py).
+        A moved page's raster is still valid; only rasters of deleted pages are dropped.
+        Entries that are not keyed by page are left as they are.
+        """
+        entries = OrderedDict()
+        for key, (image, nbytes) in self._entries.items():
+            if not is_page_key(key):
+                entries[key] = (image, nbytes)
+                continue
+            page_num = new_page_of(key[0])
+            if page_num is None:
+                self.current_bytes -= nbytes
+            else:
+                entries[(page_num,) + key[1:]] = (image, nbytes)
+        self._entries = entries
+        stale = OrderedDict()
+        for key, image in self._stale.items():
+            if not is_page_key(key):
+                stale[key] = image
+                continue
+            page_num = new_page_of(key[0])
+            if page_num is not None:
+                stale[(page_num,) + key[1:]] = image
+        self._stale = stale
+
+    def clear(self):
+        self._entries.clear()
+        self._stale.clear()
+        self.current_bytes = 0
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.current_bytes -= nbytes
@@ -0,0 +1,306 @@
+import heapq
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from pdf_edit_log import EditLog
+from pdf_render import render_page_job, render_page_pixmap, warm_up_worker
+
+# Job priorities (lower runs first)
+VISIBLE_PRIORITY = 0
+THUMBNAIL_PRIORITY = 1
+PREFETCH_PRIORITY = 2
+PRINT_PRIORITY = 3
+
+# Job kinds, so one consumer's retain() never drops another consumer's jobs
+PAGE_JOB = "page"
+TILE_JOB = "tile"
+THUMBNAIL_JOB = "thumbnail"
+PRINT_JOB = "print"
+
+
+class RenderScheduler(QObject):
+    """
+    Rasterizes pages in a process pool so get_pixmap never runs on the GUI thread.
+
+    PyMuPDF holds the GIL while rendering, so a thread pool would still freeze the
+    event loop; each pool process instead opens its own fitz.Document. Finished
+    images come back to the GUI thread through image_ready. At most one job per
+    worker is in flight, the rest wait in a priority queue so visible pages always
+    overtake prefetch work, and queued jobs can be dropped with retain().
+
+    Workers cannot see the edits made to the in-memory document, so each edit is
+    also recorded with record_edit() in an edit log that the workers replay on their
+    copy before the next job (see pdf_edit_log.py). The document is never written out
+    for them on this thread.
+    """
+    image_ready = pyqtSignal(object, QImage)  # key, image
+    render_failed = pyqtSignal(object, str)   # key, error message
+    task_finished = pyqtSignal(object, object, str)  # tag, result (None on error), error message
+    _job_done = pyqtSignal(object, object)    # internal: (job, future), emitted from the pool thread
+    _task_done = pyqtSignal(object, object)   # internal: (tag, future), emitted from the pool thread
+
+    def __init__(self, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self._executor = None
+        self._task_executor = None   # Separate single process for long non-render jobs
+        self._pdf_document = None
+        self._edit_log = None        # pdf_edit_log.EditLog of the edits the workers replay
+        self._retired_logs = []      # Logs of earlier opens, kept while tasks still read them
+        self._log_bases = itertools.count()
+        self._held_logs = {}         # Future of a job that reads the document -> the EditLog it holds
+        self.generation = 0
+        self._queue = []             # heap of (priority, seq, key)
+        self._queued = {}            # key -> job tuple, for queued jobs only
+        self._in_flight = {}         # key -> job tuple, for jobs currently being rendered
+        self._seq = itertools.count()
+        self._closed = False
+        # Queued even when emitted on this thread: a future that is already done runs its
+        # callback inside add_done_callback, before the caller has seen the future
+        self._job_done.connect(self._on_job_done, Qt.ConnectionType.QueuedConnection)
+        self._task_done.connect(self._on_task_done, Qt.ConnectionType.QueuedConnection)
+
+    # --- Document lifecycle ---
+
+    def set_document(self, pdf_document, file_path):
+        """Points the workers at a freshly opened document."""
+        self._pdf_document = pdf_document
+        self._start_edit_log(file_path)
+        self._bump_generation()
+
+    def document_saved(self, file_path):
+        """The document was saved over the file the workers open: later edits are logged against it."""
+        self._start_edit_log(file_path)
+
+    def _start_edit_log(self, file_path):
+        if self._edit_log is not None:
+            self._edit_log.close()
+            self._retired_logs.append(self._edit_log)
+        self._retired_logs = [log for log in self._retired_logs if log.has_files()]
+        self._edit_log = EditLog(file_path, next(self._log_bases))
+
+    def record_edit(self, kind, *args):
+        """Logs an edit just made to the in-memory document (see pdf_edit_log.py for the kinds)."""
+        if self._edit_log is not None:
+            self._edit_log.record(kind, *args)
+
+    def document_changed(self):
+        """Marks the in-memory document as edited: queued and running renders are for the old one."""
+        if self._pdf_document is None:
+            return
+        self._bump_generation()
+
+    def document_source(self):
+        """
+        Returns the source (see pdf_edit_log.EditLog.source) a worker job rebuilds the
+        current document from. Raises OSError if the edits could not be logged.
+        """
+        return self._edit_log.source()
+
+    def _bump_generation(self):
+        self.generation += 1
+        self._queue.clear()
+        self._queued.clear()
+        # In-flight jobs of the old generation are discarded when they finish
+        self._in_flight.clear()
+
+    # --- Job queue ---
+
+    def request(self, key, page_num, zoom_level, rotation, priority=VISIBLE_PRIORITY, kind=PAGE_JOB, clip=None):
+        """
+        Queues a render unless the same key is already queued or running.
+        clip (x0, y0, x1, y1 in raster pixels) renders only that part of the page.
+        """
+        if self._closed or self._pdf_document is None or key in self._in_flight:
+            return
+        if key in self._queued:
+            if priority >= self._queued[key][0]:
+                return
+            # Re-queue with the higher priority; the stale heap entry is skipped later
+        job = (priority, page_num, zoom_level, rotation, self.generation, kind, clip)
+        self._queued[key] = job
+        heapq.heappush(self._queue, (priority, next(self._seq), key))
+        self._dispatch()
+
+    def retain(self, keys, kind=PAGE_JOB):
+        """Drops queued jobs of a kind whose key is not in keys (e.g. after a zoom, rotation or page change)."""
+        for key in [k for k, job in self._queued.items() if job[5] == kind and k not in keys]:
+            del self._queued[key]
+
+    def _dispatch(self):
+        while self._queue and len(self._in_flight) < self.max_workers:
+            priority, _, key = self._queue[0]
+            job = self._queued.get(key)
+            if job is None or job[0] != priority:
+                heapq.heappop(self._queue)
+                continue  # Dropped by retain() or superseded by a higher priority entry
+            heapq.heappop(self._queue)
+            del self._queued[key]
+            if self._edit_log.failed:
+                self._render_inline(key, job) # Workers cannot follow the edits
+            else:
+                self._submit(key, job)
+
+    def _submit(self, key, job):
+        _, page_num, zoom_level, rotation, generation, _, clip = job
+        try:
+            future = self._get_executor().submit(
+                render_page_job, self._edit_log.source(), page_num, zoom_level, rotation, clip
+            )
+        except (OSError, RuntimeError, BrokenProcessPool):
+            # No usable pool: render on this thread instead
+            self._render_inline(key, job)
+            return
+        self._hold_edit_log(future, self._edit_log)
+        self._in_flight[key] = job
+        future.add_done_callback(lambda f, k=key, g=generation: self._emit_job_done((k, g), f))
+
+    def _emit_job_done(self, job, future):
+        # Runs on the executor's callback thread; the signal queues the result to the GUI thread
+        try:
+            self._job_done.emit(job, future)
+        except RuntimeError:
+            pass  # Scheduler already destroyed during shutdown
+
+    def _render_inline(self, key, job):
+        _, page_num, zoom_level, rotation, _, _, clip = job
+        try:
+            pix = render_page_pixmap(self._pdf_document.load_page(page_num), zoom_level, rotation, clip)
+            image = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format.Format_RGB888).copy()
+        except Exception as e:
+            self.render_failed.emit(key, str(e))
+            return
+        self.image_ready.emit(key, image)
+
+    def _on_job_done(self, job, future):
+        key, generation = job
+        self._release_edit_log(future)
+        if self._closed or generation != self.generation:
+            return  # Stale: the document changed while this job was running
+        job = self._in_flight.pop(key, None)
+        if job is None:
+            return
+        try:
+            width, height, stride, samples = future.result()
+        except BrokenProcessPool:
+            # A worker died (e.g. crashed on a malformed page); start a fresh pool next time
+            self._executor = None
+            self._render_inline(key, job)
+            self._dispatch()
+            return
+        except Exception as e:
+            self.render_failed.emit(key, str(e))
+        else:
+            image = QImage(samples, width, height, stride, QImage.Format.Format_RGB888).copy()
+            self.image_ready.emit(key, image)
+        self._dispatch()
+
+    # --- Generic background tasks ---
+
+    def submit_task(self, tag, fn, *args):
+        """
+        Runs fn(*args) in a dedicated worker process so long jobs (indexing, searching)
+        never hold up page renders. The outcome arrives through task_finished(tag, ...).
+        fn must be a module-level function; args and result must be picklable.
+        """
+        return self._start_task(tag, fn, args)
+
+    def submit_document_task(self, tag, fn, *args):
+        """
+        submit_task() for a job that reads the current document: runs fn(source, *args),
+        where source is document_source(), and keeps the edit log the source names on
+        disk until the task has finished.
+        Raises OSError if the edits could not be logged.
+        """
+        edit_log = self._edit_log
+        return self._start_task(tag, fn, (edit_log.source(),) + args, edit_log)
+
+    def _start_task(self, tag, fn, args, edit_log=None):
+        if self._closed:
+            return None
+        try:
+            if self._task_executor is None:
+                self._task_executor = ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context("spawn")
+                )
+            future = self._task_executor.submit(fn, *args)
+        except (OSError, RuntimeError, BrokenProcessPool) as e:
+            self._task_executor = None
+            self.task_finished.emit(tag, None, str(e))
+            return None
+        if edit_log is not None:
+            self._hold_edit_log(future, edit_log)
+        future.add_done_callback(lambda f, t=tag: self._emit_task_done(t, f))
+        return future
+
+    def _emit_task_done(self, tag, future):
+        try:
+            self._task_done.emit(tag, future)
+        except RuntimeError:
+            pass  # Scheduler already destroyed during shutdown
+
+    def _on_task_done(self, tag, future):
+        self._release_edit_log(future)
+        if self._closed or future.cancelled():
+            return
+        try:
+            result = future.result()
+        except BrokenProcessPool as e:
+            self._task_executor = None
+            self.task_finished.emit(tag, None, str(e))
+        except Exception as e:
+            self.task_finished.emit(tag, None, str(e))
+        else:
+            self.task_finished.emit(tag, result, "")
+
+    def _hold_edit_log(self, future, edit_log):
+        # The job reads the log's files, which must outlive a newer open or save meanwhile
+        edit_log.hold()
+        self._held_logs[future] = edit_log
+
+    def _release_edit_log(self, future):
+        edit_log = self._held_logs.pop(future, None)
+        if edit_log is not None:
+            edit_log.release()
+
+    # --- Pool lifecycle ---
+
+    def _get_executor(self):
+        if self._executor is None:
+            # "spawn" avoids forking a process that already runs Qt threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def warm_up(self):
+        """Starts the worker processes ahead of time so the first page isn't delayed by spawning."""
+        try:
+            executor = self._get_executor()
+            for _ in range(self.max_workers):
+                executor.submit(warm_up_worker)
+        except (OSError, RuntimeError, BrokenProcessPool):
+            self._executor = None
+
+    def shutdown(self):
+        self._closed = True
+        self._queue.clear()
+        self._queued.clear()
+        self._in_flight.clear()
+        for executor in (self._executor, self._task_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._task_executor = None
+        for edit_log in self._held_logs.values():
+            edit_log.release()
+        self._held_logs.clear()
+        for edit_log in self._retired_logs + [self._edit_log]:
+            if edit_log is not None:
+                edit_log.close()
@@ -0,0 +1,53 @@
+"""
+Saving the document, in one of three modes:
+
+- incremental: appends only the changed objects to the original file. Cheap for one
+  annotation on a large scan, and done on the GUI thread since it is O(changes).
+- full: rewrites the whole file, like fitz's default save.
+- optimized: full rewrite that drops unused objects and compresses the streams.
+
+Full saves run in a worker process (PyMuPDF holds the GIL while writing, so a thread
+would still freeze the window), which opens the file and replays the unsaved edits
+(see pdf_edit_log.py); the GUI thread never serializes the document. They are written to a temporary file next to the
+target and renamed over it, so an interrupted save never leaves a truncated PDF.
+"""
+import os
+
+from pdf_render import worker_document
+
+SAVE_INCREMENTAL = "Incremental (append changes only)"
+SAVE_FULL = "Full"
+SAVE_OPTIMIZED = "Optimized (compact and compress)"
+
+OPTIMIZED_SAVE_OPTIONS = {"garbage": 4, "deflate": True, "deflate_images": True, "deflate_fonts": True}
+
+
+def save_modes(same_file, incremental_possible):
+    """Modes offered for a target file; the first one is the default."""
+    if same_file and incremental_possible:
+        return [SAVE_INCREMENTAL, SAVE_OPTIMIZED]
+    return [SAVE_FULL, SAVE_OPTIMIZED]
+
+
+def size_text(size):
+    """Size suffix for status messages, e.g. ' (12 KB)'; empty if the size is unknown."""
+    if size is None:
+        return ""
+    return f" ({size / 1048576:.1f} MB)" if size >= 1048576 else f" ({size / 1024:.0f} KB)"
+
+
+def save_document_job(source, file_name, optimize):
+    """
+    Worker-process job: writes the document (the file with its unsaved edits replayed,
+    see RenderScheduler.document_source) to file_name. Returns the new size.
+    """
+    doc = worker_document(source)
+    temp_path = file_name + ".saving"
+    try:
+        doc.save(temp_path, **(OPTIMIZED_SAVE_OPTIONS if optimize else {}))
+        os.replace(temp_path, file_name)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return os.path.getsize(file_name)
@@ -0,0 +1,248 @@
+import json
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+
+import fitz  # PyMuPDF
+
+from pdf_disk_cache import content_hash
+from pdf_page_edits import insert_mapping, delete_mapping, move_mapping, order_mapping, remap_keys, reorder_keys
+from pdf_render import worker_document
+
+INDEX_VERSION = 1
+
+
+def normalize_term(term):
+    """Search terms match the index's text: lower-cased, with single spaces between words."""
+    return " ".join(term.lower().split())
+
+
+def index_path(pdf_file_path):
+    """The index lives next to the PDF, like the .annotations.json sidecar."""
+    return pdf_file_path + ".searchindex.json"
+
+
+class PageText:
+    """
+    Searchable text of one page: its words lower-cased and joined by single spaces,
+    with each word's start offset, bounding box and line number kept in flat arrays.
+    """
+    __slots__ = ("text", "starts", "rects", "lines")
+
+    def __init__(self, text="", starts=None, rects=None, lines=None):
+        self.text = text
+        self.starts = starts if starts is not None else array("i")
+        self.rects = rects if rects is not None else array("f")  # x0, y0, x1, y1 per word
+        self.lines = lines if lines is not None else array("i")
+
+    @classmethod
+    def from_page(cls, page):
+        page_text = cls()
+        parts = []
+        offset = 0
+        line_ids = {}
+        for x0, y0, x1, y1, word, block_no, line_no, _ in page.get_text("words"):
+            word = word.lower()
+            page_text.starts.append(offset)
+            page_text.rects.extend((x0, y0, x1, y1))
+            page_text.lines.append(line_ids.setdefault((block_no, line_no), len(line_ids)))
+            parts.append(word)
+            offset += len(word) + 1
+        page_text.text = " ".join(parts)
+        return page_text
+
+    def _word_end(self, word):
+        if word + 1 < len(self.starts):
+            return self.starts[word + 1] - 1
+        return len(self.text)
+
+    def find(self, term):
+        """Returns one fitz.Rect per matched line fragment, like page.search_for()."""
+        rects = []
+        start = self.text.find(term)
+        while start != -1:
+            end = start + len(term)
+            first = bisect_right(self.starts, start) - 1
+            last = bisect_right(self.starts, end - 1) - 1
+            by_line = {}
+            for word in range(max(0, first), last + 1):
+                x0, y0, x1, y1 = self.rects[4 * word:4 * word + 4]
+                word_start, word_end = self.starts[word], self._word_end(word)
+                width = (x1 - x0) / max(1, word_end - word_start)
+                # Trim the box to the matched characters of partially matched words
+                left = x0 + width * max(0, start - word_start)
+                right = x0 + width * min(word_end - word_start, end - word_start)
+                rect = fitz.Rect(min(left, x1), y0, max(right, left), y1)
+                line = self.lines[word]
+                by_line[line] = by_line[line] | rect if line in by_line else rect
+            rects.extend(by_line.values())
+            start = self.text.find(term, start + 1)
+        return rects
+
+    def to_json(self):
+        return {"text": self.text, "starts": list(self.starts),
+                "rects": [round(v, 2) for v in self.rects], "lines": list(self.lines)}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["text"], array("i", data["starts"]), array("f", data["rects"]), array("i", data["lines"]))
+
+
+class SearchIndex:
+    """
+    Full-text index of a document, built once and stored in a sidecar file.
+    The sidecar is only reused if the PDF's content hash still matches.
+    """
+    def __init__(self, document_hash, pages):
+        self.document_hash = document_hash
+        self.pages = pages  # [PageText], one per page in current page order
+
+    @classmethod
+    def build(cls, pdf_document, document_hash):
+        return cls(document_hash, [PageText.from_page(page) for page in pdf_document])
+
+    @classmethod
+    def load(cls, path, document_hash):
+        """Returns the stored index, or None if it is missing, corrupt or for other content."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION or data.get("content_hash") != document_hash:
+                return None
+            return cls(document_hash, [PageText.from_json(page) for page in data["pages"]])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, path):
+        """Writes the index atomically (temp file + rename)."""
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "content_hash": self.document_hash,
+                       "pages": [page.to_json() for page in self.pages]}, f, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    def query(self, term):
+        """Returns the SearchResults for term (case-insensitive)."""
+        results = SearchResults(term)
+        term = normalize_term(term)
+        if not term:
+            return results
+        for page_num, page_text in enumerate(self.pages):
+            if term in page_text.text:
+                results.add(page_num, page_text.find(term))
+        return results
+
+    def find(self, page_num, term):
+        """The hits of term on one page, as query() would report them."""
+        term = normalize_term(term)
+        return self.pages[page_num].find(term) if term else []
+
+    # Page edits are mirrored so the index keeps matching the in-memory document
+
+    def insert_blank_page(self, page_num):
+        self.pages.insert(page_num, PageText())
+
+    def delete_page(self, page_num):
+        del self.pages[page_num]
+
+    def move_page(self, from_page, to_page):
+        self.pages.insert(to_page, self.pages.pop(from_page))
+
+    def reindex_page(self, pdf_document, page_num):
+        """Re-reads one page's text, e.g. for a deleted page that was restored by undo."""
+        self.pages[page_num] = PageText.from_page(pdf_document.load_page(page_num))
+
+    def reorder_pages(self, order):
+        self.pages = [PageText() if old_page is None else self.pages[old_page] for old_page in order]
+
+
+class SearchResults:
+    """
+    Search hits keyed by page, so painting a page only looks at that page's rects.
+
+    A result is one page with matches; `current` is the index of the shown result
+    in page order. Page edits remap the keys instead of rebuilding the hits, and
+    the current result stays on the same page when its index shifts.
+    """
+    def __init__(self, term=""):
+        self.term = term  # The query, so pages restored by undo can be searched again
+        self.rects = {}   # page -> [fitz.Rect]
+        self.pages = []   # pages with hits, ascending
+        self.current = -1
+
+    def __len__(self):
+        return len(self.pages)
+
+    def add(self, page_num, rects):
+        if page_num in self.rects:
+            self.rects[page_num].extend(rects)
+            return
+        self.rects[page_num] = list(rects)
+        index = bisect_left(self.pages, page_num)
+        self.pages.insert(index, page_num)
+        if 0 <= index <= self.current:
+            self.current += 1
+
+    def rects_for(self, page_num):
+        return self.rects.get(page_num, ())
+
+    def current_page(self):
+        """Page of the current result, or -1 if there is none."""
+        return self.pages[self.current] if 0 <= self.current < len(self.pages) else -1
+
+    def _remap(self, new_page_of, rects=None):
+        current_page = self.current_page()
+        self.rects = remap_keys(self.rects, new_page_of) if rects is None else rects
+        self.pages = sorted(self.rects)
+        if current_page < 0 or not self.pages:
+            self.current = -1
+        else:
+            # A deleted current result falls through to the next one
+            new_current = new_page_of(current_page)
+            self.current = min(bisect_left(self.pages, current_page if new_current is None else new_current),
+                               len(self.pages) - 1)
+
+    # Same page-edit methods as SearchIndex
+
+    def insert_blank_page(self, page_num):
+        self._remap(insert_mapping(page_num))
+
+    def delete_page(self, page_num):
+        self._remap(delete_mapping(page_num))
+
+    def move_page(self, from_page, to_page):
+        self._remap(move_mapping(from_page, to_page))
+
+    def reorder_pages(self, order):
+        self._remap(order_mapping(order), reorder_keys(self.rects, order))
+
+def load_or_build_index_job(pdf_file_path):
+    """
+    Worker-process job: returns the document's SearchIndex, reading the sidecar when
+    its content hash matches and otherwise building it and writing a fresh sidecar.
+    """
+    document_hash = content_hash(pdf_file_path)
+    path = index_path(pdf_file_path)
+    index = SearchIndex.load(path, document_hash)
+    if index is None:
+        with fitz.open(pdf_file_path) as pdf_document:
+            index = SearchIndex.build(pdf_document, document_hash)
+        try:
+            index.save(path)
+        except OSError:
+            pass  # Read-only location: the index still serves this session
+    return index
+
+
+def search_pages_job(source, term, first_page, last_page):
+    """
+    Worker-process job for searches without an index: scans pages [first_page, last_page)
+    and returns [(page_num, [(x0, y0, x1, y1)])] for the pages with matches.
+    """
+    doc = worker_document(source)
+    hits = []
+    for page_num in range(first_page, min(last_page, doc.page_count)):
+        rects = doc.load_page(page_num).search_for(term)
+        if rects:
+            hits.append((page_num, [tuple(rect) for rect in rects]))
+    return hits
@@ -0,0 +1,262 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtWidgets import QListWidgetItem
+from PyQt6.QtGui import QPixmap, QIcon, QColor
+from PyQt6.QtCore import QObject, Qt, QPoint, QTimer, pyqtSignal
+
+from pdf_disk_cache import ThumbnailDiskCache, thumbnail_cache_hash
+from pdf_page_layout import pixel_size
+from pdf_render_scheduler import THUMBNAIL_JOB, THUMBNAIL_PRIORITY
+
+THUMBNAIL_ZOOM = 0.2
+# Placeholder rows added per event loop turn; the first batch covers the rows on screen
+PLACEHOLDER_ROWS_PER_STEP = 500
+# Item data role marking rows whose real thumbnail is already set
+THUMBNAIL_LOADED_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+class ThumbnailLoader(QObject):
+    """
+    Fills the thumbnail sidebar lazily.
+
+    Every page gets a grey placeholder row. For a freshly opened file only the first
+    batch is added up front; the rest follow a batch per event loop turn once the
+    reader calls start_background_work(), so a long document shows its first page
+    without waiting for its last row. Placeholders of one size share one icon. Real
+    thumbnails are only produced for rows scrolled into view, first from the on-disk cache (keyed by
+    the file's content hash) and otherwise by the background render pool. Rows of a freshly opened
+    file wait for the hash, so a thumbnail already on disk is never rendered again.
+    """
+    _hash_ready = pyqtSignal(int, str)  # generation, content hash (emitted from the hashing thread)
+
+    def __init__(self, reader):
+        super().__init__(reader)
+        self.reader = reader
+        self.thumbnail_list = reader.thumbnail_list
+        self.disk_cache = None
+        self.file_path = ""
+        self.generation = 0  # Bumped when a file is opened or edited; a hash from an older one is dropped
+        self._placeholder_icons = {}  # (width, height) -> shared grey QIcon
+        self._row_target = 0  # Rows the list has once every placeholder batch is in
+        self._hash_pending = False
+        self._hash_settled = True  # False from opening a file until its disk cache is looked up
+        self._fill_timer = QTimer(self)
+        self._fill_timer.setSingleShot(True)
+        self._fill_timer.timeout.connect(self._add_next_rows)
+        self._hash_executor = ThreadPoolExecutor(max_workers=1)
+        self._hash_ready.connect(self._on_hash_ready)
+        reader.render_scheduler.image_ready.connect(self._on_image_ready)
+        self.thumbnail_list.verticalScrollBar().valueChanged.connect(self.load_visible)
+
+    def reset(self, file_path=None):
+        """
+        Rebuilds the list with placeholders. Pass file_path for a freshly opened file;
+        its remaining rows and disk cache then wait for start_background_work().
+        """
+        if file_path is not None:
+            self.file_path = file_path
+            self.disk_cache = None
+            self.generation += 1
+            self._hash_pending = True
+            self._hash_settled = False
+        self._fill_timer.stop()
+        self.thumbnail_list.clear()
+        self._placeholder_icons.clear()
+        self._row_target = self.reader.total_pages if self.reader.pdf_document else 0
+        self._add_placeholder_rows(PLACEHOLDER_ROWS_PER_STEP)
+        if self._row_target:
+            # Rows only get geometry once the list has laid them out
+            QTimer.singleShot(0, self.load_visible)
+        if file_path is None:
+            self.start_background_work()
+
+    def start_background_work(self):
+        """Adds the remaining rows and looks up the disk cache (both cost time in proportion to the file)."""
+        if self._hash_pending:
+            self._hash_pending = False
+            future = self._hash_executor.submit(thumbnail_cache_hash, self.file_path)
+            future.add_done_callback(lambda f, g=self.generation: self._emit_hash(g, f))
+        if self.thumbnail_list.count() < self._row_target:
+            self._fill_timer.start(0)
+
+    def _add_placeholder_rows(self, end_row):
+        for page_num in range(self.thumbnail_list.count(), min(end_row, self._row_target)):
+            self.thumbnail_list.addItem(self._placeholder_item(page_num))
+
+    def _add_next_rows(self):
+        self._add_placeholder_rows(self.thumbnail_list.count() + PLACEHOLDER_ROWS_PER_STEP)
+        if self.thumbnail_list.count() < self._row_target:
+            self._fill_timer.start(0)
+        elif self.thumbnail_list.currentRow() != self.reader.current_page:
+            self.thumbnail_list.setCurrentRow(self.reader.current_page) # Its row may not have existed yet
+
+    def _finish_rows(self):
+        """Adds the placeholder rows still pending; page edits renumber the full list."""
+        self._fill_timer.stop()
+        self._add_placeholder_rows(self._row_target)
+
+    def _placeholder_item(self, page_num):
+        item = QListWidgetItem(f"Page {page_num + 1}")
+        item.setIcon(self._placeholder_icon(page_num))
+        return item
+
+    def _placeholder_icon(self, page_num):
+        page_sizes = self.reader.page_layout.page_sizes
+        size = pixel_size(*page_sizes[page_num], THUMBNAIL_ZOOM, 0) if page_num < len(page_sizes) else (100, 140)
+        icon = self._placeholder_icons.get(size)
+        if icon is None:
+            pixmap = QPixmap(*size)
+            pixmap.fill(QColor(220, 220, 220))
+            icon = self._placeholder_icons[size] = QIcon(pixmap)
+        return icon
+
+    def _emit_hash(self, generation, future):
+        try:
+            document_hash = future.result()
+        except OSError:
+            document_hash = ""  # Unreadable file: no disk cache, thumbnails are rendered
+        try:
+            self._hash_ready.emit(generation, document_hash)
+        except RuntimeError:
+            pass  # Loader already destroyed
+
+    def _on_hash_ready(self, generation, document_hash):
+        if generation != self.generation:
+            return  # Another file was opened, or this one edited, while it was hashed
+        self._hash_settled = True
+        if document_hash:
+            try:
+                self.disk_cache = ThumbnailDiskCache(document_hash)
+            except OSError:
+                pass  # No writable cache directory; thumbnails are still rendered on demand
+        self.load_visible()
+
+    def document_changed(self, page_num=None):
+        """
+        Called after the document is edited. Page numbers no longer match the file on
+        disk, so the disk cache is left alone for the rest of the session; the edited
+        page (if given) is re-rendered.
+        """
+        self._disable_disk_cache()
+        if page_num is not None and page_num < self.thumbnail_list.count():
+            self.thumbnail_list.item(page_num).setData(THUMBNAIL_LOADED_ROLE, False)
+        self.load_visible()
+
+    def visible_rows(self):
+        count = self.thumbnail_list.count()
+        if not count:
+            return range(0)
+        viewport = self.thumbnail_list.viewport()
+        first = self.thumbnail_list.indexAt(QPoint(0, 0)).row()
+        if first < 0:
+            return range(0)  # Not laid out yet
+        last = self.thumbnail_list.indexAt(QPoint(0, viewport.height() - 1)).row()
+        last = count - 1 if last < 0 else last
+        return range(first, last + 1)
+
+    def load_visible(self, *args):
+        """Loads thumbnails for the rows in view; off-screen rows keep their placeholder."""
+        if not self.reader.pdf_document or not self._hash_settled:
+            return  # _on_hash_ready() loads them once the disk cache is known
+        scheduler = self.reader.render_scheduler
+        wanted = set()
+        for row in self.visible_rows():
+            item = self.thumbnail_list.item(row)
+            if item.data(THUMBNAIL_LOADED_ROLE):
+                continue
+            if self.disk_cache and self.disk_cache.has(row):
+                pixmap = QPixmap(self.disk_cache.path(row))
+                if not pixmap.isNull():
+                    self._set_thumbnail(row, pixmap)
+                    continue
+            key = (THUMBNAIL_JOB, row)
+            wanted.add(key)
+            scheduler.request(key, row, THUMBNAIL_ZOOM, 0, THUMBNAIL_PRIORITY, THUMBNAIL_JOB)
+        scheduler.retain(wanted, THUMBNAIL_JOB)
+
+    def _set_thumbnail(self, row, pixmap):
+        item = self.thumbnail_list.item(row)
+        if item is None:
+            return
+        item.setIcon(QIcon(pixmap))
+        item.setData(THUMBNAIL_LOADED_ROLE, True)
+
+    def _on_image_ready(self, key, image):
+        if key[0] != THUMBNAIL_JOB:
+            return
+        row = key[1]
+        self._set_thumbnail(row, QPixmap.fromImage(image))
+        if self.disk_cache:
+            try:
+                if image.save(self.disk_cache.temp_path(row), "PNG"):
+                    self.disk_cache.commit(row)
+            except OSError:
+                pass  # A read-only cache directory just means no persistence
+
+    def page_moved(self, from_row, to_row, list_already_moved=False):
+        """Moves an existing thumbnail instead of regenerating the list."""
+        self._finish_rows()
+        if not list_already_moved:
+            item = self.thumbnail_list.takeItem(from_row)
+            if item is None:
+                return
+            self.thumbnail_list.insertItem(to_row, item)
+        self._rows_renumbered(min(from_row, to_row), max(from_row, to_row) + 1)
+
+    def page_inserted(self, row):
+        """Adds a placeholder row for a new page; the other rows keep their thumbnails."""
+        self._finish_rows()
+        self._row_target += 1
+        self.thumbnail_list.insertItem(row, self._placeholder_item(row))
+        self._rows_renumbered(row, self.thumbnail_list.count())
+        self.load_visible()
+
+    def page_removed(self, row):
+        self._finish_rows()
+        self._row_target -= 1
+        item = self.thumbnail_list.takeItem(row)
+        if item is None:
+            return
+        self._rows_renumbered(row, self.thumbnail_list.count())
+        self.load_visible()
+
+    def pages_reordered(self, order, list_already_reordered=False):
+        """
+        Batch edit: order[row] is the old row shown there, or None for a new blank page.
+        Kept rows keep their thumbnails; copies of duplicated pages get a clone of theirs.
+        """
+        self._finish_rows()
+        self._row_target = len(order)
+        if list_already_reordered:
+            self._rows_renumbered(0, len(order))
+            return
+        old_items = [self.thumbnail_list.takeItem(row) for row in reversed(range(self.thumbnail_list.count()))]
+        old_items.reverse()
+        used = set()
+        for row, old_row in enumerate(order):
+            if old_row is None:
+                item = self._placeholder_item(row)
+            elif old_row in used:
+                item = old_items[old_row].clone()
+            else:
+                item = old_items[old_row]
+                used.add(old_row)
+            self.thumbnail_list.addItem(item)
+        self._rows_renumbered(0, len(order))
+        self.load_visible()
+
+    def _rows_renumbered(self, first_row, end_row):
+        # Page numbers no longer match the file on disk, so the disk cache is off from here
+        self._disable_disk_cache()
+        for row in range(first_row, min(self.thumbnail_list.count(), end_row)):
+            self.thumbnail_list.item(row).setText(f"Page {row + 1}")
+
+    def _disable_disk_cache(self):
+        self.disk_cache = None
+        self._hash_pending = False
+        self._hash_settled = True
+        self.generation += 1  # A hash still being computed must not turn it back on
+
+    def shutdown(self):
+        self._fill_timer.stop()
+        self._hash_executor.shutdown(wait=False, cancel_futures=True)
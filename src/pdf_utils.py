@@ -1,174 +1,205 @@
-import json
-import os
 import fitz
 from PyQt6.QtWidgets import QMessageBox
-from PyQt6.QtCore import QRectF, Qt, QPoint
+from PyQt6.QtCore import QRectF, Qt, QPoint, QTimer
 
-def load_annotations(pdf_document, pdf_file_path):
-    annotations = {}
-    if pdf_document:
-        try:
-            for page_num in range(pdf_document.page_count):
-                page = pdf_document.load_page(page_num)
-                for annot in page.annots():
-                    if annot.type[0] == 8:
-                        pos = annot.rect.top_left
-                        text = annot.info["content"]
-                        if page_num not in annotations:
-                            annotations[page_num] = []
-                        annotations[page_num].append((pos.x, pos.y, text))
-        except Exception as e:
-            if hasattr(pdf_document, 'status_bar'):
-                pdf_document.status_bar.showMessage(f"Error loading PDF annotations: {str(e)}")
-    annotation_file = pdf_file_path + ".annotations.json"
-    if os.path.exists(annotation_file):
-        try:
-            with open(annotation_file, "r") as f:
-                json_annotations = json.load(f)
-                json_annotations = {int(k): v for k, v in json_annotations.items()}
-                for page_num in json_annotations:
-                    if page_num not in annotations:
-                        annotations[page_num] = []
-                    for x, y, text in json_annotations[page_num]:
-                        duplicate = False
-                        for existing_x, existing_y, existing_text in annotations[page_num]:
-                            if abs(existing_x - x) < 1 and abs(existing_y - y) < 1 and existing_text == text:
-                                duplicate = True
-                                break
-                        if not duplicate:
-                            annotations[page_num].append((x, y, text))
-        except Exception as e:
-            if hasattr(pdf_document, 'status_bar'):
-                pdf_document.status_bar.showMessage(f"Error loading JSON annotations: {str(e)}")
-    return annotations
+from pdf_notes import add_note_annot, delete_note_annot
+from pdf_edit_journal import save_pages
+from pdf_page_edits import insert_mapping, delete_mapping, move_mapping, order_mapping, select_pages
+from pdf_search import SearchResults, search_pages_job
 
 def save_annotations(pdf_reader):
-    if pdf_reader.pdf_file_path:
-        annotation_file = pdf_reader.pdf_file_path + ".annotations.json"
+    """
+    Rewrites the whole sidecar (atomically); for bulk changes, single notes are journaled.
+    Skipped while page edits are unsaved: the sidecar keeps the page numbers of the
+    file on disk until the PDF is saved over it.
+    """
+    if pdf_reader.annotation_sidecar is not None and pdf_reader.disk_page_numbers is None:
         try:
-            with open(annotation_file, "w") as f:
-                json.dump(pdf_reader.annotations, f)
+            pdf_reader.annotation_sidecar.compact(pdf_reader.annotations)
             pdf_reader.status_bar.showMessage("Annotations saved to JSON")
         except Exception as e:
             pdf_reader.status_bar.showMessage(f"Error saving JSON annotations: {str(e)}")
 
+def _journal_note(pdf_reader, op, page_num, note, index):
+    """Appends one added/deleted note to the sidecar journal: O(1) whatever the number of notes."""
+    if pdf_reader.annotation_sidecar is not None:
+        annotations = pdf_reader.annotations
+        if pdf_reader.disk_page_numbers is not None:
+            # Unsaved page edits: record the note under its page in the file on disk
+            page_num = pdf_reader.disk_page_numbers[page_num]
+            if page_num is None:
+                return # A page the file does not have yet; its notes are written when the PDF is saved
+            annotations = None # No compaction: the map is in the edited numbering
+        try:
+            pdf_reader.annotation_sidecar.append(op, page_num, note, index, annotations)
+        except Exception as e:
+            pdf_reader.status_bar.showMessage(f"Error saving JSON annotations: {str(e)}")
+
+def _mirror_page_edit(pdf_reader, method, *args):
+    """Applies a page insert/delete/move to the search index and results so they keep matching the document."""
+    pdf_reader.pages_edited = True
+    cancel_search(pdf_reader)  # A running scan would report pages under their old numbers
+    getattr(pdf_reader.search_results, method)(*args)
+    if pdf_reader.search_index is not None:
+        getattr(pdf_reader.search_index, method)(*args)
+
+# Searches without an index scan the document in chunks on the task worker, so the
+# first hit shows up while later pages are still being searched
+SEARCH_CHUNK_PAGES = 25
+SEARCH_CHUNKS_IN_FLIGHT = 2
+
 def search_text(pdf_reader):
     search_term = pdf_reader.search_input.text().strip()
     if not search_term:
         pdf_reader.status_bar.showMessage("Enter a search term")
         return
-    pdf_reader.search_results = []
-    pdf_reader.current_search_index = -1
+    cancel_search(pdf_reader)
+    pdf_reader.search_results = SearchResults(search_term)
     try:
-        for page_num in range(pdf_reader.total_pages):
-            page = pdf_reader.pdf_document.load_page(page_num)
-            rects = page.search_for(search_term)
-            if rects:
-                pdf_reader.search_results.append({"page": page_num, "rects": rects})
-        if pdf_reader.search_results:
-            pdf_reader.current_search_index = 0
-            pdf_reader.current_page = pdf_reader.search_results[0]["page"]
-            pdf_reader.annotation_mode = False
-            pdf_reader.toggle_annotation_mode(force_off=True) # Ensure cursor reset
-            pdf_reader.update_view() # CHANGED FROM update_page()
-            
-            # Use view_mode to conditionally enable/disable prev/next buttons
-            is_single = (pdf_reader.view_mode == 0)
-            pdf_reader.prev_button.setEnabled(pdf_reader.current_page > 0 and is_single)
-            pdf_reader.next_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1 and is_single)
-            pdf_reader.move_up_button.setEnabled(pdf_reader.current_page > 0)
-            pdf_reader.move_down_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1)
-            pdf_reader.thumbnail_list.setCurrentRow(pdf_reader.current_page)
-            if pdf_reader.view_mode == 1:
-                pdf_reader.scroll_to_page(pdf_reader.current_page)
-                
-            pdf_reader.next_search_button.setEnabled(len(pdf_reader.search_results) > 1)
-            pdf_reader.prev_search_button.setEnabled(False)
-            pdf_reader.status_bar.showMessage(f"Found {len(pdf_reader.search_results)} matches")
+        if pdf_reader.search_index is not None:
+            # Answered from the full-text index (see pdf_search.py) without touching any page
+            pdf_reader.search_results = pdf_reader.search_index.query(search_term)
+            if pdf_reader.search_results:
+                pdf_reader.search_results.current = 0
+                _show_search_result(pdf_reader)
+            _finish_search(pdf_reader)
         else:
-            pdf_reader.next_search_button.setEnabled(False)
-            pdf_reader.prev_search_button.setEnabled(False)
-            pdf_reader.status_bar.showMessage("No matches found")
+            _start_streaming_search(pdf_reader, search_term)
     except Exception as e:
         pdf_reader.status_bar.showMessage(f"Search error: {str(e)}")
 
-def next_search_result(pdf_reader):
-    if pdf_reader.search_results and pdf_reader.current_search_index < len(pdf_reader.search_results) - 1:
-        pdf_reader.current_search_index += 1
-        pdf_reader.current_page = pdf_reader.search_results[pdf_reader.current_search_index]["page"]
-        pdf_reader.annotation_mode = False
-        pdf_reader.toggle_annotation_mode(force_off=True) # Ensure cursor reset
-        pdf_reader.update_view() # CHANGED FROM update_page()
+def cancel_search(pdf_reader):
+    """Stops a running streaming search; chunks still in the worker are ignored when they finish."""
+    pdf_reader.search_id += 1
+    for future in pdf_reader.search_futures:
+        future.cancel()
+    pdf_reader.search_futures = []
+    pdf_reader.search_chunks_pending = 0
+
+def _start_streaming_search(pdf_reader, search_term):
+    pdf_reader.search_term = search_term
+    pdf_reader.search_next_page = 0
+    pdf_reader.next_search_button.setEnabled(False)
+    pdf_reader.prev_search_button.setEnabled(False)
+    pdf_reader.status_bar.showMessage(f"Searching for '{search_term}'...")
+    for _ in range(SEARCH_CHUNKS_IN_FLIGHT):
+        _submit_search_chunk(pdf_reader)
+    if not pdf_reader.search_chunks_pending:
+        _finish_search(pdf_reader)  # Empty document
+
+def _submit_search_chunk(pdf_reader):
+    first_page = pdf_reader.search_next_page
+    if first_page >= pdf_reader.total_pages:
+        return
+    last_page = min(pdf_reader.total_pages, first_page + SEARCH_CHUNK_PAGES)
+    pdf_reader.search_next_page = last_page
+    pdf_reader.search_chunks_pending += 1
+    tag = ("search", pdf_reader.search_id, first_page, last_page)
+    try:
+        # On failure the task reports through task_finished, which ends in handle_search_chunk
+        future = pdf_reader.render_scheduler.submit_document_task(
+            tag, search_pages_job, pdf_reader.search_term, first_page, last_page
+        )
+    except OSError as e:
+        handle_search_chunk(pdf_reader, tag, None, str(e))
+        return
+    if future is not None:
+        pdf_reader.search_futures.append(future)
+
+def _search_pages_inline(pdf_reader, first_page, last_page):
+    """Fallback when the worker is unavailable: same result as search_pages_job, on this thread."""
+    hits = []
+    for page_num in range(first_page, last_page):
+        rects = pdf_reader.pdf_document.load_page(page_num).search_for(pdf_reader.search_term)
+        if rects:
+            hits.append((page_num, rects))
+    return hits
+
+def handle_search_chunk(pdf_reader, tag, result, error):
+    """Receives one scanned chunk of a streaming search (called from task_finished)."""
+    _, search_id, first_page, last_page = tag
+    if search_id != pdf_reader.search_id:
+        return  # Cancelled by a newer query, a page edit or a newly opened file
+    pdf_reader.search_chunks_pending -= 1
+    try:
+        if result is None:
+            result = _search_pages_inline(pdf_reader, first_page, last_page)
+    except Exception as e:
+        cancel_search(pdf_reader)
+        pdf_reader.status_bar.showMessage(f"Search error: {str(e)}")
+        return
+    pdf_reader.search_futures = [f for f in pdf_reader.search_futures if not f.done()]
+    results = pdf_reader.search_results
+    new_pages = set()
+    for page_num, rects in result:
+        results.add(page_num, [fitz.Rect(r) for r in rects])
+        new_pages.add(page_num)
+    if new_pages:
+        if results.current < 0:
+            # Jump to the first match without waiting for the rest of the document
+            results.current = 0
+            _show_search_result(pdf_reader)
+        elif new_pages & pdf_reader.displayed_pages:
+            pdf_reader.update_view()  # Paint the new highlights on pages already on screen
+        pdf_reader.next_search_button.setEnabled(results.current < len(results) - 1)
+    _submit_search_chunk(pdf_reader)
+    if pdf_reader.search_chunks_pending:
+        pdf_reader.status_bar.showMessage(
+            f"Found {len(pdf_reader.search_results)} matches so far "
+            f"({last_page} of {pdf_reader.total_pages} pages searched)...")
+    else:
+        _finish_search(pdf_reader)
+
+def _finish_search(pdf_reader):
+    if pdf_reader.search_results:
+        pdf_reader.status_bar.showMessage(f"Found {len(pdf_reader.search_results)} matches")
+    else:
+        pdf_reader.next_search_button.setEnabled(False)
+        pdf_reader.prev_search_button.setEnabled(False)
+        pdf_reader.status_bar.showMessage("No matches found")
+
+def _show_search_result(pdf_reader):
+    """Shows the page of the current search result and updates the navigation buttons."""
+    results = pdf_reader.search_results
+    pdf_reader.current_page = results.current_page()
+    pdf_reader.annotation_mode = False
+    pdf_reader.toggle_annotation_mode(force_off=True) # Ensure cursor reset
+    pdf_reader.update_view() # CHANGED FROM update_page()
+    
+    # Use view_mode to conditionally enable/disable prev/next buttons
+    is_single = (pdf_reader.view_mode == 0)
+    pdf_reader.prev_button.setEnabled(pdf_reader.current_page > 0 and is_single)
+    pdf_reader.next_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1 and is_single)
+    pdf_reader.move_up_button.setEnabled(pdf_reader.current_page > 0)
+    pdf_reader.move_down_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1)
+    pdf_reader.thumbnail_list.setCurrentRow(pdf_reader.current_page)
+    if pdf_reader.view_mode == 1:
+        pdf_reader.scroll_to_page(pdf_reader.current_page)
         
-        is_single = (pdf_reader.view_mode == 0)
-        pdf_reader.prev_button.setEnabled(pdf_reader.current_page > 0 and is_single)
-        pdf_reader.next_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1 and is_single)
-        pdf_reader.move_up_button.setEnabled(pdf_reader.current_page > 0)
-        pdf_reader.move_down_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1)
-        pdf_reader.thumbnail_list.setCurrentRow(pdf_reader.current_page)
-        if pdf_reader.view_mode == 1:
-            pdf_reader.scroll_to_page(pdf_reader.current_page)
-            
-        pdf_reader.next_search_button.setEnabled(pdf_reader.current_search_index < len(pdf_reader.search_results) - 1)
-        pdf_reader.prev_search_button.setEnabled(pdf_reader.current_search_index > 0)
+    pdf_reader.next_search_button.setEnabled(results.current < len(results) - 1)
+    pdf_reader.prev_search_button.setEnabled(results.current > 0)
+
+def next_search_result(pdf_reader):
+    results = pdf_reader.search_results
+    if results and results.current < len(results) - 1:
+        results.current += 1
+        _show_search_result(pdf_reader)
 
 def prev_search_result(pdf_reader):
-    if pdf_reader.search_results and pdf_reader.current_search_index > 0:
-        pdf_reader.current_search_index -= 1
-        pdf_reader.current_page = pdf_reader.search_results[pdf_reader.current_search_index]["page"]
-        pdf_reader.annotation_mode = False
-        pdf_reader.toggle_annotation_mode(force_off=True) # Ensure cursor reset
-        pdf_reader.update_view() # CHANGED FROM update_page()
-        
-        is_single = (pdf_reader.view_mode == 0)
-        pdf_reader.prev_button.setEnabled(pdf_reader.current_page > 0 and is_single)
-        pdf_reader.next_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1 and is_single)
-        pdf_reader.move_up_button.setEnabled(pdf_reader.current_page > 0)
-        pdf_reader.move_down_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1)
-        pdf_reader.thumbnail_list.setCurrentRow(pdf_reader.current_page)
-        if pdf_reader.view_mode == 1:
-            pdf_reader.scroll_to_page(pdf_reader.current_page)
-            
-        pdf_reader.next_search_button.setEnabled(pdf_reader.current_search_index < len(pdf_reader.search_results) - 1)
-        pdf_reader.prev_search_button.setEnabled(pdf_reader.current_search_index > 0)
+    results = pdf_reader.search_results
+    if results and results.current > 0:
+        results.current -= 1
+        _show_search_result(pdf_reader)
 
 def add_page(pdf_reader):
     if not pdf_reader.pdf_document:
         pdf_reader.status_bar.showMessage("No PDF loaded")
         return
     try:
-        pdf_reader.pdf_document.insert_page(pdf_reader.current_page + 1)
-        pdf_reader.total_pages += 1
-        new_annotations = {}
-        for page_num in pdf_reader.annotations:
-            if page_num <= pdf_reader.current_page:
-                new_annotations[page_num] = pdf_reader.annotations[page_num]
-            else:
-                new_annotations[page_num + 1] = pdf_reader.annotations[page_num]
-        pdf_reader.annotations = new_annotations
-        new_search_results = []
-        for result in pdf_reader.search_results:
-            if result["page"] <= pdf_reader.current_page:
-                new_search_results.append(result)
-            else:
-                new_search_results.append({"page": result["page"] + 1, "rects": result["rects"]})
-        pdf_reader.search_results = new_search_results
-        
-        pdf_reader.load_pages() # NEW: Need to reload/recreate page widgets
-        pdf_reader.update_view() # CHANGED FROM update_page()
-
-        # Rebuild pages and form fields
-        pdf_reader.pages = [pdf_reader.pdf_document.load_page(i) for i in range(pdf_reader.total_pages)]
-        pdf_reader.form_fields = {i: list(p.widgets()) for i, p in enumerate(pdf_reader.pages)}
-        
-        pdf_reader.load_thumbnails()
-        pdf_reader.load_toc()
-        pdf_reader.page_label.setText(f" / {pdf_reader.total_pages}")
-        
-        is_single = (pdf_reader.view_mode == 0)
-        pdf_reader.next_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1 and is_single)
-        pdf_reader.move_down_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1)
-        pdf_reader.move_up_button.setEnabled(pdf_reader.current_page > 0)
+        new_page = pdf_reader.current_page + 1
+        _insert_page(pdf_reader, new_page)
+        pdf_reader.edit_journal.record(("insert_page", new_page))
+        _refresh_after_page_edit(pdf_reader)
         pdf_reader.status_bar.showMessage("Blank page added")
     except Exception as e:
         pdf_reader.status_bar.showMessage(f"Error adding page: {str(e)}")
@@ -178,87 +209,122 @@ def remove_page(pdf_reader):
         pdf_reader.status_bar.showMessage("Cannot remove page: No PDF loaded or only one page")
         return
     try:
-        pdf_reader.pdf_document.delete_page(pdf_reader.current_page)
-        pdf_reader.total_pages -= 1
-        if pdf_reader.current_page >= pdf_reader.total_pages:
-            pdf_reader.current_page = pdf_reader.total_pages - 1
-        new_annotations = {}
-        for page_num in pdf_reader.annotations:
-            if page_num < pdf_reader.current_page:
-                new_annotations[page_num] = pdf_reader.annotations[page_num]
-            elif page_num > pdf_reader.current_page:
-                new_annotations[page_num - 1] = pdf_reader.annotations[page_num]
-        pdf_reader.annotations = new_annotations
-        new_search_results = []
-        for result in pdf_reader.search_results:
-            if result["page"] < pdf_reader.current_page:
-                new_search_results.append(result)
-            elif result["page"] > pdf_reader.current_page:
-                new_search_results.append({"page": result["page"] - 1, "rects": result["rects"]})
-        pdf_reader.search_results = new_search_results
-        
-        pdf_reader.load_pages() # NEW: Need to reload/recreate page widgets
-        pdf_reader.update_view() # CHANGED FROM update_page()
-
-        # Rebuild pages and form fields
-        pdf_reader.pages = [pdf_reader.pdf_document.load_page(i) for i in range(pdf_reader.total_pages)]
-        pdf_reader.form_fields = {i: list(p.widgets()) for i, p in enumerate(pdf_reader.pages)}
-        
-        pdf_reader.load_thumbnails()
-        pdf_reader.load_toc()
-        pdf_reader.page_label.setText(f" / {pdf_reader.total_pages}")
-        
-        is_single = (pdf_reader.view_mode == 0)
-        pdf_reader.prev_button.setEnabled(pdf_reader.current_page > 0 and is_single)
-        pdf_reader.next_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1 and is_single)
-        pdf_reader.move_up_button.setEnabled(pdf_reader.current_page > 0)
-        pdf_reader.move_down_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1)
+        removed_page = pdf_reader.current_page
+        # Only the removed page is kept for undo, not the document
+        saved_pages = save_pages(pdf_reader.pdf_document, [removed_page])
+        notes = pdf_reader.annotations.get(removed_page, [])
+        _delete_page(pdf_reader, removed_page)
+        pdf_reader.edit_journal.record(("delete_page", removed_page, saved_pages, notes))
+        _refresh_after_page_edit(pdf_reader)
         pdf_reader.status_bar.showMessage("Page removed")
     except Exception as e:
         pdf_reader.status_bar.showMessage(f"Error removing page: {str(e)}")
 
+# Page edit primitives: they change the fitz.Document and the reader's page model (see the
+# INCREMENTAL PAGE EDITS section of pdf_reader_app.py) but leave the refresh to the caller,
+# so undo and redo can replay them
+
+def _insert_page(pdf_reader, page_num, saved_pages=None):
+    """Inserts a blank page, or the page kept in saved_pages when a deletion is undone."""
+    if saved_pages is None:
+        pdf_reader.pdf_document.insert_page(page_num)
+        pdf_reader.render_scheduler.record_edit("insert_page", page_num)
+    else:
+        pdf_reader.pdf_document.insert_pdf(saved_pages, start_at=page_num)
+        pdf_reader.render_scheduler.record_edit("insert_saved", saved_pages, -1, -1, page_num)
+    _mirror_page_edit(pdf_reader, "insert_blank_page", page_num)
+    if saved_pages is not None:
+        _reindex_restored_pages(pdf_reader, [page_num])
+    pdf_reader.current_page = insert_mapping(page_num)(pdf_reader.current_page)
+    # Widgets, thumbnails, annotations, cached rasters and scan state are shifted in place
+    pdf_reader.page_inserted(page_num)
+
+def _delete_page(pdf_reader, page_num):
+    pdf_reader.pdf_document.delete_page(page_num)
+    pdf_reader.render_scheduler.record_edit("delete_page", page_num)
+    _mirror_page_edit(pdf_reader, "delete_page", page_num)
+    new_current = delete_mapping(page_num)(pdf_reader.current_page)
+    pdf_reader.page_removed(page_num)
+    pdf_reader.current_page = min(page_num, pdf_reader.total_pages - 1) if new_current is None else new_current
+
+def _move_page(pdf_reader, from_page, to_page, thumbnail_moved=False):
+    """Moves a page so it ends up at index to_page, keeping the current page in view."""
+    # fitz inserts *before* the target page (and wants -1 for "after the last one")
+    target = to_page + 1 if to_page > from_page else to_page
+    target = target if target < pdf_reader.total_pages else -1
+    pdf_reader.pdf_document.move_page(from_page, target)
+    pdf_reader.render_scheduler.record_edit("move_page", from_page, target)
+    _mirror_page_edit(pdf_reader, "move_page", from_page, to_page)
+    pdf_reader.current_page = move_mapping(from_page, to_page)(pdf_reader.current_page)
+    pdf_reader.page_moved(from_page, to_page, thumbnail_moved)
+
+def _apply_page_order(pdf_reader, order, thumbnails_reordered=False, saved_pages=None, restored=None):
+    """
+    Batch edit: order[new_page] is the old page shown there, or None for a new page. New pages
+    are blank unless restored maps them to a page of saved_pages (undoing a batch deletion).
+    The document is rewritten with a single select() (see select_pages), however many pages change.
+    """
+    doc = pdf_reader.pdf_document
+    record_edit = pdf_reader.render_scheduler.record_edit
+    restored = restored or {}
+    selection = []
+    for new_page, old_page in enumerate(order):
+        if old_page is not None:
+            selection.append(old_page)
+            continue
+        # New pages are appended, then select_pages() puts them in place
+        if new_page in restored:
+            doc.insert_pdf(saved_pages, from_page=restored[new_page], to_page=restored[new_page])
+            record_edit("insert_saved", saved_pages, restored[new_page], restored[new_page], -1)
+        else:
+            doc.new_page(-1)
+            record_edit("new_page")
+        selection.append(doc.page_count - 1)
+    select_pages(doc, selection)
+    record_edit("select_pages", selection)
+    _mirror_page_edit(pdf_reader, "reorder_pages", order)
+    _reindex_restored_pages(pdf_reader, restored)
+    new_current = order_mapping(order)(pdf_reader.current_page)
+    pdf_reader.pages_reordered(order, thumbnails_reordered)
+    pdf_reader.current_page = min(pdf_reader.current_page, pdf_reader.total_pages - 1) if new_current is None else new_current
+
+def _reindex_restored_pages(pdf_reader, pages):
+    # The index and the results mirror inserted pages as blank; restored pages have text (and hits) again
+    index, results = pdf_reader.search_index, pdf_reader.search_results
+    for page_num in pages:
+        if index is not None:
+            index.reindex_page(pdf_reader.pdf_document, page_num)
+        if results.term:
+            if index is not None:
+                rects = index.find(page_num, results.term)
+            else:
+                rects = pdf_reader.pdf_document.load_page(page_num).search_for(results.term)
+            if rects:
+                results.add(page_num, rects)
+
+def _refresh_after_page_edit(pdf_reader):
+    pdf_reader.update_view() # CHANGED FROM update_page()
+    pdf_reader.load_toc()
+    pdf_reader.page_label.setText(f" / {pdf_reader.total_pages}")
+    
+    is_single = (pdf_reader.view_mode == 0)
+    pdf_reader.prev_button.setEnabled(pdf_reader.current_page > 0 and is_single)
+    pdf_reader.next_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1 and is_single)
+    pdf_reader.move_up_button.setEnabled(pdf_reader.current_page > 0)
+    pdf_reader.move_down_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1)
+    pdf_reader.thumbnail_list.setCurrentRow(pdf_reader.current_page)
+
+def _move_page_action(pdf_reader, from_page, to_page, thumbnail_moved=False):
+    _move_page(pdf_reader, from_page, to_page, thumbnail_moved)
+    pdf_reader.edit_journal.record(("move_page", from_page, to_page))
+    _refresh_after_page_edit(pdf_reader)
+
 def move_page_up(pdf_reader):
     if not pdf_reader.pdf_document or pdf_reader.current_page <= 0:
         pdf_reader.status_bar.showMessage("Cannot move page up")
         return
     try:
-        pdf_reader.pdf_document.move_page(pdf_reader.current_page, pdf_reader.current_page - 1)
-        pdf_reader.current_page -= 1
-        new_annotations = {}
-        for page_num in pdf_reader.annotations:
-            if page_num == pdf_reader.current_page:
-                new_annotations[page_num + 1] = pdf_reader.annotations[page_num]
-            elif page_num == pdf_reader.current_page + 1:
-                new_annotations[page_num - 1] = pdf_reader.annotations[page_num]
-            else:
-                new_annotations[page_num] = pdf_reader.annotations[page_num]
-        pdf_reader.annotations = new_annotations
-        new_search_results = []
-        for result in pdf_reader.search_results:
-            if result["page"] == pdf_reader.current_page:
-                new_search_results.append({"page": result["page"] + 1, "rects": result["rects"]})
-            elif result["page"] == pdf_reader.current_page + 1:
-                new_search_results.append({"page": result["page"] - 1, "rects": result["rects"]})
-            else:
-                new_search_results.append(result)
-        pdf_reader.search_results = new_search_results
-        
-        pdf_reader.load_pages() # NEW: Need to reload/recreate page widgets
-        pdf_reader.update_view() # CHANGED FROM update_page()
-
-        # Rebuild pages and form fields
-        pdf_reader.pages = [pdf_reader.pdf_document.load_page(i) for i in range(pdf_reader.total_pages)]
-        pdf_reader.form_fields = {i: list(p.widgets()) for i, p in enumerate(pdf_reader.pages)}
-        
-        pdf_reader.load_thumbnails()
-        pdf_reader.load_toc()
-        
-        is_single = (pdf_reader.view_mode == 0)
-        pdf_reader.prev_button.setEnabled(pdf_reader.current_page > 0 and is_single)
-        pdf_reader.next_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1 and is_single)
-        pdf_reader.move_up_button.setEnabled(pdf_reader.current_page > 0)
-        pdf_reader.move_down_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1)
-        pdf_reader.thumbnail_list.setCurrentRow(pdf_reader.current_page)
+        _move_page_action(pdf_reader, pdf_reader.current_page, pdf_reader.current_page - 1)
         pdf_reader.status_bar.showMessage("Page moved up")
     except Exception as e:
         pdf_reader.status_bar.showMessage(f"Error moving page: {str(e)}")
@@ -268,43 +334,7 @@ def move_page_down(pdf_reader):
         pdf_reader.status_bar.showMessage("Cannot move page down")
         return
     try:
-        pdf_reader.pdf_document.move_page(pdf_reader.current_page, pdf_reader.current_page + 1)
-        pdf_reader.current_page += 1
-        new_annotations = {}
-        for page_num in pdf_reader.annotations:
-            if page_num == pdf_reader.current_page - 1:
-                new_annotations[page_num + 1] = pdf_reader.annotations[page_num]
-            elif page_num == pdf_reader.current_page:
-                new_annotations[page_num - 1] = pdf_reader.annotations[page_num]
-            else:
-                new_annotations[page_num] = pdf_reader.annotations[page_num]
-        pdf_reader.annotations = new_annotations
-        new_search_results = []
-        for result in pdf_reader.search_results:
-            if result["page"] == pdf_reader.current_page - 1:
-                new_search_results.append({"page": result["page"] + 1, "rects": result["rects"]})
-            elif result["page"] == pdf_reader.current_page:
-                new_search_results.append({"page": result["page"] - 1, "rects": result["rects"]})
-            else:
-                new_search_results.append(result)
-        pdf_reader.search_results = new_search_results
-        
-        pdf_reader.load_pages() # NEW: Need to reload/recreate page widgets
-        pdf_reader.update_view() # CHANGED FROM update_page()
-
-        # Rebuild pages and form fields
-        pdf_reader.pages = [pdf_reader.pdf_document.load_page(i) for i in range(pdf_reader.total_pages)]
-        pdf_reader.form_fields = {i: list(p.widgets()) for i, p in enumerate(pdf_reader.pages)}
-        
-        pdf_reader.load_thumbnails()
-        pdf_reader.load_toc()
-        
-        is_single = (pdf_reader.view_mode == 0)
-        pdf_reader.prev_button.setEnabled(pdf_reader.current_page > 0 and is_single)
-        pdf_reader.next_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1 and is_single)
-        pdf_reader.move_up_button.setEnabled(pdf_reader.current_page > 0)
-        pdf_reader.move_down_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1)
-        pdf_reader.thumbnail_list.setCurrentRow(pdf_reader.current_page)
+        _move_page_action(pdf_reader, pdf_reader.current_page, pdf_reader.current_page + 1)
         pdf_reader.status_bar.showMessage(f"Page moved down to position {pdf_reader.current_page + 1}")
     except Exception as e:
         pdf_reader.status_bar.showMessage(f"Error moving page: {str(e)}")
@@ -313,54 +343,220 @@ def handle_thumbnail_reorder(pdf_reader, parent, start, end, destination, row):
     if not pdf_reader.pdf_document:
         pdf_reader.status_bar.showMessage("No PDF loaded")
         return
+    # Qt's row is the insertion point in the old numbering; the page's final index is one less when moving down
+    to_page = row - 1 if row > start else row
+    if to_page == start:
+        return
+    # Dropping several selected thumbnails emits one rowsMoved per row; they are applied together
+    if not pdf_reader.pending_thumbnail_moves:
+        QTimer.singleShot(0, lambda: _apply_thumbnail_moves(pdf_reader))
+    pdf_reader.pending_thumbnail_moves.append((start, to_page))
+
+def _apply_thumbnail_moves(pdf_reader):
+    moves = pdf_reader.pending_thumbnail_moves
+    pdf_reader.pending_thumbnail_moves = []
     try:
-        pdf_reader.pdf_document.move_page(start, row)
-        if pdf_reader.current_page == start:
-            pdf_reader.current_page = row
-        elif start < pdf_reader.current_page <= row:
-            pdf_reader.current_page -= 1
-        elif row <= pdf_reader.current_page < start:
-            pdf_reader.current_page += 1
-        new_annotations = {}
-        for page_num in range(pdf_reader.total_pages):
-            if page_num == start:
-                new_annotations[row] = pdf_reader.annotations.get(page_num, [])
-            elif start < page_num <= row:
-                new_annotations[page_num - 1] = pdf_reader.annotations.get(page_num, [])
-            elif row < page_num <= start:
-                new_annotations[page_num + 1] = pdf_reader.annotations.get(page_num, [])
-            else:
-                new_annotations[page_num] = pdf_reader.annotations.get(page_num, [])
-        pdf_reader.annotations = new_annotations
-        new_search_results = []
-        for result in pdf_reader.search_results:
-            page_num = result["page"]
-            if page_num == start:
-                new_search_results.append({"page": row, "rects": result["rects"]})
-            elif start < page_num <= row:
-                new_search_results.append({"page": page_num - 1, "rects": result["rects"]})
-            elif row < page_num <= start:
-                new_search_results.append({"page": page_num + 1, "rects": result["rects"]})
-            else:
-                new_search_results.append(result)
-        pdf_reader.search_results = new_search_results
-        
-        pdf_reader.load_pages() # NEW: Need to reload/recreate page widgets
-        pdf_reader.update_view() # CHANGED FROM update_page()
+        if len(moves) == 1:
+            start, to_page = moves[0]
+            _move_page_action(pdf_reader, start, to_page, thumbnail_moved=True)
+            pdf_reader.status_bar.showMessage(f"Page moved from position {start + 1} to {to_page + 1}")
+            return
+        order = list(range(pdf_reader.total_pages))
+        for start, to_page in moves:
+            order.insert(to_page, order.pop(start))
+        _batch_edit(pdf_reader, order, f"{len(moves)} pages moved", thumbnails_reordered=True)
+    except Exception as e:
+        pdf_reader.status_bar.showMessage(f"Error reordering page: {str(e)}")
 
-        # Rebuild pages and form fields
-        pdf_reader.pages = [pdf_reader.pdf_document.load_page(i) for i in range(pdf_reader.total_pages)]
-        pdf_reader.form_fields = {i: list(p.widgets()) for i, p in enumerate(pdf_reader.pages)}
-        
-        pdf_reader.load_thumbnails()
-        pdf_reader.load_toc()
-        
-        is_single = (pdf_reader.view_mode == 0)
-        pdf_reader.prev_button.setEnabled(pdf_reader.current_page > 0 and is_single)
-        pdf_reader.next_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1 and is_single)
-        pdf_reader.move_up_button.setEnabled(pdf_reader.current_page > 0)
-        pdf_reader.move_down_button.setEnabled(pdf_reader.current_page < pdf_reader.total_pages - 1)
-        pdf_reader.thumbnail_list.setCurrentRow(pdf_reader.current_page)
-        pdf_reader.status_bar.showMessage(f"Page moved from position {start + 1} to {row + 1}")
+# --- Batch page operations ---
+# Each builds the new page order (order[new_page] = old page, or None for a blank page)
+# and applies it with one fitz select() and one remap/refresh, however many pages change.
+
+def _batch_edit(pdf_reader, order, message, thumbnails_reordered=False):
+    kept = set(order)
+    deleted = [page_num for page_num in range(pdf_reader.total_pages) if page_num not in kept]
+    saved_pages = save_pages(pdf_reader.pdf_document, deleted)
+    notes = {page_num: pdf_reader.annotations[page_num] for page_num in deleted if page_num in pdf_reader.annotations}
+    _apply_page_order(pdf_reader, order, thumbnails_reordered)
+    pdf_reader.edit_journal.record(("reorder", order, deleted, saved_pages, notes))
+    _refresh_after_page_edit(pdf_reader)
+    pdf_reader.status_bar.showMessage(message)
+
+def delete_pages(pdf_reader, pages):
+    if not pdf_reader.pdf_document or not pages:
+        pdf_reader.status_bar.showMessage("No pages selected")
+        return
+    pages = set(pages)
+    order = [page_num for page_num in range(pdf_reader.total_pages) if page_num not in pages]
+    if not order:
+        pdf_reader.status_bar.showMessage("Cannot remove every page")
+        return
+    try:
+        _batch_edit(pdf_reader, order, f"{len(pages)} page(s) removed")
+    except Exception as e:
+        pdf_reader.status_bar.showMessage(f"Error removing pages: {str(e)}")
+
+def duplicate_pages(pdf_reader, pages):
+    """Inserts a copy of each page right after it."""
+    if not pdf_reader.pdf_document or not pages:
+        pdf_reader.status_bar.showMessage("No pages selected")
+        return
+    pages = set(pages)
+    order = []
+    for page_num in range(pdf_reader.total_pages):
+        order.append(page_num)
+        if page_num in pages:
+            order.append(page_num)
+    try:
+        _batch_edit(pdf_reader, order, f"{len(pages)} page(s) duplicated")
+    except Exception as e:
+        pdf_reader.status_bar.showMessage(f"Error duplicating pages: {str(e)}")
+
+def move_pages(pdf_reader, pages, before_page):
+    """Moves the pages, in their current order, as one block in front of before_page (total_pages = the end)."""
+    if not pdf_reader.pdf_document or not pages:
+        pdf_reader.status_bar.showMessage("No pages selected")
+        return
+    pages = sorted(set(pages))
+    selected = set(pages)
+    rest = [page_num for page_num in range(pdf_reader.total_pages) if page_num not in selected]
+    insert_at = sum(1 for page_num in rest if page_num < before_page)
+    order = rest[:insert_at] + pages + rest[insert_at:]
+    if order == list(range(pdf_reader.total_pages)):
+        return
+    try:
+        _batch_edit(pdf_reader, order, f"{len(pages)} page(s) moved")
     except Exception as e:
-        pdf_reader.status_bar.showMessage(f"Error reordering page: {str(e)}")
\ No newline at end of file
+        pdf_reader.status_bar.showMessage(f"Error moving pages: {str(e)}")
+
+def insert_blank_pages(pdf_reader, after_page, count):
+    if not pdf_reader.pdf_document or count <= 0:
+        return
+    order = list(range(after_page + 1)) + [None] * count + list(range(after_page + 1, pdf_reader.total_pages))
+    try:
+        _batch_edit(pdf_reader, order, f"{count} blank page(s) added")
+    except Exception as e:
+        pdf_reader.status_bar.showMessage(f"Error adding pages: {str(e)}")
+
+# --- Annotation edits ---
+
+def add_note(pdf_reader, page_num, note, index=None):
+    """Adds an (x, y, text, note_id) note to the annotation map, the sidecar and the page."""
+    page_notes = pdf_reader.annotations.setdefault(page_num, [])
+    index = len(page_notes) if index is None else index
+    page_notes.insert(index, note)
+    add_note_annot(pdf_reader.pdf_document, pdf_reader.pdf_document.load_page(page_num), note)
+    pdf_reader.render_scheduler.record_edit("add_note", page_num, note)
+    _journal_note(pdf_reader, "add", page_num, note, index)
+    _note_changed(pdf_reader, page_num)
+    return index
+
+def remove_note(pdf_reader, page_num, index):
+    """Removes a page's note and its PDF text annotation; returns the note."""
+    note = pdf_reader.annotations[page_num].pop(index)
+    if not pdf_reader.annotations[page_num]: del pdf_reader.annotations[page_num]
+    delete_note_annot(pdf_reader.pdf_document.load_page(page_num), note)
+    pdf_reader.render_scheduler.record_edit("delete_note", page_num, note)
+    _journal_note(pdf_reader, "delete", page_num, note, index)
+    _note_changed(pdf_reader, page_num)
+    return note
+
+def _note_changed(pdf_reader, page_num):
+    pdf_reader.annotation_index.invalidate(page_num)
+    pdf_reader.invalidate_render_cache(page_num)
+    if page_num in pdf_reader.page_widgets:
+        pdf_reader.render_page_content(page_num, pdf_reader.page_widgets[page_num])
+
+# --- Undo / redo ---
+# Edits are replayed from the journal entries described in pdf_edit_journal.py, so undoing
+# costs as much as the edit did, not a reload of the document.
+
+EDIT_NAMES = {"insert_page": "add page", "delete_page": "remove page", "move_page": "move page",
+              "reorder": "page changes", "add_note": "add annotation", "delete_note": "delete annotation"}
+
+def undo_edit(pdf_reader):
+    if not pdf_reader.pdf_document or not pdf_reader.edit_journal.can_undo():
+        pdf_reader.status_bar.showMessage("Nothing to undo")
+        return
+    entry = pdf_reader.edit_journal.pop_undo()
+    try:
+        _undo_entry(pdf_reader, entry)
+        pdf_reader.status_bar.showMessage(f"Undo: {EDIT_NAMES[entry[0]]}")
+    except Exception as e:
+        pdf_reader.edit_journal.clear() # The document no longer matches the recorded edits
+        pdf_reader.status_bar.showMessage(f"Error undoing edit: {str(e)}")
+
+def redo_edit(pdf_reader):
+    if not pdf_reader.pdf_document or not pdf_reader.edit_journal.can_redo():
+        pdf_reader.status_bar.showMessage("Nothing to redo")
+        return
+    entry = pdf_reader.edit_journal.pop_redo()
+    try:
+        _redo_entry(pdf_reader, entry)
+        pdf_reader.status_bar.showMessage(f"Redo: {EDIT_NAMES[entry[0]]}")
+    except Exception as e:
+        pdf_reader.edit_journal.clear()
+        pdf_reader.status_bar.showMessage(f"Error redoing edit: {str(e)}")
+
+def _undo_entry(pdf_reader, entry):
+    kind = entry[0]
+    if kind == "add_note":
+        _, page_num, index, note = entry
+        remove_note(pdf_reader, page_num, index)
+        return
+    if kind == "delete_note":
+        _, page_num, index, note = entry
+        add_note(pdf_reader, page_num, note, index)
+        return
+    if kind == "insert_page":
+        _delete_page(pdf_reader, entry[1])
+    elif kind == "delete_page":
+        _, page_num, saved_pages, notes = entry
+        _insert_page(pdf_reader, page_num, saved_pages)
+        _restore_notes(pdf_reader, {page_num: notes})
+        pdf_reader.current_page = page_num
+    elif kind == "move_page":
+        _, from_page, to_page = entry
+        _move_page(pdf_reader, to_page, from_page)
+        pdf_reader.current_page = from_page
+    elif kind == "reorder":
+        _, order, deleted, saved_pages, notes = entry
+        # The inverse order: kept pages come back from their (first) new position, deleted ones from saved_pages
+        new_page_of = order_mapping(order)
+        saved_index = {page_num: i for i, page_num in enumerate(deleted)}
+        page_count = len(set(order) - {None}) + len(deleted)
+        inverse = [None if page_num in saved_index else new_page_of(page_num) for page_num in range(page_count)]
+        _apply_page_order(pdf_reader, inverse, saved_pages=saved_pages, restored=saved_index)
+        _restore_notes(pdf_reader, notes)
+    _refresh_after_page_edit(pdf_reader)
+
+def _redo_entry(pdf_reader, entry):
+    kind = entry[0]
+    if kind == "add_note":
+        _, page_num, index, note = entry
+        add_note(pdf_reader, page_num, note, index)
+        return
+    if kind == "delete_note":
+        _, page_num, index, note = entry
+        remove_note(pdf_reader, page_num, index)
+        return
+    if kind == "insert_page":
+        _insert_page(pdf_reader, entry[1])
+        pdf_reader.current_page = entry[1]
+    elif kind == "delete_page":
+        _delete_page(pdf_reader, entry[1])
+    elif kind == "move_page":
+        _, from_page, to_page = entry
+        _move_page(pdf_reader, from_page, to_page)
+        pdf_reader.current_page = to_page
+    elif kind == "reorder":
+        _apply_page_order(pdf_reader, entry[1])
+    _refresh_after_page_edit(pdf_reader)
+
+def _restore_notes(pdf_reader, notes):
+    """Puts back the notes of restored pages (their PDF annotations came back with the page)."""
+    for page_num, page_notes in notes.items():
+        if page_notes:
+            pdf_reader.annotations[page_num] = list(page_notes)
+    if notes:
+        save_annotations(pdf_reader)
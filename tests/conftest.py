@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+
+import fitz  # PyMuPDF
+import pytest
+
+# The modules live in src/ as top-level modules (see pdf_reader.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+@pytest.fixture
+def make_pdf():
+    """Builds a document whose pages read "page 1", "page 2", ...; it is also saved when a path is given."""
+    def make_pdf(page_count, path=None):
+        doc = fitz.open()
+        for page_num in range(page_count):
+            doc.new_page().insert_text((72, 72), f"page {page_num + 1}")
+        if path is not None:
+            doc.save(str(path))
+        return doc
+    return make_pdf
+
+
+@pytest.fixture(scope="session")
+def reader(tmp_path_factory):
+    """One PDFReader on the offscreen Qt platform, shared by the tests that drive the window."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    # Thumbnails of the test files must not land in the user's own cache
+    os.environ["XDG_CACHE_HOME"] = str(tmp_path_factory.mktemp("cache"))
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    from pdf_reader_app import PDFReader
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    reader = PDFReader()
+    reader.resize(1000, 800)
+    reader.show()
+    yield reader
+    reader.close()
+    app.processEvents()
+
+
+@pytest.fixture
+def pump_until(reader):
+    """Runs the event loop until condition() is true."""
+    from PyQt6.QtWidgets import QApplication
+
+    def pump_until(condition, timeout=60):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            assert time.monotonic() < deadline, "timed out"
+            QApplication.processEvents()
+            time.sleep(0.001)
+    return pump_until
+
+
+@pytest.fixture
+def open_file(reader, pump_until, monkeypatch):
+    """Opens a file as the Open dialog would, waits for its first page and returns its time to first page (ms)."""
+    from PyQt6.QtWidgets import QFileDialog
+
+    def open_file(path):
+        monkeypatch.setattr(QFileDialog, "getOpenFileName", lambda *args, **kwargs: (str(path), ""))
+        reader.open_pdf()
+        pump_until(lambda: reader.time_to_first_page_ms is not None)
+        return reader.time_to_first_page_ms
+    return open_file
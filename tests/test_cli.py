@@ -0,0 +1,27 @@
+import json
+
+import fitz  # PyMuPDF
+
+from pdf_cli import main
+
+
+def test_reorder_repeats_pages_as_copies(make_pdf, tmp_path):
+    source = tmp_path / "a.pdf"
+    make_pdf(3, source)
+    (tmp_path / "a.pdf.annotations.json").write_text(json.dumps(
+        {"version": 2, "seq": 0, "pages": {"1": [[50, 50, "note", "id-1"]]}}))
+    out = tmp_path / "out"
+    assert main(["reorder", str(source), "--order", "3,2,2,1", "--out", str(out), "--jobs", "1"]) == 0
+
+    doc = fitz.open(str(out / "a.pdf"))
+    assert [page.get_text().strip() for page in doc] == ["page 3", "page 2", "page 2", "page 1"]
+    assert len({doc.page_xref(page_num) for page_num in range(doc.page_count)}) == 4
+    doc[2].add_text_annot((80, 80), "copy only")
+    assert list(doc[1].annots()) == []
+
+    sidecar = json.loads((out / "a.pdf.annotations.json").read_text())
+    assert sorted(sidecar["pages"]) == ["1", "2"]
+
+
+def test_failed_file_sets_exit_status(tmp_path):
+    assert main(["render", str(tmp_path / "missing.pdf"), "--out", str(tmp_path), "--jobs", "1"]) == 1
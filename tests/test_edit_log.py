@@ -0,0 +1,91 @@
+import os
+
+import fitz  # PyMuPDF
+
+from pdf_edit_journal import save_pages
+from pdf_edit_log import EditLog
+from pdf_notes import add_note_annot, delete_note_annot, write_notes_to_document
+from pdf_page_edits import select_pages
+from pdf_render import worker_document
+from pdf_utils import delete_pages, search_text, undo_edit
+
+
+def document_state(doc):
+    return (
+        [page.get_text().strip() for page in doc],
+        [[annot.info["content"] for annot in page.annots(types=[fitz.PDF_ANNOT_TEXT])] for page in doc],
+        [[widget.field_value for widget in page.widgets()] for page in doc],
+    )
+
+
+def test_workers_replay_the_logged_edits(make_pdf, tmp_path):
+    path = tmp_path / "form.pdf"
+    doc = make_pdf(4)
+    widget = fitz.Widget()
+    widget.field_name, widget.field_type = "name", fitz.PDF_WIDGET_TYPE_TEXT
+    widget.rect = fitz.Rect(72, 100, 272, 120)
+    doc[2].add_widget(widget)
+    doc.save(str(path))
+
+    doc = fitz.open(str(path))
+    log = EditLog(str(path), 0)
+    doc.insert_page(1); log.record("insert_page", 1)
+    doc.move_page(0, -1); log.record("move_page", 0, -1)
+    saved = save_pages(doc, [2])
+    doc.delete_page(2); log.record("delete_page", 2)
+    assert document_state(worker_document(log.source())) == document_state(doc)
+
+    # The worker's copy only replays what it has not seen yet
+    doc.insert_pdf(saved, start_at=0); log.record("insert_saved", saved, -1, -1, 0)
+    doc.new_page(-1); log.record("new_page")
+    select_pages(doc, [4, 0, 0, 2, 1]); log.record("select_pages", [4, 0, 0, 2, 1])
+    note = (50.0, 60.0, "a note", "id-1")
+    add_note_annot(doc, doc[1], note); log.record("add_note", 1, note)
+    delete_note_annot(doc[1], note); log.record("delete_note", 1, note)
+    annotations = {3: [(70.0, 80.0, "kept", "")]}
+    write_notes_to_document(doc, annotations); log.record("write_notes", annotations)
+    field_page = next(page for page in doc if page.first_widget)
+    live_field = field_page.first_widget
+    live_field.field_value = "Ada"
+    live_field.update()
+    log.record("set_field", field_page.number, 0, "Ada")
+
+    assert document_state(worker_document(log.source())) == document_state(doc)
+    log.close()
+
+
+def test_log_files_stay_until_the_last_holder_is_done(tmp_path):
+    log = EditLog(str(tmp_path / "a.pdf"), 0)
+    saved = fitz.open()
+    saved.new_page()
+    log.record("insert_saved", saved, -1, -1, 0)
+    files = [log.path, log.path + ".0.pdf"]
+    assert all(os.path.exists(path) for path in files)
+
+    log.hold()
+    log.close()
+    assert all(os.path.exists(path) for path in files) # A task still reads them
+    log.release()
+    assert not any(os.path.exists(path) for path in files)
+
+
+def test_editing_never_writes_the_document_out(make_pdf, reader, open_file, pump_until, tmp_path, monkeypatch):
+    path = tmp_path / "a.pdf"
+    make_pdf(6, path)
+    open_file(path)
+    pump_until(lambda: reader.search_index is not None)
+
+    def tobytes(doc, *args, **kwargs):
+        raise AssertionError("the document was serialized on the GUI thread")
+    monkeypatch.setattr(fitz.Document, "tobytes", tobytes) # Workers are spawned, so they keep the real one
+    delete_pages(reader, [1, 3])
+    undo_edit(reader)
+    delete_pages(reader, [0])
+
+    # The worker searches its own copy: it must have the same edits
+    reader.search_index = None
+    reader.search_input.setText("page")
+    search_text(reader)
+    pump_until(lambda: not reader.search_chunks_pending)
+    assert [reader.pdf_document[page_num].get_text().strip() for page_num in reader.search_results.pages] == \
+        ["page 2", "page 3", "page 4", "page 5", "page 6"]
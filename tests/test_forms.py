@@ -0,0 +1,39 @@
+import json
+import time
+
+import fitz  # PyMuPDF
+
+from pdf_utils import delete_pages, undo_edit
+
+
+def test_mail_merge_keeps_its_edits_when_another_file_is_opened(make_pdf, reader, open_file, pump_until, tmp_path, monkeypatch):
+    from PyQt6.QtWidgets import QFileDialog
+
+    path, other_path, records_path = tmp_path / "form.pdf", tmp_path / "other.pdf", tmp_path / "records.json"
+    doc = make_pdf(3)
+    widget = fitz.Widget()
+    widget.field_name, widget.field_type = "name", fitz.PDF_WIDGET_TYPE_TEXT
+    widget.rect = fitz.Rect(72, 100, 272, 120)
+    doc[2].add_widget(widget)
+    doc.save(str(path))
+    make_pdf(2, other_path)
+    records_path.write_text(json.dumps([{"name": "Ada"}, {"name": "Grace"}]))
+    (tmp_path / "out").mkdir()
+
+    open_file(path)
+    delete_pages(reader, [0, 1])
+    undo_edit(reader) # The restored pages are replayed from a file next to the edit log
+    delete_pages(reader, [1])
+
+    monkeypatch.setattr(QFileDialog, "getOpenFileName", lambda *args, **kwargs: (str(records_path), ""))
+    monkeypatch.setattr(QFileDialog, "getExistingDirectory", lambda *args, **kwargs: str(tmp_path / "out"))
+    reader.render_scheduler.submit_task(("wait",), time.sleep, 1) # The merge starts after the next open
+    reader.mail_merge()
+    open_file(other_path)
+    pump_until(lambda: reader.status_bar.currentMessage().startswith(("Mail merge: wrote", "Mail merge error")))
+
+    assert reader.status_bar.currentMessage().startswith("Mail merge: wrote 2 files")
+    for n, name in enumerate(["Ada", "Grace"], 1):
+        with fitz.open(str(tmp_path / "out" / f"form_{n}.pdf")) as merged:
+            assert [page.get_text().split("\n")[0] for page in merged] == ["page 1", "page 3"]
+            assert [widget.field_value for widget in merged[1].widgets()] == [name]
@@ -0,0 +1,18 @@
+def best_time_to_first_page(reader, open_file, pump_until, path, runs=3):
+    # The first open also builds the search index; later opens read it, so nothing else competes
+    open_file(path)
+    pump_until(lambda: reader.search_index is not None)
+    return min(open_file(path) for _ in range(runs))
+
+
+def test_time_to_first_page_does_not_grow_with_page_count(make_pdf, reader, open_file, pump_until, tmp_path):
+    small, large = tmp_path / "small.pdf", tmp_path / "large.pdf"
+    make_pdf(5, small)
+    make_pdf(5000, large)
+    small_ms = best_time_to_first_page(reader, open_file, pump_until, small)
+    large_ms = best_time_to_first_page(reader, open_file, pump_until, large)
+
+    # MuPDF's own page tree load is the only per-page cost left (microseconds per page)
+    assert large_ms < small_ms + 250, (small_ms, large_ms)
+    assert len(reader.page_widgets) < 10  # Only the pages on screen have widgets
+    pump_until(lambda: reader.thumbnail_list.count() == 5000)  # The other thumbnail rows follow the first page
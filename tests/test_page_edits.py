@@ -0,0 +1,63 @@
+import fitz  # PyMuPDF
+
+import pytest
+
+from pdf_page_edits import reorder_keys, select_pages
+from pdf_utils import delete_pages, remove_page, search_text, undo_edit
+
+
+def note_texts(page):
+    return [annot.info["content"] for annot in page.annots(types=[fitz.PDF_ANNOT_TEXT])]
+
+
+def test_select_pages_reorders(make_pdf):
+    doc = make_pdf(3)
+    select_pages(doc, [2, 0, 1])
+    assert [page.get_text().strip() for page in doc] == ["page 3", "page 1", "page 2"]
+
+
+def test_repeated_page_is_a_separate_copy(make_pdf):
+    doc = make_pdf(3)
+    doc[1].add_text_annot((50, 50), "original")
+    select_pages(doc, [0, 1, 1, 2])
+    assert doc.page_count == 4
+    assert len({doc.page_xref(page_num) for page_num in range(4)}) == 4
+    assert note_texts(doc[2]) == ["original"] # The copy has the page's notes too
+
+    doc[2].add_text_annot((80, 80), "copy only")
+    assert note_texts(doc[1]) == ["original"]
+    assert note_texts(doc[2]) == ["original", "copy only"]
+
+    # Also after a save and reopen
+    reopened = fitz.open("pdf", doc.tobytes())
+    assert note_texts(reopened[1]) == ["original"]
+    assert note_texts(reopened[2]) == ["original", "copy only"]
+
+
+def test_notes_of_repeated_pages_are_separate_lists():
+    notes = reorder_keys({1: [(50, 50, "original", "id-1")]}, [0, 1, 1, 2])
+    notes[2].append((80, 80, "copy only", "id-2"))
+    assert notes[1] == [(50, 50, "original", "id-1")]
+
+
+@pytest.mark.parametrize("with_index", [True, False])
+def test_undoing_a_deletion_brings_back_search_hits(make_pdf, reader, open_file, pump_until, tmp_path, with_index):
+    path = tmp_path / "a.pdf"
+    make_pdf(6, path)
+    open_file(path)
+    pump_until(lambda: reader.search_index is not None)
+    if not with_index:
+        reader.search_index = None  # Searched page by page on the task worker instead
+    reader.search_input.setText("Page")
+    search_text(reader)
+    pump_until(lambda: not reader.search_chunks_pending)
+    assert reader.search_results.pages == [0, 1, 2, 3, 4, 5]
+
+    delete_pages(reader, [1, 3])
+    reader.current_page = 0
+    remove_page(reader)
+    assert reader.search_results.pages == [0, 1, 2]
+    undo_edit(reader)
+    undo_edit(reader)
+    assert reader.search_results.pages == [0, 1, 2, 3, 4, 5]
+    assert [len(reader.search_results.rects_for(page_num)) for page_num in range(6)] == [1] * 6
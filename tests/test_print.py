@@ -0,0 +1,54 @@
+import time
+
+import fitz  # PyMuPDF
+
+from pdf_print import PrintJob
+from pdf_render_cache import is_page_key
+from pdf_utils import add_page, delete_pages, undo_edit
+
+
+def test_pages_can_be_inserted_after_printing(make_pdf, reader, open_file, pump_until, tmp_path):
+    from PyQt6.QtPrintSupport import QPrinter
+
+    path = tmp_path / "a.pdf"
+    make_pdf(3, path)
+    open_file(path)
+    printer = QPrinter(QPrinter.PrinterMode.ScreenResolution)
+    printer.setOutputFormat(QPrinter.OutputFormat.PdfFormat)
+    printer.setOutputFileName(str(tmp_path / "printed.pdf"))
+    errors = []
+    job = PrintJob(reader, printer, [0, 1, 2])
+    job.finished.connect(errors.append)
+    job.start()
+    pump_until(lambda: errors)
+    assert errors == [""]
+
+    # Print bands are not page rasters, so they neither fill the page cache nor trip its remapping
+    assert all(is_page_key(key) for key in reader.render_cache._entries)
+    add_page(reader)
+    assert reader.total_pages == reader.pdf_document.page_count == 4
+    assert len(reader.page_layout.page_sizes) == 4
+    pump_until(lambda: reader.thumbnail_list.count() == 4)
+
+
+def test_vector_print_keeps_its_edits_when_another_file_is_opened(make_pdf, reader, open_file, pump_until, tmp_path):
+    from PyQt6.QtPrintSupport import QPrinter
+
+    path, other_path, printed_path = tmp_path / "a.pdf", tmp_path / "b.pdf", tmp_path / "printed.pdf"
+    make_pdf(4, path)
+    make_pdf(2, other_path)
+    open_file(path)
+    delete_pages(reader, [0, 1])
+    undo_edit(reader) # The restored pages are replayed from a file next to the edit log
+    delete_pages(reader, [3])
+
+    printer = QPrinter(QPrinter.PrinterMode.ScreenResolution)
+    printer.setOutputFormat(QPrinter.OutputFormat.PdfFormat)
+    printer.setOutputFileName(str(printed_path))
+    reader.render_scheduler.submit_task(("wait",), time.sleep, 1) # The print job starts after the next open
+    reader.start_vector_print(printer, [0, 1, 2])
+    open_file(other_path)
+    pump_until(lambda: reader.vector_print is None)
+
+    with fitz.open(str(printed_path)) as printed:
+        assert [page.get_text().strip() for page in printed] == ["page 1", "page 2", "page 3"]
@@ -0,0 +1,25 @@
+import fitz  # PyMuPDF
+
+from pdf_save import SAVE_FULL
+from pdf_utils import delete_pages
+
+
+def test_full_save_writes_the_edits_in_the_worker(make_pdf, reader, open_file, pump_until, tmp_path, monkeypatch):
+    from PyQt6.QtWidgets import QFileDialog, QInputDialog
+
+    path, saved_path = tmp_path / "a.pdf", tmp_path / "saved.pdf"
+    make_pdf(5, path)
+    open_file(path)
+    delete_pages(reader, [0, 2])
+
+    def tobytes(doc, *args, **kwargs):
+        raise AssertionError("the document was serialized on the GUI thread")
+    monkeypatch.setattr(fitz.Document, "tobytes", tobytes) # Workers are spawned, so they keep the real one
+    monkeypatch.setattr(QFileDialog, "getSaveFileName", lambda *args, **kwargs: (str(saved_path), ""))
+    monkeypatch.setattr(QInputDialog, "getItem", lambda *args, **kwargs: (SAVE_FULL, True))
+    reader.save_pdf()
+    assert reader.save_future is not None
+    pump_until(lambda: reader.save_future is None)
+
+    with fitz.open(str(saved_path)) as saved:
+        assert [page.get_text().strip() for page in saved] == ["page 2", "page 4", "page 5"]
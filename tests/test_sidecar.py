@@ -0,0 +1,24 @@
+from pdf_annotation_sidecar import AnnotationSidecar
+from pdf_notes import new_note_id
+from pdf_utils import add_note, add_page, move_page_up
+
+
+def note_texts(annotations):
+    return {page_num: [note[2] for note in notes] for page_num, notes in annotations.items()}
+
+
+def test_unsaved_page_edits_keep_the_sidecar_in_file_order(make_pdf, reader, open_file, tmp_path):
+    path = tmp_path / "a.pdf"
+    make_pdf(4, path)
+    open_file(path)
+    add_note(reader, 2, (50.0, 50.0, "before", new_note_id()))
+    reader.current_page = 2
+    move_page_up(reader)  # Page 3 of the file is now the second page
+    add_note(reader, 1, (60.0, 60.0, "after", new_note_id()))
+    reader.current_page = 0
+    add_page(reader)  # A blank page the file does not have
+    add_note(reader, 1, (70.0, 70.0, "on the new page", new_note_id()))
+
+    assert note_texts(reader.annotations) == {1: ["on the new page"], 2: ["before", "after"]}
+    # Closing now (without saving the PDF) leaves notes that match the file on disk
+    assert note_texts(AnnotationSidecar(str(path)).load()) == {2: ["before", "after"]}
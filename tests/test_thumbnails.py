@@ -0,0 +1,46 @@
+import os
+
+from pdf_disk_cache import prune_cache
+from pdf_render_scheduler import THUMBNAIL_JOB
+from pdf_thumbnails import THUMBNAIL_LOADED_ROLE
+from pdf_utils import add_page
+
+
+def test_disk_cache_is_used_once_the_file_is_hashed(make_pdf, reader, open_file, pump_until, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    path = tmp_path / "a.pdf"
+    make_pdf(3, path)
+    loader = reader.thumbnail_loader
+    rows_loaded = lambda: all(loader.thumbnail_list.item(row).data(THUMBNAIL_LOADED_ROLE) for row in range(3))
+    open_file(path)
+    pump_until(lambda: loader.disk_cache is not None and rows_loaded())
+    pump_until(lambda: all(os.path.exists(loader.disk_cache.path(row)) for row in range(3)))
+
+    requested = []
+    original_request = reader.render_scheduler.request
+    monkeypatch.setattr(reader.render_scheduler, "request",
+                        lambda key, *args, **kwargs: requested.append(key) or original_request(key, *args, **kwargs))
+    open_file(path)
+    pump_until(lambda: loader.disk_cache is not None and rows_loaded())
+    assert not [key for key in requested if key[0] == THUMBNAIL_JOB]
+
+
+def test_hash_of_an_edited_file_leaves_the_disk_cache_off(make_pdf, reader, open_file, tmp_path):
+    path = tmp_path / "a.pdf"
+    make_pdf(3, path)
+    open_file(path)
+    loader = reader.thumbnail_loader
+    generation = loader.generation  # The hash job started for the file as opened
+    add_page(reader)
+    loader._on_hash_ready(generation, "0" * 64)  # ... and finishes after the edit
+    assert loader.disk_cache is None
+
+
+def test_prune_cache_deletes_the_least_recently_used_entries(tmp_path):
+    for last_used, name in enumerate(["kept", "oldest", "older", "newest"]):
+        entry = tmp_path / name
+        entry.mkdir()
+        (entry / "0.png").write_bytes(b"x" * 100)
+        os.utime(entry, (last_used, last_used))
+    assert prune_cache(str(tmp_path), 250, keep=("kept",)) == 200
+    assert sorted(os.listdir(tmp_path)) == ["kept", "newest"]